@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""Benchmarks for chi_sdk hot paths.
+
+Runs synthetic workloads against the SDK and writes machine-readable results
+(one JSON document per run) so releases can be compared:
+
+    python benchmarks/bench_sdk.py                       # full suite
+    python benchmarks/bench_sdk.py --quick --only emit   # subset, small sizes
+    python benchmarks/bench_sdk.py --compare benchmarks/results/0.0.5.json
+
+Every result records seconds per operation (`min`, `median`, `mean`, `max`
+over the repeats); throughput benchmarks add `ops_per_s`. `--compare` exits
+with status 1 when a median regressed by more than `--threshold`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import click  # noqa: E402
+from pydantic import BaseModel, Field, create_model  # noqa: E402
+
+from chi_sdk import sdk  # noqa: E402
+from chi_sdk.renderer import compile_renderer, render_human_output  # noqa: E402
+
+Result = Dict[str, Any]
+
+
+class _NullOut:
+    """Text stream that counts and discards writes."""
+
+    def __init__(self) -> None:
+        self.bytes = 0
+
+    def write(self, s: str) -> int:
+        self.bytes += len(s)
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+@contextlib.contextmanager
+def _quiet() -> Iterator[_NullOut]:
+    out = _NullOut()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+        yield out
+
+
+@contextlib.contextmanager
+def _registry(specs: List[sdk.CommandSpec]) -> Iterator[None]:
+    saved = dict(sdk._REGISTRY)
+    sdk._REGISTRY.clear()
+    sdk._REGISTRY.update({s.name: s for s in specs})
+    try:
+        yield
+    finally:
+        sdk._REGISTRY.clear()
+        sdk._REGISTRY.update(saved)
+
+
+def _measure(
+    fn: Callable[[], Any], *, repeat: int, number: int = 1, **params: Any
+) -> Result:
+    """Time `fn` `number` times per sample, `repeat` samples; seconds per call."""
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+        "repeat": repeat,
+        "number": number,
+        "params": params,
+    }
+
+
+# ---------------------------------------------------------------- workloads
+class _In(BaseModel):
+    path: str
+    limit: int = 10
+    ratio: float = 0.5
+    verbose: bool = False
+    tags: List[str] = []
+
+
+class _Out(BaseModel):
+    ok: bool
+
+
+def _noop(inp: _In) -> _Out:
+    return _Out(ok=True)
+
+
+def _synthetic_specs(n: int) -> List[sdk.CommandSpec]:
+    return [
+        sdk.CommandSpec(
+            name=f"cmd-{i}",
+            func=_noop,
+            input_model=_In,
+            output_model=_Out,
+            description=f"Synthetic command {i}",
+        )
+        for i in range(n)
+    ]
+
+
+def _wide_model(width: int) -> type:
+    kinds: List[Any] = [
+        (int, 0),
+        (str, ""),
+        (float, 0.0),
+        (bool, False),
+        (Optional[int], None),
+        (List[str], []),
+        (Dict[str, int], {}),
+        (Literal["a", "b"], "a"),
+    ]
+    fields = {
+        f"field_{i}": (kinds[i % len(kinds)][0], Field(kinds[i % len(kinds)][1]))
+        for i in range(width)
+    }
+    return create_model(f"Wide{width}", **fields)
+
+
+def _nested_model(depth: int, width: int) -> type:
+    model: type = create_model("Leaf", value=(int, 0), label=(str, ""))
+    for level in range(depth):
+        fields: Dict[str, Any] = {
+            f"child_{j}": (Optional[model], None) for j in range(width)
+        }
+        fields["items"] = (List[model], [])
+        model = create_model(f"Level{level}", **fields)
+    return model
+
+
+# --------------------------------------------------------------- benchmarks
+def bench_build_cli(quick: bool) -> Dict[str, Result]:
+    out = {}
+    for n in (10, 1000) if quick else (10, 1000, 10000):
+        with _registry(_synthetic_specs(n)):
+            out[f"build_cli[{n}]"] = _measure(
+                lambda: sdk.build_cli("bench"), repeat=3 if n >= 1000 else 10, n=n
+            )
+    return out
+
+
+def bench_pyd_type_to_click(quick: bool) -> Dict[str, Result]:
+    out = {}
+    for width in (50,) if quick else (50, 500):
+        fields = list(_wide_model(width).model_fields.items())
+        out[f"pyd_type_to_click[{width}]"] = _measure(
+            lambda fields=fields: [sdk._pyd_type_to_click(k, f) for k, f in fields],
+            repeat=10,
+            fields=width,
+        )
+    return out
+
+
+def bench_schema(quick: bool) -> Dict[str, Result]:
+    depth = 3 if quick else 6
+    nested = _nested_model(depth, 3)
+    specs = [
+        sdk.CommandSpec(
+            name=f"nested-{i}",
+            func=_noop,
+            input_model=nested,
+            output_model=nested,
+            description="nested",
+        )
+        for i in range(5)
+    ]
+    with _registry(specs):
+        cli = sdk.build_cli("bench")
+
+        def run() -> int:
+            with _quiet() as sink:
+                cli.main(["--json", "schema"], standalone_mode=False)
+            return sink.bytes
+
+        size = run()
+        res = _measure(run, repeat=5, depth=depth, commands=len(specs))
+    res["payload_bytes"] = size
+    return {f"schema[depth={depth}]": res}
+
+
+def bench_emit(quick: bool) -> Dict[str, Result]:
+    n = 2000 if quick else 20000
+    data = {"items": [{"id": i, "title": f"item {i}"} for i in range(10)]}
+
+    def ok() -> None:
+        with _quiet():
+            for _ in range(n):
+                sdk.emit_ok(data, command="bench")
+
+    def progress() -> None:
+        with _quiet():
+            for i in range(n):
+                sdk.emit_progress("working", percent=i % 100, command="bench")
+
+    out = {}
+    for name, fn in (("emit_ok", ok), ("emit_progress", progress)):
+        res = _measure(fn, repeat=3, envelopes=n)
+        for key in ("min", "median", "mean", "max"):
+            res[key] /= n
+        res["ops_per_s"] = 1.0 / res["median"]
+        out[name] = res
+    return out
+
+
+def bench_render(quick: bool) -> Dict[str, Result]:
+    n = 10000 if quick else 100000
+    titled = {
+        "items": [
+            {"id": i, "title": f"item {i}", "status": "ok", "command": "x"}
+            for i in range(n)
+        ]
+    }
+    plain = [{"id": i, "size": i * 3, "owner": "root"} for i in range(n)]
+    out = {}
+    for name, data in (("titled", titled), ("table", plain)):
+
+        def run(data: Any = data) -> None:
+            with _quiet():
+                render_human_output(data)
+
+        res = _measure(run, repeat=3, rows=n)
+        res["rows_per_s"] = n / res["median"]
+        out[f"render_human_output[{name}]"] = res
+
+    row = create_model(
+        "Row", id=(int, 0), title=(str, ""), status=(str, ""), command=(str, "")
+    )
+    compiled = compile_renderer(create_model("RowsOut", items=(List[row], [])))
+
+    def run_compiled() -> None:
+        with _quiet():
+            compiled(titled)
+
+    res = _measure(run_compiled, repeat=3, rows=n)
+    res["rows_per_s"] = n / res["median"]
+    out["render_compiled[titled]"] = res
+    return out
+
+
+_ONE_SHOT = """
+from pydantic import BaseModel
+from chi_sdk import build_cli, chi_command
+
+class Out(BaseModel):
+    n: int
+
+@chi_command(name="ping", output_model=Out)
+def ping() -> Out:
+    return Out(n=1)
+
+build_cli("bench")(["--json", "ping"])
+"""
+
+
+def bench_subprocess(quick: bool) -> Dict[str, Result]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    cases = {
+        "python": "pass",
+        "import_chi_sdk": "import chi_sdk",
+        "one_shot_command": _ONE_SHOT,
+    }
+    out = {}
+    for name, code in cases.items():
+
+        def run(code: str = code) -> None:
+            subprocess.run(
+                [sys.executable, "-c", code],
+                env=env,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+
+        out[f"subprocess[{name}]"] = _measure(run, repeat=5 if quick else 20)
+    return out
+
+
+BENCHMARKS: Dict[str, Callable[[bool], Dict[str, Result]]] = {
+    "build_cli": bench_build_cli,
+    "pyd_type_to_click": bench_pyd_type_to_click,
+    "schema": bench_schema,
+    "emit": bench_emit,
+    "render": bench_render,
+    "subprocess": bench_subprocess,
+}
+
+
+# ------------------------------------------------------------------ driver
+def _sdk_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("chi-sdk")
+    except Exception:
+        return "0.0.0.dev"
+
+
+def run_suite(only: List[str], quick: bool) -> Dict[str, Any]:
+    results: Dict[str, Result] = {}
+    for group, fn in BENCHMARKS.items():
+        if only and not any(o in group for o in only):
+            continue
+        results.update(fn(quick))
+    return {
+        "suite": "chi_sdk",
+        "sdk_version": _sdk_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Return names whose median is slower than `threshold` x the baseline."""
+    regressions = []
+    for name, res in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base and base["median"] > 0 and res["median"] / base["median"] > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def _fmt(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.2f}us"
+
+
+def _print_table(current: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    width = max((len(n) for n in current["results"]), default=10)
+    for name, res in current["results"].items():
+        line = f"{name:<{width}}  median {_fmt(res['median']):>10}  min {_fmt(res['min']):>10}"
+        for key, unit in (("ops_per_s", "ops/s"), ("rows_per_s", "rows/s")):
+            if key in res:
+                line += f"  {res[key]:>12,.0f} {unit}"
+        base = (baseline or {}).get("results", {}).get(name)
+        if base and base["median"] > 0:
+            line += f"  x{res['median'] / base['median']:.2f} vs baseline"
+        click.echo(line)
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--quick", action="store_true", help="Smaller sizes and repeats")
+    ap.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        choices=sorted(BENCHMARKS),
+        help="Run only this benchmark group (repeatable)",
+    )
+    ap.add_argument(
+        "--out", type=Path, help="Results file (default: results/<version>.json)"
+    )
+    ap.add_argument("--compare", type=Path, help="Baseline results file")
+    ap.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Median slowdown ratio counted as a regression (default: 1.25)",
+    )
+    args = ap.parse_args(argv)
+
+    current = run_suite(args.only, args.quick)
+    out = (
+        args.out or Path(__file__).parent / "results" / f"{current['sdk_version']}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    _print_table(current, baseline)
+    click.echo(f"results: {out}")
+    if baseline is not None:
+        regressions = compare(current, baseline, args.threshold)
+        for name in regressions:
+            click.echo(f"REGRESSION: {name}", err=True)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -1,4 +1,5 @@
 from .sdk import chi_command, build_cli, emit_ok, emit_error, emit_progress
+from .runtime.context import CommandCancelled, CommandContext, current_context
 
 __all__ = [
     "chi_command",
@@ -6,4 +7,7 @@ __all__ = [
     "emit_ok",
     "emit_error",
     "emit_progress",
+    "current_context",
+    "CommandContext",
+    "CommandCancelled",
 ]
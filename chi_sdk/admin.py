@@ -148,13 +148,17 @@ def init_cmd(
 """Additional admin CLI commands live outside this module to keep it small."""
 
 # Register external admin commands
+from .chi_admin.bench import bench_cmd  # noqa: E402
 from .chi_admin.doctor import doctor_cmd  # noqa: E402
 from .chi_admin.download import download_cmd  # noqa: E402
 from .chi_admin.ensure_chi import ensure_chi_cmd  # noqa: E402
+from .chi_admin.replay import replay_cmd  # noqa: E402
 
+cli.add_command(bench_cmd)
 cli.add_command(doctor_cmd)
 cli.add_command(download_cmd)
 cli.add_command(ensure_chi_cmd)
+cli.add_command(replay_cmd)
 
 
 def main():
@@ -0,0 +1,276 @@
+"""Load generator for chi_sdk backends (`chi-admin bench`)."""
+
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import click
+
+from ..sdk import emit_ok
+from .nav import expand, extra_env, load_screens, resolve_app_bin
+
+
+def _json_mode(ctx: Optional[click.Context] = None) -> bool:
+    ctx = ctx or click.get_current_context(silent=True)
+    env = os.getenv("CHI_TUI_JSON", "")
+    return bool(
+        (ctx and ctx.obj and ctx.obj.get("json")) or env in ("1", "true", "yes")
+    )
+
+
+@dataclass
+class Sample:
+    ms: float
+    ok: bool
+    size: int  # bytes of the final envelope (or raw JSON output)
+    error: Optional[str] = None  # error code, `exit_<n>`, `timeout`, ...
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile (q in [0, 100]) of `values`."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _final_json(*streams: bytes) -> Tuple[Optional[Any], int]:
+    """Last JSON document printed on stdout/stderr (and its size in bytes)."""
+    for stream in streams:
+        for line in reversed(stream.splitlines()):
+            line = line.strip()
+            if not line.startswith((b"{", b"[")):
+                continue
+            try:
+                return json.loads(line), len(line)
+            except ValueError:
+                continue
+    for stream in streams:  # pretty-printed raw JSON
+        try:
+            return json.loads(stream), len(stream.strip())
+        except ValueError:
+            continue
+    return None, 0
+
+
+def run_once(argv: List[str], env: Dict[str, str], timeout: float) -> Sample:
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(argv, env=env, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return Sample((time.perf_counter() - start) * 1000, False, 0, "timeout")
+    except OSError:
+        return Sample((time.perf_counter() - start) * 1000, False, 0, "spawn_error")
+    ms = (time.perf_counter() - start) * 1000
+    doc, size = _final_json(proc.stdout, proc.stderr)
+    if isinstance(doc, dict) and doc.get("type") in ("result", "error"):
+        if doc.get("ok") and proc.returncode == 0:
+            return Sample(ms, True, size)
+        code = (doc.get("data") or {}).get("code") if not doc.get("ok") else None
+        return Sample(ms, False, size, code or f"exit_{proc.returncode}")
+    if proc.returncode != 0:
+        return Sample(ms, False, size, f"exit_{proc.returncode}")
+    if doc is None:
+        return Sample(ms, False, 0, "invalid_json")
+    return Sample(ms, True, size)
+
+
+def _dist(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    def r(v: Optional[float]) -> Optional[float]:
+        return None if v is None else round(v, 3)
+
+    return {
+        "p50": r(percentile(values, 50)),
+        "p95": r(percentile(values, 95)),
+        "p99": r(percentile(values, 99)),
+        "min": r(min(values)) if values else None,
+        "max": r(max(values)) if values else None,
+    }
+
+
+def _summary(samples: List[Sample]) -> Dict[str, Any]:
+    errors: Dict[str, int] = {}
+    for s in samples:
+        if not s.ok:
+            errors[s.error or "error"] = errors.get(s.error or "error", 0) + 1
+    sizes = [s.size for s in samples if s.size]
+    n_err = sum(errors.values())
+    return {
+        "runs": len(samples),
+        "errors": n_err,
+        "error_rate": round(n_err / len(samples), 4) if samples else 0.0,
+        "error_codes": errors,
+        "cold_ms": round(samples[0].ms, 3) if samples else None,
+        "warm_ms": _dist([s.ms for s in samples[1:]]),
+        "envelope_bytes": {
+            "mean": round(sum(sizes) / len(sizes)) if sizes else 0,
+            "max": max(sizes) if sizes else 0,
+        },
+    }
+
+
+def run_bench(
+    targets: List[Tuple[str, str, List[str]]],
+    *,
+    runs: int,
+    concurrency: int,
+    timeout: float,
+    env: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """Run each (screen, line, argv) target `runs` times and summarize.
+
+    The first invocation of every target runs sequentially and is reported as
+    `cold_ms`; the remaining runs of all targets share a pool of `concurrency`
+    workers and form the warm distribution.
+    """
+    run_env = dict(os.environ if env is None else env)
+    run_env.setdefault("CHI_TUI_JSON", "1")
+    started = time.perf_counter()
+    samples: Dict[int, List[Sample]] = {
+        i: [run_once(argv, run_env, timeout)] for i, (_, _, argv) in enumerate(targets)
+    }
+    jobs = [i for i in range(len(targets)) for _ in range(runs - 1)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            (i, pool.submit(run_once, targets[i][2], run_env, timeout)) for i in jobs
+        ]
+        for i, fut in futures:
+            samples[i].append(fut.result())
+    wall = time.perf_counter() - started
+
+    rows = []
+    for i, (screen, line, _argv) in enumerate(targets):
+        rows.append({"screen": screen, "command": line, **_summary(samples[i])})
+    all_samples = [s for i in samples for s in samples[i]]
+    total = _summary(all_samples)
+    total["cold_ms"] = _dist([samples[i][0].ms for i in samples])
+    total["warm_ms"] = _dist([s.ms for i in samples for s in samples[i][1:]])
+    total["wall_s"] = round(wall, 3)
+    total["throughput_rps"] = round(len(all_samples) / wall, 2) if wall else None
+    return {
+        "runs": runs,
+        "concurrency": concurrency,
+        "commands": rows,
+        "total": total,
+    }
+
+
+def _fmt_ms(v: Optional[float]) -> str:
+    return "-" if v is None else f"{v:.1f}"
+
+
+def _print_table(report: Dict[str, Any]) -> None:
+    header = ("command", "runs", "err%", "cold", "p50", "p95", "p99", "bytes")
+    rows = [
+        (
+            r["command"],
+            str(r["runs"]),
+            f"{r['error_rate'] * 100:.1f}",
+            _fmt_ms(r["cold_ms"]),
+            _fmt_ms(r["warm_ms"]["p50"]),
+            _fmt_ms(r["warm_ms"]["p95"]),
+            _fmt_ms(r["warm_ms"]["p99"]),
+            str(r["envelope_bytes"]["mean"]),
+        )
+        for r in report["commands"]
+    ]
+    widths = [max(len(h), *(len(r[i]) for r in rows)) for i, h in enumerate(header)]
+    widths[0] = min(widths[0], 60)
+    for row in [header, *rows]:
+        first = row[0] if len(row[0]) <= widths[0] else row[0][: widths[0] - 1] + "…"
+        cells = [first.ljust(widths[0])] + [
+            c.rjust(w) for c, w in zip(row[1:], widths[1:])
+        ]
+        click.echo("  ".join(cells))
+    t = report["total"]
+    click.echo(
+        f"\n{t['runs']} runs in {t['wall_s']}s ({t['throughput_rps']} runs/s, "
+        f"concurrency {report['concurrency']}), errors {t['errors']}; "
+        f"latencies in ms: cold p50 {_fmt_ms(t['cold_ms']['p50'])}, "
+        f"warm p50/p95/p99 {_fmt_ms(t['warm_ms']['p50'])}/"
+        f"{_fmt_ms(t['warm_ms']['p95'])}/{_fmt_ms(t['warm_ms']['p99'])}"
+    )
+
+
+@click.command("bench")
+@click.argument("commands", nargs=-1)
+@click.option(
+    "--app-bin",
+    default=None,
+    help="Backend CLI (default: CHI_APP_BIN or app_bin in config.yaml)",
+)
+@click.option(
+    "--config", "config_path", default=".tui", show_default=True, help="Config dir"
+)
+@click.option("-n", "--runs", default=10, show_default=True, type=click.IntRange(min=1))
+@click.option(
+    "-c",
+    "--concurrency",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Parallel warm runs",
+)
+@click.option(
+    "--timeout", default=60.0, show_default=True, help="Per-run timeout in seconds"
+)
+@click.pass_context
+def bench_cmd(
+    ctx,
+    commands: Tuple[str, ...],
+    app_bin: Optional[str],
+    config_path: str,
+    runs: int,
+    concurrency: int,
+    timeout: float,
+):
+    """Run backend commands repeatedly and report latency and errors.
+
+    COMMANDS are command lines run against the backend, e.g. "list-items".
+    Without COMMANDS, every command referenced by chi-index.yaml (and the pane
+    YAMLs it points to) is benchmarked.
+    """
+    cfg_dir = Path(config_path)
+    app = resolve_app_bin(cfg_dir, app_bin)
+    if commands:
+        lines = [
+            ("cli", c if "APP_BIN" in c or not app else f"${{APP_BIN}} {c}")
+            for c in commands
+        ]
+    else:
+        lines = [
+            (s.id, line) for s in load_screens(cfg_dir) for _role, line in s.commands
+        ]
+    if not lines:
+        raise click.UsageError(
+            f"No commands given and none found in {cfg_dir / 'chi-index.yaml'}"
+        )
+    if not app and any("APP_BIN" in line for _s, line in lines):
+        raise click.UsageError(
+            "Backend app_bin not set. Pass --app-bin, set CHI_APP_BIN or "
+            ".tui/config.yaml: app_bin: <name>"
+        )
+    targets = []
+    seen = set()
+    for screen, line in lines:
+        if line not in seen:
+            seen.add(line)
+            targets.append((screen, line, expand(line, app)))
+
+    env = dict(os.environ, **extra_env(cfg_dir))
+    report = run_bench(
+        targets, runs=runs, concurrency=concurrency, timeout=timeout, env=env
+    )
+    report["app_bin"] = app
+    if _json_mode(ctx):
+        emit_ok(report, command="chi-admin bench")
+    else:
+        _print_table(report)
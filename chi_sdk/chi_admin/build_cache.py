@@ -0,0 +1,140 @@
+"""Fingerprinted, cached builds of the Rust TUI.
+
+Used by `chi-admin ensure-chi --compile` and `<app> ui --rebuild`. A build's
+fingerprint hashes `Cargo.toml`, `Cargo.lock`, `build.rs`, the toolchain files,
+`.cargo/config*` and everything under `src/`, plus `rustc -vV` and the cargo
+profile. It is written next to the built binary (`target/<profile>/chi-tui.fingerprint`),
+and the binary is copied to `<cache>/builds/<fingerprint>/`. `cargo build`
+is skipped when either already matches, so switching branches back and
+forth reuses earlier builds.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .utils import _ensure_executable, _user_cache_dir
+
+# Builds kept in the cache (least recently used are removed)
+KEEP_BUILDS = 8
+_TOP_FILES = (
+    "Cargo.toml",
+    "Cargo.lock",
+    "build.rs",
+    "rust-toolchain",
+    "rust-toolchain.toml",
+    ".cargo/config",
+    ".cargo/config.toml",
+)
+
+
+@dataclass
+class Build:
+    path: Path
+    fingerprint: str
+    reused: bool  # no cargo invocation was needed
+
+
+def binary_name() -> str:
+    return "chi-tui.exe" if os.name == "nt" else "chi-tui"
+
+
+def cache_dir() -> Path:
+    return _user_cache_dir() / "builds"
+
+
+def toolchain_version(cwd: Path) -> str:
+    """`rustc -vV` as seen from `cwd` (honors rust-toolchain overrides)."""
+    try:
+        out = subprocess.run(
+            ["rustc", "-vV"], cwd=cwd, capture_output=True, text=True, timeout=30
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return out.stdout.strip()
+
+
+def _source_files(src: Path) -> Iterator[Path]:
+    for name in _TOP_FILES:
+        if (src / name).is_file():
+            yield src / name
+    for root, dirs, files in os.walk(src / "src"):
+        dirs.sort()
+        for name in sorted(files):
+            yield Path(root) / name
+
+
+def fingerprint(src: Path, profile: str, toolchain: Optional[str] = None) -> str:
+    h = hashlib.sha256()
+    h.update(f"profile={profile}\n".encode())
+    h.update((toolchain_version(src) if toolchain is None else toolchain).encode())
+    for path in _source_files(src):
+        h.update(b"\0" + path.relative_to(src).as_posix().encode() + b"\0")
+        h.update(path.read_bytes())
+    return h.hexdigest()[:32]
+
+
+def _copy_atomic(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    shutil.copy2(source, tmp)
+    _ensure_executable(tmp)
+    os.replace(tmp, target)
+
+
+def _prune(keep: int = KEEP_BUILDS) -> None:
+    try:
+        entries = sorted(
+            (p for p in cache_dir().iterdir() if p.is_dir()),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+    except OSError:
+        return
+    for old in entries[keep:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def build(
+    src: Path,
+    *,
+    release: bool = True,
+    capture: bool = False,
+    timeout: Optional[float] = None,
+) -> Optional[Build]:
+    """Build (or reuse) the TUI in `src`; None if cargo produced no binary.
+
+    Raises `FileNotFoundError` without cargo and `CalledProcessError` (or
+    `TimeoutExpired`) when the build fails.
+    """
+    profile = "release" if release else "debug"
+    exe = binary_name()
+    fp = fingerprint(src, profile)
+    cached = cache_dir() / fp / exe
+    if cached.is_file():
+        os.utime(cached.parent)  # keep recently used builds
+        return Build(cached, fp, reused=True)
+
+    built = src / "target" / profile / exe
+    stamp = built.with_name(f"{exe}.fingerprint")
+    try:
+        fresh = built.is_file() and stamp.read_text(encoding="utf-8").strip() == fp
+    except OSError:
+        fresh = False
+    if not fresh:
+        cmd = ["cargo", "build"] + (["--release"] if release else [])
+        subprocess.run(
+            cmd, cwd=str(src), check=True, capture_output=capture, timeout=timeout
+        )
+        if not built.is_file():
+            return None
+        stamp.write_text(fp + "\n", encoding="utf-8")
+    _copy_atomic(built, cached)
+    _prune()
+    return Build(cached, fp, reused=fresh)
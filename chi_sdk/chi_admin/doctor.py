@@ -47,6 +47,27 @@ def _chi_sdk_cached_binary() -> Optional[Path]:
     return p if p.exists() else None
 
 
+def _fmt_ms(v: Optional[float]) -> str:
+    return "-" if v is None else f"{v:.1f} ms"
+
+
+def _print_perf(report: dict) -> None:
+    imports = report["imports"]
+    click.echo(f"interpreter start: {_fmt_ms(report['interpreter_ms'])}")
+    click.echo(f"--version:         {_fmt_ms(report['version_ms'])}")
+    click.echo(
+        f"imports:           {imports['total_ms']:.1f} ms "
+        f"({imports['modules']} modules)"
+    )
+    for row in imports["top_cumulative"][:5]:
+        click.echo(f"  {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+    schema_bytes = report.get("schema_bytes")
+    size = f", {schema_bytes} bytes" if schema_bytes is not None else ""
+    click.echo(f"schema:            {_fmt_ms(report['schema_ms'])}{size}")
+    for warning in report["warnings"]:
+        click.echo(f"! {warning}")
+
+
 @click.command("doctor", help="Validate setup: chi-tui on PATH, backend available")
 @click.option(
     "--config", "config_path", default=".tui", show_default=True, help="Config dir"
@@ -54,8 +75,22 @@ def _chi_sdk_cached_binary() -> Optional[Path]:
 @click.option(
     "--binary-name", default=None, help="Backend CLI name (overrides config/env)"
 )
+@click.option(
+    "--perf",
+    is_flag=True,
+    help="Launch the backend: import cost, --version/schema latency, schema size",
+)
+@click.option(
+    "--runs",
+    default=3,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Launches per measurement with --perf (median reported)",
+)
 @click.pass_context
-def doctor_cmd(ctx, config_path: str, binary_name: Optional[str]):
+def doctor_cmd(
+    ctx, config_path: str, binary_name: Optional[str], perf: bool, runs: int
+):
     problems = []
     info = {}
 
@@ -82,12 +117,21 @@ def doctor_cmd(ctx, config_path: str, binary_name: Optional[str]):
         if not backend:
             problems.append(f"Backend '{app_bin}' not found on PATH.")
 
+    report = None
+    if perf and info.get("backend_path"):
+        from .perf import backend_perf
+
+        report = backend_perf([info["backend_path"]], runs=runs)
+
     ok = len(problems) == 0
     if _json_mode(ctx):
-        emit_ok(
-            {"ok": ok, "problems": problems, "info": info}, command="chi-admin doctor"
-        )
+        payload = {"ok": ok, "problems": problems, "info": info}
+        if perf:
+            payload["perf"] = report
+        emit_ok(payload, command="chi-admin doctor")
     else:
+        if report:
+            _print_perf(report)
         if ok:
             click.echo("OK: chi-tui and backend available.")
         else:
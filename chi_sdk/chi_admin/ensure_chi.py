@@ -1,20 +1,14 @@
 """Ensure CHI TUI binary is available - compile or download."""
-import json
 import os
 import platform
 import shutil
-import subprocess
-import tarfile
-import tempfile
-import urllib.error
-import urllib.request
-import zipfile
 from pathlib import Path
 from typing import Optional, Dict, Any
 
 import click
 
 from ..sdk import emit_error, emit_ok
+from . import build_cache, releases
 from .utils import _ensure_executable
 
 
@@ -99,67 +93,41 @@ def _compile_from_sources(sources_dir: Path, target_dir: Path) -> bool:
         return False
 
     try:
-        # Create target directory
-        target_dir.mkdir(parents=True, exist_ok=True)
-
-        # Run cargo build
-        result = subprocess.run(
-            ["cargo", "build", "--release"],
-            cwd=sources_dir,
-            capture_output=True,
-            text=True,
-            timeout=300,  # 5 minutes timeout
-        )
-
-        if result.returncode != 0:
+        # Build, or reuse a build with the same source fingerprint
+        built = build_cache.build(sources_dir, capture=True, timeout=300)
+        if built is None:
             return False
+        binary_name = build_cache.binary_name()
+        compiled_binary = built.path
 
-        # Find the compiled binary
-        release_dir = sources_dir / "target" / "release"
-        binary_name = "chi-tui.exe" if os.name == "nt" else "chi-tui"
-        compiled_binary = release_dir / binary_name
-
-        if not compiled_binary.exists():
-            # Try without extension on Windows too
-            compiled_binary = release_dir / "chi-tui"
-            if not compiled_binary.exists():
-                return False
-
-        # Copy to target directory
-        target_binary = target_dir / binary_name
-        shutil.copy2(compiled_binary, target_binary)
-        _ensure_executable(target_binary)
+        # Copy to target directory (replaced atomically: the old file may be
+        # a hard link into the shared download store)
+        releases.install_copy(compiled_binary, target_dir / binary_name, link=False)
 
         return True
     except Exception:
         return False
 
 
-def _download_binary(target_dir: Path) -> bool:
+def _download_binary(target_dir: Path, offline: Optional[bool] = None) -> bool:
     """Download chi-tui binary from GitHub releases."""
     owner_repo = os.environ.get("CHI_TUI_GH_REPO", "contextops/chi_tui")
     tag = os.environ.get("CHI_TUI_BIN_TAG")  # if not set, use latest
-
-    def _fetch_json(url: str):
-        req = urllib.request.Request(
-            url, headers={"Accept": "application/vnd.github+json"}
-        )
-        with urllib.request.urlopen(req, timeout=20) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+    api = releases.api_url()
 
     try:
         if tag:
-            rel = _fetch_json(
-                f"https://api.github.com/repos/{owner_repo}/releases/tags/{tag}"
+            rel = releases.fetch_json(
+                f"{api}/repos/{owner_repo}/releases/tags/{tag}", offline=offline
             )
         else:
             # Get all releases (including pre-releases) and pick the first one
-            releases = _fetch_json(
-                f"https://api.github.com/repos/{owner_repo}/releases"
+            listed = releases.fetch_json(
+                f"{api}/repos/{owner_repo}/releases", offline=offline
             )
-            if not releases:
+            if not listed:
                 return False
-            rel = releases[0]  # GitHub returns them sorted by created_at desc
+            rel = listed[0]  # GitHub returns them sorted by created_at desc
     except Exception:
         return False
 
@@ -200,51 +168,11 @@ def _download_binary(target_dir: Path) -> bool:
     if not url:
         return False
 
-    # Create target directory
-    target_dir.mkdir(parents=True, exist_ok=True)
-
-    # Download and extract binary
+    # Download (resumable, sha256-verified) into the shared store
     binary_name = "chi-tui.exe" if os.name == "nt" else "chi-tui"
-    target = target_dir / binary_name
-
     try:
-        # Download to temporary file
-        with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-            with urllib.request.urlopen(url, timeout=60) as resp:
-                shutil.copyfileobj(resp, tmp_file)
-            tmp_path = tmp_file.name
-
-        # Extract based on file type
-        asset_name = asset.get("name", "").lower()
-        if asset_name.endswith(".zip"):
-            with zipfile.ZipFile(tmp_path, 'r') as z:
-                # Find chi-tui binary in the archive
-                for name in z.namelist():
-                    # On Windows, look for .exe; on others, look for chi-tui without extension
-                    if os.name == "nt":
-                        if name.endswith("chi-tui.exe") or name == "chi-tui.exe":
-                            with z.open(name) as src, open(target, "wb") as dst:
-                                shutil.copyfileobj(src, dst)
-                            break
-                    else:
-                        if (name.endswith("chi-tui") and not name.endswith(".exe")) or name == "chi-tui":
-                            with z.open(name) as src, open(target, "wb") as dst:
-                                shutil.copyfileobj(src, dst)
-                            break
-        elif asset_name.endswith(".tar.gz"):
-            with tarfile.open(tmp_path, 'r:gz') as t:
-                # Find chi-tui binary in the archive
-                for member in t.getmembers():
-                    if member.name.endswith("chi-tui") or member.name == "chi-tui":
-                        with t.extractfile(member) as src, open(target, "wb") as dst:
-                            shutil.copyfileobj(src, dst)
-                        break
-
-        # Clean up temp file
-        os.unlink(tmp_path)
-
-        # Make executable
-        _ensure_executable(target)
+        fetched = releases.fetch_binary(asset, assets, binary_name, offline=offline)
+        releases.install_copy(fetched["path"], target_dir / binary_name)
         return True
     except Exception:
         return False
@@ -441,9 +369,19 @@ def _add_to_user_path(directory: Path) -> bool:
     default=False,
     help="Add install dir to PATH if missing (Windows/macOS/Linux)",
 )
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Use cached release metadata and binaries only (also CHI_TUI_OFFLINE=1)",
+)
 @click.pass_context
 def ensure_chi_cmd(
-    ctx, compile_only: bool, download_only: bool, force: bool, add_to_path: bool
+    ctx,
+    compile_only: bool,
+    download_only: bool,
+    force: bool,
+    add_to_path: bool,
+    offline: bool,
 ):
     """Ensure chi-tui binary is available - compile from sources or download."""
 
@@ -566,7 +504,7 @@ def ensure_chi_cmd(
     # Try download if compilation failed and not compile_only
     if not success and (download_only or not compile_only):
         click.echo("Downloading chi-tui binary...")
-        if _download_binary(chi_sdk_bin):
+        if _download_binary(chi_sdk_bin, offline=True if offline else None):
             success = True
             method = "downloaded"
         elif download_only:
@@ -0,0 +1,231 @@
+"""Read the TUI navigation config (`.tui/chi-index.yaml` and referenced YAMLs).
+
+Used by admin tooling that needs the commands a TUI session would run.
+PyYAML is used when installed; otherwise a small parser handles the block
+style YAML that `chi-admin init` generates (maps, lists, scalars, comments).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shlex
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .doctor import _read_app_bin_from_config
+
+INDEX_FILE = "chi-index.yaml"
+
+# item key -> role of the command on its screen
+_CMD_KEYS = (
+    ("command", "command"),
+    ("cmd", "command"),
+    ("pane_a_cmd", "pane_a"),
+    ("pane_b_cmd", "pane_b"),
+    ("options_cmd", "options"),
+)
+_YAML_KEYS = (("pane_a_yaml", "pane_a"), ("pane_b_yaml", "pane_b"))
+_KEY = re.compile(r"""^(?:"[^"]*"|'[^']*'|[^\s#'"{\[][^:#]*?)\s*:(?:\s|$)""")
+
+
+# ----------------------------------------------------------------- YAML
+def _strip_comment(line: str) -> str:
+    quote = None
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "#" and (i == 0 or line[i - 1] in " \t"):
+            return line[:i].rstrip()
+    return line.rstrip()
+
+
+def _scalar(text: str) -> Any:
+    s = text.strip()
+    if not s:
+        return None
+    if s[0] == '"' and s.endswith('"') and len(s) > 1:
+        try:
+            return json.loads(s)
+        except ValueError:
+            return s[1:-1]
+    if s[0] == "'" and s.endswith("'") and len(s) > 1:
+        return s[1:-1].replace("''", "'")
+    if s.startswith("[") and s.endswith("]"):
+        inner = s[1:-1].strip()
+        return [_scalar(p) for p in inner.split(",")] if inner else []
+    if s == "{}":
+        return {}
+    low = s.lower()
+    if low in ("true", "yes"):
+        return True
+    if low in ("false", "no"):
+        return False
+    if low in ("null", "~"):
+        return None
+    for conv in (int, float):
+        try:
+            return conv(s)
+        except ValueError:
+            pass
+    return s
+
+
+def _parse_block(lines: List[Tuple[int, str]], i: int, indent: int) -> Tuple[Any, int]:
+    if i >= len(lines):
+        return None, i
+    if lines[i][1] == "-" or lines[i][1].startswith("- "):
+        out_list: List[Any] = []
+        while (
+            i < len(lines) and lines[i][0] == indent and lines[i][1][:2] in ("-", "- ")
+        ):
+            text = lines[i][1]
+            rest = text[1:].lstrip()
+            if not rest:
+                if i + 1 < len(lines) and lines[i + 1][0] > indent:
+                    value, i = _parse_block(lines, i + 1, lines[i + 1][0])
+                else:
+                    value, i = None, i + 1
+            elif _KEY.match(rest):
+                # "- key: value" starts a map indented at the key's column
+                lines[i] = (indent + len(text) - len(rest), rest)
+                value, i = _parse_block(lines, i, lines[i][0])
+            else:
+                value, i = _scalar(rest), i + 1
+            out_list.append(value)
+        return out_list, i
+    out: Dict[str, Any] = {}
+    while i < len(lines) and lines[i][0] == indent and _KEY.match(lines[i][1]):
+        key, _, rest = lines[i][1].partition(":")
+        key = str(_scalar(key))
+        rest = rest.strip()
+        i += 1
+        if rest in ("|", ">", "|-", ">-"):
+            block: List[str] = []
+            while i < len(lines) and lines[i][0] > indent:
+                block.append(lines[i][1])
+                i += 1
+            text = ("\n" if rest[0] == "|" else " ").join(block)
+            out[key] = text if rest.endswith("-") else text + "\n"
+        elif rest:
+            out[key] = _scalar(rest)
+        elif i < len(lines) and (
+            lines[i][0] > indent
+            or (lines[i][0] == indent and lines[i][1][:2] in ("-", "- "))
+        ):
+            out[key], i = _parse_block(lines, i, lines[i][0])
+        else:
+            out[key] = None
+    return out, i
+
+
+def parse_yaml(text: str) -> Any:
+    """Parse YAML with PyYAML when available, else the block-style subset."""
+    try:
+        import yaml  # type: ignore[import-untyped]
+    except ImportError:
+        pass
+    else:
+        return yaml.safe_load(text)
+    lines: List[Tuple[int, str]] = []
+    for raw in text.splitlines():
+        line = _strip_comment(raw.replace("\t", "    "))
+        if line.strip() and line.strip() != "---":
+            lines.append((len(line) - len(line.lstrip()), line.strip()))
+    value, _ = _parse_block(lines, 0, lines[0][0]) if lines else (None, 0)
+    return value
+
+
+def load_yaml(path: Path) -> Any:
+    try:
+        return parse_yaml(path.read_text(encoding="utf-8"))
+    except Exception:  # unreadable or invalid YAML: treat as absent
+        return None
+
+
+# --------------------------------------------------------------- screens
+@dataclass
+class Screen:
+    """A navigable menu entry and the commands entering it runs."""
+
+    id: str
+    title: str
+    # (role, command line) in load order: command, pane_a, pane_b, options
+    commands: List[Tuple[str, str]] = field(default_factory=list)
+    item: Dict[str, Any] = field(default_factory=dict)
+
+
+def resolve_app_bin(config_dir: Path, app_bin: Optional[str] = None) -> Optional[str]:
+    return app_bin or os.getenv("CHI_APP_BIN") or _read_app_bin_from_config(config_dir)
+
+
+def extra_env(config_dir: Path) -> Dict[str, str]:
+    """`extra_env` from `config.yaml`, as the TUI passes it to commands."""
+    cfg = load_yaml(config_dir / "config.yaml")
+    env = cfg.get("extra_env") if isinstance(cfg, dict) else None
+    return {str(k): str(v) for k, v in env.items()} if isinstance(env, dict) else {}
+
+
+def expand(line: str, app_bin: Optional[str]) -> List[str]:
+    """Substitute `${APP_BIN}` and split a command line into argv."""
+    if app_bin:
+        line = line.replace("${APP_BIN}", app_bin).replace("$APP_BIN", app_bin)
+    return shlex.split(line)
+
+
+def _resolve(config_dir: Path, ref: str) -> Optional[Path]:
+    for cand in (config_dir / ref, Path(ref), config_dir.parent / ref):
+        if cand.is_file():
+            return cand
+    return None
+
+
+def _spec_commands(spec: Any) -> List[str]:
+    if not isinstance(spec, dict):
+        return []
+    found = [
+        spec[key]
+        for key in ("cmd", "command")
+        if isinstance(spec.get(key), str) and spec[key].strip()
+    ]
+    for item in spec.get("items") or []:
+        found.extend(_spec_commands(item))
+    return found
+
+
+def _walk(items: Any, prefix: str, config_dir: Path, out: List[Screen]) -> None:
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        name = str(item.get("id") or item.get("title") or len(out))
+        sid = f"{prefix}/{name}" if prefix else name
+        screen = Screen(id=sid, title=str(item.get("title") or sid), item=item)
+        for key, role in _CMD_KEYS:
+            value = item.get(key)
+            if isinstance(value, str) and value.strip():
+                screen.commands.append((role, value.strip()))
+        for key, role in _YAML_KEYS:
+            ref = item.get(key)
+            path = _resolve(config_dir, ref) if isinstance(ref, str) else None
+            if path is not None:
+                screen.commands.extend(
+                    (role, c.strip()) for c in _spec_commands(load_yaml(path))
+                )
+        if screen.commands:
+            out.append(screen)
+        for key in ("children", "items"):
+            _walk(item.get(key), sid, config_dir, out)
+
+
+def load_screens(config_dir: Path) -> List[Screen]:
+    """Screens with commands from `<config_dir>/chi-index.yaml`, depth first."""
+    index = load_yaml(config_dir / INDEX_FILE)
+    out: List[Screen] = []
+    if isinstance(index, dict):
+        _walk(index.get("menu"), "", config_dir, out)
+    return out
@@ -0,0 +1,161 @@
+"""Backend cold-start and latency probes for `chi-admin doctor --perf`.
+
+The backend is launched as the TUI launches it. Import cost comes from
+`PYTHONPROFILEIMPORTTIME=1` (the env form of `-X importtime`, so console
+scripts and wrappers work too). `--version` and `schema` are timed end to
+end, and `schema` runs with `CHI_TIMINGS=1` to get per-command generation
+times from SDK backends.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# A module is flagged when its cumulative import time is this share of the total
+DOMINANT_SHARE = 0.2
+DOMINANT_MIN_MS = 10.0
+# Schema generation slower than this (per command) is flagged
+SLOW_SCHEMA_MS = 50.0
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Rows of `-X importtime` output: module, self_ms, cumulative_ms, depth."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m:
+            rows.append(
+                {
+                    "module": m.group(4),
+                    "self_ms": int(m.group(1)) / 1000,
+                    "cumulative_ms": int(m.group(2)) / 1000,
+                    "depth": max(len(m.group(3)) - 1, 0) // 2,
+                }
+            )
+    return rows
+
+
+def _run(argv: List[str], env: Dict[str, str], timeout: float) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(argv, env=env, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"ok": False, "error": "timeout", "ms": timeout * 1000}
+    except OSError as e:
+        return {"ok": False, "error": str(e), "ms": None}
+    return {
+        "ok": proc.returncode == 0,
+        "ms": (time.perf_counter() - start) * 1000,
+        "stdout": proc.stdout,
+        "stderr": proc.stderr,
+        "exit_code": proc.returncode,
+    }
+
+
+def _median(samples: List[Dict[str, Any]]) -> Optional[float]:
+    values = [s["ms"] for s in samples if s["ok"]]
+    return round(statistics.median(values), 3) if values else None
+
+
+def _interpreter(argv0: str) -> str:
+    """The Python a console script runs under (from its shebang)."""
+    try:
+        with open(argv0, "rb") as fh:
+            first = fh.readline(256)
+    except OSError:
+        return sys.executable
+    if first.startswith(b"#!") and b"python" in first:
+        parts = first[2:].decode("utf-8", "replace").split()
+        if parts and os.path.basename(parts[0]) == "env" and len(parts) > 1:
+            return parts[1]
+        return parts[0] if parts else sys.executable
+    return sys.executable
+
+
+def _last_json(out: bytes) -> Any:
+    for line in reversed(out.splitlines()):
+        try:
+            return json.loads(line)
+        except ValueError:
+            continue
+    try:
+        return json.loads(out)
+    except ValueError:
+        return None
+
+
+def backend_perf(
+    argv: List[str], *, runs: int = 3, timeout: float = 60, top: int = 10
+) -> Dict[str, Any]:
+    """Measure cold start, import cost and schema latency of `argv`."""
+    env = dict(os.environ, CHI_TUI_JSON="1")
+    report: Dict[str, Any] = {"command": argv, "runs": runs}
+    warnings: List[str] = []
+
+    interp = [_interpreter(argv[0]), "-c", "pass"]
+    report["interpreter_ms"] = _median(
+        [_run(interp, env, timeout) for _ in range(runs)]
+    )
+
+    version = [_run(argv + ["--version"], env, timeout) for _ in range(runs)]
+    report["version_ms"] = _median(version)
+    if not any(s["ok"] for s in version):
+        warnings.append(f"'{' '.join(argv)} --version' failed")
+
+    traced = _run(argv + ["--version"], dict(env, PYTHONPROFILEIMPORTTIME="1"), timeout)
+    rows = parse_importtime((traced.get("stderr") or b"").decode("utf-8", "replace"))
+    total = sum(r["self_ms"] for r in rows)
+    top_level = sorted(
+        (r for r in rows if r["depth"] == 0),
+        key=lambda r: r["cumulative_ms"],
+        reverse=True,
+    )
+    report["imports"] = {
+        "modules": len(rows),
+        "total_ms": round(total, 3),
+        "top_cumulative": top_level[:top],
+        "top_self": sorted(rows, key=lambda r: r["self_ms"], reverse=True)[:top],
+    }
+    dominant = [
+        r
+        for r in top_level
+        if r["cumulative_ms"] >= max(DOMINANT_MIN_MS, DOMINANT_SHARE * total)
+    ]
+    report["imports"]["dominant"] = [r["module"] for r in dominant]
+    for r in dominant:
+        share = r["cumulative_ms"] / total * 100 if total else 0
+        warnings.append(
+            f"import of '{r['module']}' takes {r['cumulative_ms']:.1f} ms "
+            f"({share:.0f}% of imports); consider importing it lazily"
+        )
+
+    schema_env = dict(env, CHI_TIMINGS="1")
+    schema = [_run(argv + ["schema"], schema_env, timeout) for _ in range(runs)]
+    report["schema_ms"] = _median(schema)
+    last = next((s for s in reversed(schema) if s["ok"]), None)
+    if last is None:
+        warnings.append(f"'{' '.join(argv)} schema' failed")
+    else:
+        report["schema_bytes"] = len(last["stdout"].strip())
+        doc = _last_json(last["stdout"])
+        per_command = {}
+        if isinstance(doc, dict):
+            per_command = (doc.get("meta") or {}).get("timings", {}).get("schema_ms")
+        slow = {k: v for k, v in (per_command or {}).items() if v >= SLOW_SCHEMA_MS}
+        report["schema_commands_ms"] = per_command or None
+        report["slow_schema_commands"] = sorted(slow, key=slow.get, reverse=True)
+        for name in report["slow_schema_commands"]:
+            warnings.append(
+                f"schema for '{name}' takes {slow[name]:.1f} ms to generate"
+            )
+    report["warnings"] = warnings
+    return report
@@ -0,0 +1,496 @@
+"""Fetch chi-tui release binaries for `chi-admin ensure-chi --download`.
+
+The binary is extracted while the asset downloads (`.tar.gz` in `tarfile`
+stream mode, `.zip` through a bounded spool), without writing the archive to
+disk. Only when the transfer breaks off are the bytes received so far saved
+to a partial file, which is resumed with HTTP Range requests. Assets are
+checked against the release's sha256 checksums (the asset `digest` reported
+by GitHub, a `SHA256SUMS`/`checksums.txt` asset, or `<asset>.sha256`) before
+the binary is published. Extracted binaries are kept in a content-addressed
+store under `_cache_bin_path()`, keyed by the archive digest, so every project
+and virtualenv on the machine shares one verified copy.
+
+Release metadata (API responses and checksum files) is cached on disk and
+revalidated with `If-None-Match`: within `CHI_TUI_RELEASE_TTL` seconds
+(default 600) no request is made, after that a `304` costs one cheap call.
+Offline mode (`CHI_TUI_OFFLINE=1` or `ensure-chi --offline`) resolves from the
+cache only.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import http.client
+import json
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .utils import _cache_bin_path, _ensure_executable, _user_cache_dir
+
+CHUNK = 1 << 20
+DEFAULT_TTL = 600.0
+# Zip assets are spooled in memory up to this size (then to a temp file)
+SPOOL_MAX = 64 << 20
+_CHECKSUM_FILES = ("sha256sums", "sha256sums.txt", "checksums.txt", "checksums.sha256")
+_HEX64 = re.compile(r"^[0-9a-fA-F]{64}$")
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(Exception):
+    """A release asset could not be downloaded or failed verification."""
+
+
+class InvalidAsset(DownloadError):
+    """The asset arrived intact but cannot be used (checksum, contents)."""
+
+
+def api_url() -> str:
+    """Base URL of the GitHub REST API (`CHI_TUI_GH_API` for mirrors)."""
+    return os.environ.get("CHI_TUI_GH_API", "https://api.github.com").rstrip("/")
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def is_offline(offline: Optional[bool] = None) -> bool:
+    if offline is not None:
+        return offline
+    return os.environ.get("CHI_TUI_OFFLINE", "") in ("1", "true", "yes")
+
+
+def _ttl() -> float:
+    try:
+        return float(os.environ.get("CHI_TUI_RELEASE_TTL", DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+
+# ------------------------------------------------------------- metadata
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def cached_get(
+    url: str,
+    *,
+    accept: Optional[str] = None,
+    offline: Optional[bool] = None,
+    timeout: float = 20,
+) -> bytes:
+    """GET `url` through the on-disk metadata cache.
+
+    Fresh entries are returned without a request; stale ones are revalidated
+    with their `ETag`. When the network or the server fails (including the
+    403/429 of a rate limit), a stale entry is still used.
+    """
+    base = _user_cache_dir() / "releases" / _url_key(url)
+    body_path, meta_path = base.with_suffix(".body"), base.with_suffix(".json")
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        body: Optional[bytes] = body_path.read_bytes()
+    except (OSError, ValueError):
+        meta, body = {}, None
+    if body is not None and (
+        is_offline(offline) or time.time() - meta.get("fetched_at", 0) < _ttl()
+    ):
+        return body
+    if is_offline(offline):
+        raise DownloadError(f"offline and {url} is not cached")
+
+    req = urllib.request.Request(url)
+    if accept:
+        req.add_header("Accept", accept)
+    if body is not None and meta.get("etag"):
+        req.add_header("If-None-Match", meta["etag"])
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            fresh, etag = resp.read(), resp.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if body is None:
+            raise DownloadError(f"HTTP {e.code} for {url}") from e
+        if e.code != 304:
+            return body  # rate limited (403/429) or failing: stale beats nothing
+        fresh, etag = body, meta.get("etag")
+    except (OSError, http.client.HTTPException) as e:
+        if body is None:
+            raise DownloadError(f"{url}: {e}") from e
+        return body  # stale beats failing the install
+    base.parent.mkdir(parents=True, exist_ok=True)
+    if fresh is not body:
+        _write_atomic(body_path, fresh)
+    meta = {"url": url, "etag": etag, "fetched_at": time.time()}
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    return fresh
+
+
+def fetch_json(url: str, *, offline: Optional[bool] = None) -> Any:
+    """GitHub API JSON for `url`, via `cached_get`."""
+    body = cached_get(url, accept="application/vnd.github+json", offline=offline)
+    return json.loads(body.decode("utf-8"))
+
+
+def store_path(digest: str, binary_name: str) -> Path:
+    return _cache_bin_path() / "sha256" / digest / binary_name
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ------------------------------------------------------------- checksums
+def _parse_checksums(text: str, name: str, single: bool) -> Optional[str]:
+    for line in text.splitlines():
+        parts = line.split()
+        if not parts or not _HEX64.match(parts[0]):
+            continue
+        if single or (len(parts) > 1 and parts[-1].lstrip("*") == name):
+            return parts[0].lower()
+    return None
+
+
+def expected_sha256(
+    asset: Dict[str, Any],
+    assets: List[Dict[str, Any]],
+    *,
+    offline: Optional[bool] = None,
+) -> Optional[str]:
+    """sha256 the release publishes for `asset`, if any."""
+    digest = str(asset.get("digest") or "")
+    if digest.startswith("sha256:") and _HEX64.match(digest[7:]):
+        return digest[7:].lower()
+    name = str(asset.get("name", ""))
+    for other in assets:
+        other_name = str(other.get("name", "")).lower()
+        single = other_name == f"{name.lower()}.sha256"
+        url = other.get("browser_download_url")
+        if not url or not (single or other_name in _CHECKSUM_FILES):
+            continue
+        try:
+            text = cached_get(url, offline=offline).decode("utf-8", "replace")
+        except DownloadError:
+            continue
+        found = _parse_checksums(text, name, single)
+        if found:
+            return found
+    return None
+
+
+# ------------------------------------------------------------- download
+def _expected_total(resp: Any, have: int) -> Optional[int]:
+    m = _CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))
+    if m and m.group(3) != "*":
+        return int(m.group(3))
+    length = resp.headers.get("Content-Length")
+    return have + int(length) if length and length.isdigit() else None
+
+
+def download_resumable(
+    url: str,
+    part: Path,
+    *,
+    size: Optional[int] = None,
+    attempts: int = 4,
+    timeout: float = 60,
+) -> bool:
+    """Download `url` into `part`, resuming from its current length.
+
+    Interrupted transfers are retried with `Range: bytes=<have>-`; a server
+    that ignores the range (status 200) restarts the file. Returns whether
+    any bytes from an earlier attempt or run were reused.
+    """
+    part.parent.mkdir(parents=True, exist_ok=True)
+    resumed = False
+    for attempt in range(attempts):
+        have = part.stat().st_size if part.exists() else 0
+        if size and have == size:
+            return resumed
+        if size and have > size:
+            part.unlink()
+            have = 0
+        req = urllib.request.Request(url)
+        if have:
+            req.add_header("Range", f"bytes={have}-")
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                partial = have and getattr(resp, "status", 200) == 206
+                resumed = resumed or bool(partial)
+                total = size or _expected_total(resp, have if partial else 0)
+                with open(part, "ab" if partial else "wb") as fh:
+                    shutil.copyfileobj(resp, fh, CHUNK)
+            got = part.stat().st_size
+            if total is None or got == total:
+                return resumed
+            if got > total:
+                part.unlink()
+            error: Exception = DownloadError(f"short read: {got} of {total} bytes")
+        except urllib.error.HTTPError as e:
+            if e.code != 416:  # 416: stale partial file, start over
+                raise DownloadError(f"HTTP {e.code} for {url}") from e
+            part.unlink()
+            error = e
+        except (OSError, http.client.HTTPException) as e:
+            error = e
+        if attempt + 1 < attempts:
+            time.sleep(min(0.25 * 2**attempt, 5.0))
+    raise DownloadError(f"download failed after {attempts} attempts: {error}")
+
+
+# ------------------------------------------------------------- extraction
+def _is_binary_member(name: str, binary_name: str) -> bool:
+    base = name.replace("\\", "/").rsplit("/", 1)[-1]
+    return base == binary_name
+
+
+def _extract_tar(t: tarfile.TarFile, asset_name: str, binary_name: str, dest: Path):
+    for member in t:
+        if member.isfile() and _is_binary_member(member.name, binary_name):
+            src = t.extractfile(member)
+            if src is None:
+                break
+            with src, open(dest, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK)
+            return
+    raise InvalidAsset(f"{binary_name} not found in {asset_name}")
+
+
+def _extract_zip(z: zipfile.ZipFile, asset_name: str, binary_name: str, dest: Path):
+    name = next((n for n in z.namelist() if _is_binary_member(n, binary_name)), None)
+    if name is None:
+        raise InvalidAsset(f"{binary_name} not found in {asset_name}")
+    with z.open(name) as src, open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst, CHUNK)
+
+
+def extract_binary(
+    archive: Path, asset_name: str, binary_name: str, dest: Path
+) -> None:
+    """Extract `binary_name` from a `.zip`/`.tar.gz` asset to `dest`."""
+    if asset_name.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive) as z:
+            _extract_zip(z, asset_name, binary_name, dest)
+    else:
+        with tarfile.open(archive, "r:gz") as t:
+            _extract_tar(t, asset_name, binary_name, dest)
+
+
+class _HashingReader:
+    """File-like wrapper hashing and counting every byte read.
+
+    With a `sink`, every byte is also written to it.
+    """
+
+    def __init__(self, src: Any, sink: Any = None):
+        self.src = src
+        self.sink = sink
+        self.sha256 = hashlib.sha256()
+        self.count = 0
+
+    def read(self, n: int = -1) -> bytes:
+        data = self.src.read(n)
+        self.sha256.update(data)
+        self.count += len(data)
+        if self.sink is not None:
+            self.sink.write(data)
+        return data
+
+    def drain(self) -> None:
+        while self.read(CHUNK):
+            pass
+
+
+def stream_extract(
+    url: str,
+    asset_name: str,
+    binary_name: str,
+    dest: Path,
+    *,
+    size: Optional[int] = None,
+    part: Optional[Path] = None,
+    timeout: float = 60,
+) -> str:
+    """Extract `binary_name` to `dest` while downloading; return the sha256.
+
+    `.tar.gz` assets are read in `tarfile` stream mode straight from the
+    response. Zip needs random access, so it goes through a spool that stays
+    in memory up to `SPOOL_MAX` bytes. With `part`, the received bytes are
+    also kept in such a spool and written to `part` only if the transfer
+    breaks off, so `download_resumable` can pick it up from there. The
+    caller verifies the digest before publishing `dest`.
+    """
+    is_zip = asset_name.lower().endswith(".zip")
+    with (
+        urllib.request.urlopen(url, timeout=timeout) as resp,
+        (
+            tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+            if is_zip or part is not None
+            else contextlib.nullcontext()
+        ) as spool,
+    ):
+        src = _HashingReader(resp, spool)
+        try:
+            if is_zip:
+                src.drain()
+                _check_size(src.count, size)
+                spool.seek(0)
+                with zipfile.ZipFile(spool) as z:  # type: ignore[arg-type]
+                    _extract_zip(z, asset_name, binary_name, dest)
+            else:
+                with tarfile.open(fileobj=src, mode="r|gz") as t:  # type: ignore[call-overload]
+                    _extract_tar(t, asset_name, binary_name, dest)
+            src.drain()  # hash the rest
+            _check_size(src.count, size)
+        except Exception as e:
+            # A truncated stream looks like a broken archive: only blame the
+            # asset once all of it has arrived.
+            if _complete(src, size):
+                raise
+            if part is not None and src.count:
+                part.parent.mkdir(parents=True, exist_ok=True)
+                spool.seek(0)
+                with open(part, "wb") as fh:
+                    shutil.copyfileobj(spool, fh, CHUNK)
+            raise DownloadError(
+                f"transfer of {asset_name} broke off after {src.count} bytes"
+            ) from e
+    return src.sha256.hexdigest()
+
+
+def _complete(src: _HashingReader, size: Optional[int]) -> bool:
+    try:
+        src.drain()
+    except (OSError, http.client.HTTPException):
+        return False
+    return size is None or src.count == size
+
+
+def _check_size(got: int, size: Optional[int]) -> None:
+    if size is not None and got != size:
+        raise DownloadError(f"short read: {got} of {size} bytes")
+
+
+def _publish(tmp: Path, final: Path) -> None:
+    _ensure_executable(tmp)
+    os.replace(tmp, final)
+
+
+def fetch_binary(
+    asset: Dict[str, Any],
+    assets: List[Dict[str, Any]],
+    binary_name: str,
+    *,
+    offline: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Return the verified store copy of `binary_name` from a release asset.
+
+    The binary is extracted while the asset streams in; if that transfer
+    fails, the download resumes from the bytes received, saved to a partial
+    file. The
+    result has `path`, `sha256` (of the archive), `verified` (a published
+    checksum matched), `cached` (no download needed) and `resumed`. Set
+    `CHI_TUI_REQUIRE_SHA256=1` to refuse assets without a published checksum.
+    Offline, only the store is consulted.
+    """
+    url = str(asset.get("browser_download_url") or "")
+    name = str(asset.get("name", ""))
+    expected = expected_sha256(asset, assets, offline=offline)
+    if expected is None and os.environ.get("CHI_TUI_REQUIRE_SHA256"):
+        raise InvalidAsset(f"no published sha256 for {name}")
+    index = _cache_bin_path() / "urls" / _url_key(url)
+    try:
+        known = expected or index.read_text(encoding="utf-8").strip()
+    except OSError:
+        known = None
+    if known and store_path(known, binary_name).is_file():
+        return {
+            "path": store_path(known, binary_name),
+            "sha256": known,
+            "verified": expected is not None,
+            "cached": True,
+            "resumed": False,
+        }
+
+    if is_offline(offline):
+        raise DownloadError(f"offline and {name} is not in the store")
+
+    part = _cache_bin_path() / "partial" / f"{_url_key(url)}.part"
+    size = asset.get("size") if isinstance(asset.get("size"), int) else None
+    resumed = False
+    digest: Optional[str] = None
+    store = _cache_bin_path() / "sha256"
+    store.mkdir(parents=True, exist_ok=True)
+    tmp = store / f".{binary_name}.{os.getpid()}.tmp"
+    try:
+        if not part.exists():  # a partial file from an earlier run: resume it
+            try:
+                digest = stream_extract(
+                    url, name, binary_name, tmp, size=size, part=part
+                )
+            except InvalidAsset:
+                raise
+            except Exception:
+                digest = None  # flaky transfer: resume from the partial file
+        if digest is None:
+            resumed = download_resumable(url, part, size=size)
+            digest = sha256_file(part)
+            try:
+                if expected and digest != expected:
+                    raise InvalidAsset(
+                        f"sha256 mismatch for {name}: {digest} != {expected}"
+                    )
+                extract_binary(part, name, binary_name, tmp)
+            except Exception:
+                part.unlink()  # complete but unusable: never resume it
+                raise
+        if expected and digest != expected:
+            raise InvalidAsset(f"sha256 mismatch for {name}: {digest} != {expected}")
+        final = store_path(digest, binary_name)
+        final.parent.mkdir(parents=True, exist_ok=True)
+        _publish(tmp, final)
+        if os.name == "posix":
+            final.chmod(0o555)  # shared through hard links: keep it read-only
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    index.parent.mkdir(parents=True, exist_ok=True)
+    index.write_text(digest, encoding="utf-8")
+    if part.exists():
+        part.unlink()
+    return {
+        "path": final,
+        "sha256": digest,
+        "verified": expected is not None,
+        "cached": False,
+        "resumed": resumed,
+    }
+
+
+def install_copy(source: Path, target: Path, *, link: bool = True) -> None:
+    """Atomically place `source` at `target`, hard-linking when possible."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    if tmp.exists():
+        tmp.unlink()
+    try:
+        if not link:
+            raise OSError
+        os.link(source, tmp)
+    except OSError:
+        shutil.copy2(source, tmp)
+    _publish(tmp, target)
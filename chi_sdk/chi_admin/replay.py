@@ -0,0 +1,300 @@
+"""Replay TUI navigation headlessly and time each screen (`chi-admin replay`).
+
+Every screen of `.tui/chi-index.yaml` is "entered" in menu order. The harness
+runs the commands the TUI would run for it: the item's own command (menu enter
+or lazy list load), then pane A/B loads (inline `pane_*_cmd` or the
+`cmd`/`command` of `pane_*_yaml`). For `lazy_items`/`autoload_items` lists it
+then expands the first `--follow` items through their `command` fields.
+"""
+
+import json
+import os
+import queue
+import statistics
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+
+from ..sdk import emit_ok
+from .nav import Screen, expand, extra_env, load_screens, resolve_app_bin
+
+LAZY_WIDGETS = ("lazy_items", "autoload_items")
+
+
+def _json_mode(ctx: Optional[click.Context] = None) -> bool:
+    ctx = ctx or click.get_current_context(silent=True)
+    env = os.getenv("CHI_TUI_JSON", "")
+    return bool(
+        (ctx and ctx.obj and ctx.obj.get("json")) or env in ("1", "true", "yes")
+    )
+
+
+def _pump(stream: Any, name: str, out: "queue.Queue[Tuple[float, str, bytes]]"):
+    for line in iter(stream.readline, b""):
+        out.put((time.perf_counter(), name, line))
+    out.put((time.perf_counter(), name, b""))
+
+
+def run_step(argv: List[str], env: Dict[str, str], timeout: float) -> Dict[str, Any]:
+    """Run one command; time to the first envelope and to the result."""
+    start = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            argv, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        return {"ok": False, "error": "spawn_error", "message": str(e)}
+    lines: "queue.Queue[Tuple[float, str, bytes]]" = queue.Queue()
+    for stream, name in ((proc.stdout, "stdout"), (proc.stderr, "stderr")):
+        threading.Thread(target=_pump, args=(stream, name, lines), daemon=True).start()
+
+    first: Optional[float] = None
+    result_at: Optional[float] = None
+    result: Any = None
+    raw: Dict[str, bytes] = {"stdout": b"", "stderr": b""}
+    open_streams = 2
+    deadline = start + timeout
+    while open_streams:
+        try:
+            ts, name, line = lines.get(timeout=max(0.0, deadline - time.perf_counter()))
+        except queue.Empty:
+            proc.kill()
+            proc.wait()
+            return {
+                "ok": False,
+                "error": "timeout",
+                "first_envelope_ms": _ms(first, start),
+            }
+        if not line:
+            open_streams -= 1
+            continue
+        raw[name] += line
+        try:
+            doc = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(doc, dict):
+            continue
+        if first is None:
+            first = ts
+        if doc.get("type") in ("result", "error") and result_at is None:
+            result_at, result = ts, doc
+    rc = proc.wait()
+    end = time.perf_counter()
+    if result is None:  # raw JSON (not an envelope) counts once complete
+        try:
+            result = json.loads(raw["stdout"])
+            first = first or end
+        except ValueError:
+            result = None
+        result_at = end
+    failed = isinstance(result, dict) and result.get("ok") is False
+    ok = rc == 0 and result is not None and not failed
+    step: Dict[str, Any] = {
+        "ok": ok,
+        "first_envelope_ms": _ms(first, start),
+        "result_ms": _ms(result_at, start),
+        "exit_code": rc,
+    }
+    if not ok:
+        data = result.get("data") if isinstance(result, dict) else None
+        step["error"] = (data or {}).get("code") if isinstance(data, dict) else None
+        step["error"] = step["error"] or f"exit_{rc}"
+    step["_doc"] = result
+    return step
+
+
+def _ms(ts: Optional[float], start: float) -> Optional[float]:
+    return None if ts is None else round((ts - start) * 1000, 3)
+
+
+def _unwrap(doc: Any, path: Optional[str]) -> List[Any]:
+    """Items of a lazy list result (`unwrap` is a dotted path into the data)."""
+    bases = [doc]
+    if isinstance(doc, dict) and "data" in doc and "type" in doc:
+        bases.insert(0, doc["data"])
+    for base in bases:
+        node = base
+        for key in (path or "items").split("."):
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, list):
+            return node
+        if path is None and isinstance(base, list):
+            return base
+    return []
+
+
+def replay_screen(
+    screen: Screen,
+    app_bin: Optional[str],
+    env: Dict[str, str],
+    *,
+    follow: int,
+    timeout: float,
+) -> Dict[str, Any]:
+    steps: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    for role, line in screen.commands:
+        step = run_step(expand(line, app_bin), env, timeout)
+        step.update(role=role, command=line)
+        steps.append(step)
+        lazy = role == "command" and screen.item.get("widget") in LAZY_WIDGETS
+        if lazy and follow and step["ok"]:
+            items = _unwrap(step.get("_doc"), screen.item.get("unwrap"))
+            follow_ups = [
+                it["command"]
+                for it in items
+                if isinstance(it, dict) and isinstance(it.get("command"), str)
+            ]
+            for cmd in follow_ups[:follow]:
+                sub = run_step(expand(cmd, app_bin), env, timeout)
+                sub.update(role="item", command=cmd)
+                steps.append(sub)
+    total = (time.perf_counter() - started) * 1000
+    for step in steps:
+        step.pop("_doc", None)
+    return {
+        "screen": screen.id,
+        "title": screen.title,
+        "first_envelope_ms": steps[0].get("first_envelope_ms") if steps else None,
+        "result_ms": round(total, 3),
+        "ok": all(s["ok"] for s in steps),
+        "steps": steps,
+    }
+
+
+def _median(values: List[Optional[float]]) -> Optional[float]:
+    present = [v for v in values if v is not None]
+    return round(statistics.median(present), 3) if present else None
+
+
+def _parse_budgets(specs: Tuple[str, ...]) -> Dict[str, float]:
+    budgets = {}
+    for spec in specs:
+        screen, sep, ms = spec.rpartition("=")
+        try:
+            if not sep:
+                raise ValueError(spec)
+            budgets[screen] = float(ms)
+        except ValueError:
+            raise click.BadParameter(f"expected SCREEN=MS, got {spec!r}")
+    return budgets
+
+
+@click.command("replay")
+@click.option(
+    "--config", "config_path", default=".tui", show_default=True, help="Config dir"
+)
+@click.option(
+    "--app-bin",
+    default=None,
+    help="Backend CLI (default: CHI_APP_BIN or app_bin in config.yaml)",
+)
+@click.option(
+    "--screen",
+    "only",
+    multiple=True,
+    help="Replay only screens whose id starts with this (repeatable)",
+)
+@click.option(
+    "--follow",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="Lazy list items to expand per list",
+)
+@click.option(
+    "-n",
+    "--runs",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Replays; medians are reported",
+)
+@click.option(
+    "--budget-ms",
+    default=None,
+    type=float,
+    help="Time-to-result budget for every screen",
+)
+@click.option(
+    "--budget",
+    "budget_specs",
+    multiple=True,
+    metavar="SCREEN=MS",
+    help="Per-screen time-to-result budget (repeatable)",
+)
+@click.option(
+    "--timeout", default=60.0, show_default=True, help="Per-command timeout (s)"
+)
+@click.pass_context
+def replay_cmd(
+    ctx,
+    config_path: str,
+    app_bin: Optional[str],
+    only: Tuple[str, ...],
+    follow: int,
+    runs: int,
+    budget_ms: Optional[float],
+    budget_specs: Tuple[str, ...],
+    timeout: float,
+):
+    """Replay TUI navigation and report per-screen latency.
+
+    For each screen: time to the first envelope and time until every command
+    of the screen has produced its result. Exits with status 1 when a screen
+    fails or exceeds its budget.
+    """
+    cfg_dir = Path(config_path)
+    app = resolve_app_bin(cfg_dir, app_bin)
+    budgets = _parse_budgets(budget_specs)
+    screens = [s for s in load_screens(cfg_dir) if not only or s.id.startswith(only)]
+    if not screens:
+        raise click.UsageError(f"No screens with commands in {cfg_dir}/chi-index.yaml")
+    env = dict(os.environ, **extra_env(cfg_dir))
+    env.setdefault("CHI_TUI_JSON", "1")
+
+    rows = []
+    for screen in screens:
+        attempts = [
+            replay_screen(screen, app, env, follow=follow, timeout=timeout)
+            for _ in range(runs)
+        ]
+        row = dict(attempts[-1])
+        row["first_envelope_ms"] = _median([a["first_envelope_ms"] for a in attempts])
+        row["result_ms"] = _median([a["result_ms"] for a in attempts])
+        row["ok"] = all(a["ok"] for a in attempts)
+        budget = budgets.get(screen.id, budget_ms)
+        row["budget_ms"] = budget
+        row["over_budget"] = bool(budget is not None and row["result_ms"] > budget)
+        rows.append(row)
+
+    failed = [r["screen"] for r in rows if not r["ok"]]
+    over = [r["screen"] for r in rows if r["over_budget"]]
+    payload = {
+        "app_bin": app,
+        "runs": runs,
+        "screens": rows,
+        "failed": failed,
+        "over_budget": over,
+    }
+    if _json_mode(ctx):
+        emit_ok(payload, command="chi-admin replay")
+    else:
+        width = max(len(r["screen"]) for r in rows)
+        click.echo(f"{'screen':<{width}}  {'first':>9}  {'result':>9}  budget")
+        for r in rows:
+            first = r["first_envelope_ms"]
+            mark = "FAIL" if not r["ok"] else ("OVER" if r["over_budget"] else "")
+            click.echo(
+                f"{r['screen']:<{width}}  "
+                f"{'-' if first is None else f'{first:.1f}':>9}  "
+                f"{r['result_ms']:>9.1f}  "
+                f"{'-' if r['budget_ms'] is None else r['budget_ms']:<6} {mark}".rstrip()
+            )
+    if failed or over:
+        raise click.exceptions.Exit(1)
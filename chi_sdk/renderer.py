@@ -1,11 +1,36 @@
 """Human-readable output renderer for CLI commands."""
 
-from typing import Any
+from itertools import chain, islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+from typing import get_args, get_origin
+import collections.abc
 import json
+import os
+import shutil
+import sys
 import click
+from pydantic import BaseModel
 
+# Rows inspected to infer table columns and widths
+TABLE_SAMPLE = 100
+# Upper bound on a column's width (longer cells are truncated with "…")
+TABLE_MAX_COL = 40
+# Lines joined into one write
+_CHUNK_LINES = 1000
 
-def render_human_output(data: Any) -> None:
+
+def render_human_output(data: Any, columns: Optional[Sequence[str]] = None) -> None:
     """
     Render command output in a human-readable format.
 
@@ -14,29 +39,33 @@ def render_human_output(data: Any) -> None:
     - Lists with 'items' key are formatted as bullet points
     - Single-field dicts show just the value
     - Multi-field dicts show as key: value pairs
+    - Other lists of dicts (and iterators of rows) become an aligned table
     - Complex structures fall back to formatted JSON
 
     Args:
         data: The data to render (typically a dict from Pydantic model)
+        columns: Table columns for rows, e.g. from `table_columns(model)`
     """
     if isinstance(data, str):
         click.echo(data)
     elif isinstance(data, dict):
-        _render_dict(data)
+        _render_dict(data, columns)
     elif isinstance(data, list):
-        _render_list(data)
+        _render_list(data, columns)
+    elif isinstance(data, Iterator):
+        render_table(data, columns)
     else:
         # Default JSON output for other types
-        click.echo(json.dumps(data, indent=2, ensure_ascii=False))
+        click.echo(json.dumps(data, indent=2, ensure_ascii=False, default=str))
 
 
-def _render_dict(data: dict) -> None:
+def _render_dict(data: dict, columns: Optional[Sequence[str]] = None) -> None:
     """Render a dictionary in human-readable format."""
     # Special handling for ItemsOut-like structures
     if "items" in data and isinstance(data["items"], list):
         items = data["items"]
         if items:
-            _render_items_list(items)
+            _render_items_list(items, columns)
         else:
             click.echo("No items found.")
     elif len(data) == 1:
@@ -45,17 +74,19 @@ def _render_dict(data: dict) -> None:
         if isinstance(value, str):
             click.echo(value)
         else:
-            click.echo(json.dumps(value, ensure_ascii=False))
+            click.echo(json.dumps(value, ensure_ascii=False, default=str))
     else:
         # Multi-field dict - show as key: value pairs
         for key, value in data.items():
             if isinstance(value, (str, int, float, bool)):
                 click.echo(f"{key}: {value}")
             else:
-                click.echo(f"{key}: {json.dumps(value, ensure_ascii=False)}")
+                click.echo(
+                    f"{key}: {json.dumps(value, ensure_ascii=False, default=str)}"
+                )
 
 
-def _render_list(data: list) -> None:
+def _render_list(data: list, columns: Optional[Sequence[str]] = None) -> None:
     """Render a list in human-readable format."""
     if not data:
         click.echo("No items found.")
@@ -67,13 +98,13 @@ def _render_list(data: list) -> None:
             click.echo(f"• {item}")
     # Check if all items are dicts with title/name
     elif all(isinstance(item, dict) for item in data):
-        _render_items_list(data)
+        _render_items_list(data, columns)
     else:
         # Mixed or complex items - use JSON
-        click.echo(json.dumps(data, indent=2, ensure_ascii=False))
+        click.echo(json.dumps(data, indent=2, ensure_ascii=False, default=str))
 
 
-def _render_items_list(items: list) -> None:
+def _render_items_list(items: list, columns: Optional[Sequence[str]] = None) -> None:
     """Render a list of item dictionaries."""
     # If items have 'title' or 'name', display as a simple list
     if all(
@@ -102,6 +133,246 @@ def _render_items_list(items: list) -> None:
         if last_command:
             click.echo()  # Empty line for spacing
             click.echo(click.style(f"Hint: {last_command}", dim=True))
+    elif all(isinstance(item, dict) for item in items):
+        render_table(items, columns)
     else:
         # Fallback to JSON for complex items
-        click.echo(json.dumps({"items": items}, indent=2, ensure_ascii=False))
+        click.echo(
+            json.dumps({"items": items}, indent=2, ensure_ascii=False, default=str)
+        )
+
+
+def table_columns(model: Any) -> Optional[List[str]]:
+    """Row columns declared by an output model, if it describes rows.
+
+    Models with an `items: List[Row]` field yield the fields of `Row`; other
+    list-of-model fields are used when they are the model's only field.
+    """
+    fields = getattr(model, "model_fields", None) or {}
+    rows = {k: _row_model(f.annotation) for k, f in fields.items()}
+    row = rows.get("items") or (rows.popitem()[1] if len(rows) == 1 else None)
+    return list(row.model_fields) if row is not None else None
+
+
+# Annotations whose model argument describes rows (not e.g. Dict values)
+_ROW_ORIGINS = (
+    list,
+    tuple,
+    collections.abc.Sequence,
+    collections.abc.MutableSequence,
+)
+
+
+def _row_model(annotation: Any) -> Optional[type]:
+    origin = get_origin(annotation)
+    if origin is Union or type(annotation).__name__ == "UnionType":
+        # Optional[List[Row]] and List[Row] | None
+        rows = [_row_model(arg) for arg in get_args(annotation)]
+        return next((r for r in rows if r is not None), None)
+    if origin not in _ROW_ORIGINS:
+        return None
+    for arg in get_args(annotation):
+        if isinstance(arg, type) and issubclass(arg, BaseModel):
+            return arg
+    return None
+
+
+def _format_value(annotation: Any) -> Callable[[Any], str]:
+    """`key: value` formatter for a field, chosen from its annotation."""
+    if annotation in (str, int, float, bool):
+        return str
+
+    def fmt(value: Any) -> str:
+        if isinstance(value, (str, int, float, bool)):
+            return str(value)
+        return json.dumps(value, ensure_ascii=False, default=str)
+
+    return fmt
+
+
+def _compile_titled(row: type) -> Callable[[List[Dict[str, Any]]], None]:
+    fields = row.model_fields
+    label = "title" if "title" in fields else "name"
+    other = "name" if label == "title" and "name" in fields else None
+    tags = [(k, "[{}]") for k in ("value", "status") if k in fields]
+    if "id" in fields:
+        tags.append(("id", "[id:{}]"))
+    has_command = "command" in fields
+
+    def lines(items: List[Dict[str, Any]]) -> Iterator[str]:
+        for item in items:
+            title = item[label] or (other and item[other]) or str(item)
+            parts = [f"• {title}"]
+            parts.extend(fmt.format(item[k]) for k, fmt in tags)
+            yield " ".join(parts)
+
+    def render(items: List[Dict[str, Any]]) -> None:
+        for chunk in _chunks(lines(items)):
+            click.echo(chunk, nl=False)
+        hint = items[-1]["command"] if has_command else None
+        if hint:
+            click.echo()
+            click.echo(click.style(f"Hint: {hint}", dim=True))
+
+    return render
+
+
+def compile_renderer(model: Any) -> Optional[Callable[[Dict[str, Any]], None]]:
+    """Build the default human renderer for an output model's `model_dump()`.
+
+    The shape checks of `render_human_output` are resolved once from the
+    model's fields, leaving a loop over precomputed keys and formatters.
+    Returns None when the model defines `__str__` or has no fields.
+    """
+    fields = getattr(model, "model_fields", None)
+    if not fields or model.__str__ is not BaseModel.__str__:
+        return None
+    row = _row_model(fields["items"].annotation) if "items" in fields else None
+    if row is not None:
+        if "title" in row.model_fields or "name" in row.model_fields:
+            titled = _compile_titled(row)
+        else:
+            columns = list(row.model_fields)
+
+            def titled(items: List[Dict[str, Any]]) -> None:
+                render_table(items, columns)
+
+        def render_items(data: Dict[str, Any]) -> None:
+            if data["items"]:
+                titled(data["items"])
+            else:
+                click.echo("No items found.")
+
+        return render_items
+    if "items" in fields:
+        return None  # runtime shape (list or not) decides
+    if len(fields) == 1:
+        ((key, field),) = fields.items()
+        row = _row_model(field.annotation)
+        if row is not None:
+            columns = list(row.model_fields)
+            return lambda data: render_table(data[key], columns)
+
+        def render_value(data: Dict[str, Any]) -> None:
+            value = data[key]
+            if isinstance(value, str):
+                click.echo(value)
+            else:
+                click.echo(json.dumps(value, ensure_ascii=False, default=str))
+
+        return render_value
+    formats = [(k, _format_value(f.annotation)) for k, f in fields.items()]
+
+    def render_fields(data: Dict[str, Any]) -> None:
+        click.echo("\n".join(f"{k}: {fmt(data[k])}" for k, fmt in formats))
+
+    return render_fields
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.replace("\n", " ")
+    if isinstance(value, (bool, int, float)):
+        return str(value)
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _fit(text: str, width: int) -> str:
+    return text if len(text) <= width else text[: max(width - 1, 0)] + "…"
+
+
+def _table_lines(
+    rows: Iterable[Mapping[str, Any]],
+    columns: Optional[Sequence[str]],
+    width: Optional[int],
+    sample: int,
+) -> Iterator[str]:
+    it = iter(rows)
+    head = list(islice(it, sample))
+    if columns is None:
+        seen: dict = {}
+        for row in head:
+            seen.update(dict.fromkeys(row))
+        columns = list(seen)
+    if not columns:
+        return
+    widths = []
+    numeric = []
+    for col in columns:
+        values = [row.get(col) for row in head]
+        longest = max((len(_cell(v)) for v in values), default=0)
+        widths.append(min(max(len(col), longest), TABLE_MAX_COL))
+        numeric.append(
+            any(v is not None for v in values)
+            and all(
+                v is None or (isinstance(v, (int, float)) and not isinstance(v, bool))
+                for v in values
+            )
+        )
+    parts = [f"{{:{'>' if num else '<'}{w}}}" for w, num in zip(widths, numeric)]
+    template = "  ".join(parts)
+
+    def line(cells: List[str]) -> str:
+        # Numbers are never cut; a wider one shifts the rest of its row
+        fitted = (c if num else _fit(c, w) for c, w, num in zip(cells, widths, numeric))
+        out = template.format(*fitted).rstrip()
+        return out if width is None else _fit(out, width)
+
+    yield line([str(c) for c in columns])
+    yield line(["-" * w for w in widths])
+    for row in chain(head, it):
+        yield line([_cell(row.get(col)) for col in columns])
+
+
+def _chunks(lines: Iterator[str]) -> Iterator[str]:
+    batch: List[str] = []
+    for text in lines:
+        batch.append(text)
+        if len(batch) >= _CHUNK_LINES:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+
+def render_table(
+    rows: Iterable[Mapping[str, Any]],
+    columns: Optional[Sequence[str]] = None,
+    *,
+    width: Optional[int] = None,
+    sample: int = TABLE_SAMPLE,
+    pager: Optional[bool] = None,
+) -> None:
+    """Write `rows` as a column-aligned table, streaming from any iterable.
+
+    Columns (unless given) and their widths come from the first `sample`
+    rows; later rows reuse them, so memory stays flat for long iterators.
+    On a TTY, lines are truncated to the terminal width and output longer
+    than the screen goes through `$PAGER` (`CHI_NO_PAGER=1` disables
+    paging); redirected output is written in full. Lines are written in
+    large chunks.
+    """
+    tty = sys.stdout.isatty()
+    term = shutil.get_terminal_size()
+    it = iter(rows)
+    head = list(islice(it, sample))
+    if not head:
+        click.echo("No items found.")
+        return
+    if pager is None:
+        pager = tty and not os.getenv("CHI_NO_PAGER")
+        if pager:
+            # Look ahead at most a screenful: enough to know whether the
+            # whole table fits, without materializing a long iterator.
+            head.extend(islice(it, max(term.lines - 2 - len(head), 0)))
+            pager = len(head) + 2 >= term.lines
+    if width is None and tty:
+        width = term.columns
+    lines = _table_lines(chain(head, it), columns, width, sample)
+    if pager:
+        click.echo_via_pager(_chunks(lines))
+        return
+    for chunk in _chunks(lines):
+        click.echo(chunk, nl=False)
@@ -0,0 +1 @@
+"""CHI SDK runtime submodule: execution helpers used by generated commands."""
@@ -0,0 +1,75 @@
+"""Atomic checkpoint storage for resumable commands.
+
+Checkpoints are small JSON documents stored under the user cache dir, keyed
+by app, command and a hash of the validated input, so re-running the same
+command with the same input resumes where the previous run stopped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..chi_admin.utils import _user_cache_dir
+
+
+def input_hash(input_obj: Any) -> str:
+    """Stable sha256 of a validated input model (or None)."""
+    if input_obj is None:
+        payload: Any = None
+    elif hasattr(input_obj, "model_dump"):
+        payload = input_obj.model_dump(mode="json")
+    else:
+        payload = input_obj
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _safe(part: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in part) or "_"
+
+
+def checkpoint_path(app: str, command: str, key: str) -> Path:
+    return (
+        _user_cache_dir() / "checkpoints" / _safe(app) / _safe(command) / f"{key}.json"
+    )
+
+
+def save(path: Path, state: Any, percent: Optional[float]) -> None:
+    """Write the checkpoint atomically (temp file + fsync + rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = {"state": state, "percent": percent, "ts": time.time()}
+    fd, tmp = tempfile.mkstemp(prefix=".ckpt-", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(doc, fh, separators=(",", ":"))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def load(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            doc = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return doc if isinstance(doc, dict) and "state" in doc else None
+
+
+def clear(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
@@ -0,0 +1,261 @@
+"""Per-invocation command context and cooperative cancellation."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+
+class CommandCancelled(BaseException):
+    """Raised when a command is cancelled (deadline or signal).
+
+    Derives from BaseException (like KeyboardInterrupt) so broad
+    `except Exception` blocks in command code do not swallow it.
+    """
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancelToken:
+    """Thread-safe cancellation flag a command can poll.
+
+    - `cancelled` becomes True once the deadline passes or a signal arrives.
+    - `reason` is "timeout" (deadline), "cancelled" (SIGINT/SIGTERM) or
+      "memory_limit" (RSS watcher).
+    - `remaining()` returns seconds left until the deadline (None if unbounded).
+    - `on_cancel(fn)` registers `fn(reason)`, called once by the canceller.
+    """
+
+    def __init__(self, deadline: Optional[float] = None):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[str], None]] = []
+        self.reason: Optional[str] = None
+        self.deadline = deadline  # time.monotonic() based
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback(reason)
+
+    def on_cancel(self, callback: Callable[[str], None]) -> Callable[[], None]:
+        """Call `callback(reason)` on cancellation; returns an unregister hook.
+
+        The callback runs in the thread that cancels the token.
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+        def unregister() -> None:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+        return unregister
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep until cancelled or `timeout` elapses; returns `cancelled`."""
+        return self._event.wait(timeout)
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise CommandCancelled(self.reason or "cancelled")
+
+
+@dataclass
+class CommandContext:
+    """State of one command invocation.
+
+    Obtain it with `current_context()` or by declaring a `ctx` parameter on
+    the command function. `meta` is merged into the result envelope meta;
+    `stamp` is merged into the meta of every envelope of the invocation.
+    """
+
+    command: str
+    input: Any = None
+    token: CancelToken = field(default_factory=CancelToken)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    app: str = "chi"
+    last_percent: Optional[float] = None
+    started: float = field(default_factory=time.perf_counter)
+    error_code: Optional[str] = None  # set by emit_error during the run
+    cache_hits: int = 0
+    # (name, start, end) in time.perf_counter() seconds, in execution order
+    phases: List[Tuple[str, float, float]] = field(default_factory=list)
+    stamp: Dict[str, Any] = field(default_factory=dict)
+    tracer: Any = None  # runtime.tracing.Tracer when tracing is enabled
+    _percent_floor: Optional[float] = field(default=None, init=False, repr=False)
+    _checkpoint_file: Optional[Path] = field(default=None, init=False, repr=False)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def raise_if_cancelled(self) -> None:
+        self.token.raise_if_cancelled()
+
+    def remaining(self) -> Optional[float]:
+        return self.token.remaining()
+
+    @property
+    def traceparent(self) -> Optional[str]:
+        """W3C `traceparent` of this command's span (None when not tracing)."""
+        return self.tracer.traceparent() if self.tracer is not None else None
+
+    def subprocess_env(self, env: Optional[Mapping[str, str]] = None) -> Dict[str, str]:
+        """Environment for a subprocess spawned by the command.
+
+        A copy of `env` (default `os.environ`) whose `TRACEPARENT` points at
+        this command's span, so a backend call it spawns joins the trace.
+        """
+        child = dict(os.environ if env is None else env)
+        if self.traceparent is not None:
+            child["TRACEPARENT"] = self.traceparent
+        return child
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the wall-clock span of an execution phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start, time.perf_counter()))
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """Record a user sub-span (exported when tracing is enabled).
+
+        Yields the attribute dict, so values known only inside the block can
+        be added to it; a no-op when tracing is off.
+        """
+        if self.tracer is None:
+            yield attributes
+            return
+        with self.tracer.span(name, attributes) as attrs:
+            yield attrs
+
+    def _checkpoint_path(self) -> Path:
+        if self._checkpoint_file is None:
+            from . import checkpoint
+
+            key = checkpoint.input_hash(self.input)
+            self._checkpoint_file = checkpoint.checkpoint_path(
+                self.app, self.command, key
+            )
+        return self._checkpoint_file
+
+    def checkpoint(self, state: Any, *, percent: Optional[float] = None) -> None:
+        """Persist a JSON-serializable `state` snapshot atomically.
+
+        The snapshot is keyed by command and validated input; `percent`
+        defaults to the last value passed to `emit_progress`.
+        """
+        from . import checkpoint
+
+        pct = percent if percent is not None else self.last_percent
+        checkpoint.save(self._checkpoint_path(), state, pct)
+
+    def restore(self) -> Any:
+        """Return the last checkpointed state for this input (or None).
+
+        When a checkpoint exists, a `resumed` progress event is emitted at
+        the saved percent and later progress never drops below it.
+        """
+        from . import checkpoint
+
+        doc = checkpoint.load(self._checkpoint_path())
+        if doc is None:
+            return None
+        self.meta["resumed"] = True
+        pct = doc.get("percent")
+        if isinstance(pct, (int, float)):
+            from ..sdk import emit_progress
+
+            self._percent_floor = float(pct)
+            emit_progress(
+                "Resuming from checkpoint",
+                percent=pct,
+                stage="resumed",
+                command=self.command,
+            )
+        return doc["state"]
+
+    def clear_checkpoint(self) -> None:
+        if self._checkpoint_file is not None:
+            from . import checkpoint
+
+            checkpoint.clear(self._checkpoint_file)
+
+    def record_cache_hit(self, n: int = 1) -> None:
+        """Count a cache hit served by this invocation (exported as a metric)."""
+        self.cache_hits += n
+
+    def track_percent(self, percent: float) -> float:
+        if self._percent_floor is not None and percent < self._percent_floor:
+            percent = self._percent_floor
+        self.last_percent = percent
+        return percent
+
+
+_CURRENT: ContextVar[Optional[CommandContext]] = ContextVar(
+    "chi_command_context", default=None
+)
+
+
+def current_context() -> Optional[CommandContext]:
+    """Return the context of the command currently executing (or None)."""
+    return _CURRENT.get()
+
+
+@contextmanager
+def activate(run: CommandContext) -> Iterator[CommandContext]:
+    tok = _CURRENT.set(run)
+    try:
+        yield run
+    finally:
+        _CURRENT.reset(tok)
+
+
+# Envelope sinks: when set, emit_ok/emit_error/emit_progress hand envelopes to
+# the sink instead of writing them to stdout/stderr (used by job workers).
+EnvelopeSink = Callable[[Any], None]
+
+_SINK: ContextVar[Optional[EnvelopeSink]] = ContextVar(
+    "chi_envelope_sink", default=None
+)
+
+
+def current_sink() -> Optional[EnvelopeSink]:
+    return _SINK.get()
+
+
+@contextmanager
+def redirect_envelopes(sink: EnvelopeSink) -> Iterator[None]:
+    tok = _SINK.set(sink)
+    try:
+        yield
+    finally:
+        _SINK.reset(tok)
@@ -0,0 +1,163 @@
+"""Deadlines, signal-driven cancellation and grace-period enforcement.
+
+Budget sources (the smallest wins):
+- the per-command `timeout` passed to `chi_command` (seconds)
+- `CHI_DEADLINE_MS` in the environment (milliseconds from command start)
+
+When the deadline passes, or SIGINT/SIGTERM arrives, the command's
+`CancelToken` is triggered. The command then has a grace period
+(`grace_period` on `chi_command`, `CHI_GRACE_MS`, default 2s) to return a
+partial result before `CommandCancelled` is raised in the main thread.
+A second signal aborts immediately, as does cancellation with a reason in
+`ABORT_REASONS` (e.g. `memory_limit` from the RSS watcher), since waiting
+out the grace period would only let the process grow further.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .context import CancelToken, CommandCancelled
+
+DEFAULT_GRACE_S = 2.0
+ABORT_REASONS = frozenset({"memory_limit"})
+
+
+def _env_ms(name: str) -> Optional[float]:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return None
+    try:
+        return float(raw) / 1000.0
+    except ValueError:
+        return None
+
+
+def resolve_deadline(timeout: Optional[float]) -> Optional[float]:
+    """Return a `time.monotonic()` deadline, or None when unbounded."""
+    budgets = [b for b in (timeout, _env_ms("CHI_DEADLINE_MS")) if b is not None]
+    if not budgets:
+        return None
+    return time.monotonic() + max(0.0, min(budgets))
+
+
+def resolve_grace(grace_period: Optional[float]) -> float:
+    if grace_period is not None:
+        return grace_period
+    env = _env_ms("CHI_GRACE_MS")
+    return env if env is not None else DEFAULT_GRACE_S
+
+
+def interrupt_main() -> None:
+    """Deliver SIGINT to the main thread.
+
+    Inside `enforce`, a cancelled token turns it into `CommandCancelled`
+    carrying the token's reason.
+    """
+    main_ident = threading.main_thread().ident
+    if hasattr(signal, "pthread_kill") and main_ident is not None:
+        # A real signal also wakes the main thread from blocking sleeps.
+        signal.pthread_kill(main_ident, signal.SIGINT)
+    else:  # pragma: no cover - Windows
+        import _thread
+
+        _thread.interrupt_main()
+
+
+class enforce:
+    """Context manager wiring a `CancelToken` to its deadline and to signals.
+
+    Signal handlers and forced aborts are only installed when running in the
+    main thread; elsewhere cancellation is purely cooperative. Cancelling the
+    token from another thread (e.g. the memory watcher) starts the grace
+    period too, or aborts at once for `ABORT_REASONS`.
+    """
+
+    def __init__(self, token: CancelToken, grace: float):
+        self._token = token
+        self._grace = grace
+        self._main = threading.current_thread() is threading.main_thread()
+        self._stop = threading.Event()
+        self._force = False
+        self._grace_timer: Optional[threading.Timer] = None
+        # Re-entrant: a signal handler may run while the main thread holds it
+        self._lock = threading.RLock()
+        self._previous: Dict[int, Any] = {}
+        self._unregister: Optional[Callable[[], None]] = None
+
+    def __enter__(self) -> "enforce":
+        if self._main:
+            for name in ("SIGINT", "SIGTERM"):
+                signum = getattr(signal, name, None)
+                if signum is None:
+                    continue
+                try:
+                    self._previous[signum] = signal.signal(signum, self._on_signal)
+                except (ValueError, OSError):
+                    pass
+        self._unregister = self._token.on_cancel(self._on_cancel)
+        if self._token.deadline is not None:
+            threading.Thread(
+                target=self._watch, name="chi-deadline", daemon=True
+            ).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # A pending signal may raise CommandCancelled anywhere below: the
+        # original handlers are restored whatever happens.
+        try:
+            self._stop.set()
+            if self._unregister is not None:
+                self._unregister()
+            with self._lock:  # waits for an `_interrupt` in progress
+                timer = self._grace_timer
+            if timer is not None:
+                # A timer already past its `_stop` check has interrupted by
+                # now; any other one returns without interrupting.
+                timer.cancel()
+                timer.join()
+        finally:
+            for signum, handler in self._previous.items():
+                try:
+                    signal.signal(signum, handler)
+                except (ValueError, OSError):
+                    pass
+
+    def _on_signal(self, signum, frame) -> None:
+        if self._force or self._token.cancelled:
+            raise CommandCancelled(self._token.reason or "cancelled")
+        self._token.cancel("cancelled")
+        self._start_grace()
+
+    def _on_cancel(self, reason: str) -> None:
+        if reason in ABORT_REASONS:
+            self._interrupt()
+        else:
+            self._start_grace()
+
+    def _watch(self) -> None:
+        if self._stop.wait(self._token.remaining()):
+            return
+        self._token.cancel("timeout")
+        self._start_grace()
+
+    def _start_grace(self) -> None:
+        with self._lock:
+            if self._grace_timer is not None or self._stop.is_set():
+                return
+            self._grace_timer = threading.Timer(self._grace, self._interrupt)
+            self._grace_timer.daemon = True
+            self._grace_timer.start()
+
+    def _interrupt(self) -> None:
+        if not self._main:
+            return
+        with self._lock:
+            if self._stop.is_set():
+                return
+            self._force = True
+            interrupt_main()
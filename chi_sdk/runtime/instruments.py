@@ -0,0 +1,153 @@
+"""Opt-in instruments wrapped around a command invocation.
+
+An instrument has `start(run)` and `finish(run)`; `finish` is called once,
+before the result/error envelope is emitted, and records its findings in
+`run.meta`. An optional `close(run)` runs after the envelope went out, when
+the outcome (`run.error_code`) is known. Instruments are enabled by group options (stored in `ctx.obj`)
+or by environment variables, and their modules are only imported when used.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Protocol, Tuple
+
+import click
+
+from .context import CommandContext
+from .profiling import SORT_KEYS
+
+
+class Instrument(Protocol):
+    def start(self, run: CommandContext) -> None: ...
+
+    def finish(self, run: CommandContext) -> None: ...
+
+
+# (param decls, click.option kwargs) for the group-level instrument flags
+_OPTIONS: List[Tuple[Tuple[str, ...], Dict[str, Any]]] = [
+    # cProfile (runtime.profiling)
+    (("--profile",), dict(is_flag=True, help="Profile the command with cProfile")),
+    (
+        ("--profile-out",),
+        dict(
+            type=click.Path(dir_okay=False),
+            default=None,
+            help="Write .pstats here (implies --profile)",
+        ),
+    ),
+    (
+        ("--profile-sort",),
+        dict(
+            type=click.Choice(SORT_KEYS),
+            default=None,
+            help="Sort key for the meta.profile summary (default: cumulative)",
+        ),
+    ),
+    (
+        ("--profile-top",),
+        dict(
+            type=click.INT,
+            default=None,
+            help="Entries in the meta.profile summary (default: 20)",
+        ),
+    ),
+    (
+        ("--profile-filter",),
+        dict(default=None, help="Regex on file:line(function) to filter the summary"),
+    ),
+    # Sampling profiler (runtime.sampling)
+    (("--sample",), dict(is_flag=True, help="Sample stacks into a flamegraph file")),
+    (
+        ("--sample-hz",),
+        dict(type=click.FLOAT, default=None, help="Sampling rate in Hz (default: 100)"),
+    ),
+    (
+        ("--sample-out",),
+        dict(
+            type=click.Path(dir_okay=False),
+            default=None,
+            help="Write collapsed stacks here (implies --sample)",
+        ),
+    ),
+    (
+        ("--sample-mode",),
+        dict(
+            type=click.Choice(["cpu", "wall", "thread"]),
+            default=None,
+            help="cpu (SIGPROF), wall (SIGALRM) or thread sampling (default: cpu)",
+        ),
+    ),
+    # Memory (runtime.memory)
+    (
+        ("--memory",),
+        dict(is_flag=True, help="Report peak RSS and tracemalloc top allocations"),
+    ),
+    (
+        ("--memory-top",),
+        dict(
+            type=click.INT,
+            default=None,
+            help="Allocation sites in meta.memory (default: 10)",
+        ),
+    ),
+    (
+        ("--memory-limit",),
+        dict(
+            type=click.FLOAT,
+            default=None,
+            help="Abort with error code memory_limit above this RSS (MB)",
+        ),
+    ),
+    # Slow-command watchdog (runtime.watchdog)
+    (
+        ("--slow-threshold-ms",),
+        dict(
+            type=click.FLOAT,
+            default=None,
+            help="Dump stacks and report stage=slow past this many ms",
+        ),
+    ),
+    # Trace export (runtime.tracing)
+    (
+        ("--trace-out",),
+        dict(
+            type=click.Path(dir_okay=False),
+            default=None,
+            help="Append OTLP/JSON spans of the invocation to this file",
+        ),
+    ),
+]
+
+
+def group_options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator adding the instrument options to a click group callback."""
+    for decls, attrs in reversed(_OPTIONS):
+        f = click.option(*decls, **attrs)(f)
+    return f
+
+
+def collect(obj: Dict[str, Any]) -> List[Instrument]:
+    found: List[Instrument] = []
+
+    from .memory import from_options as _memory
+    from .metrics import from_options as _metrics
+    from .profiling import from_options as _profiler
+    from .sampling import from_options as _sampler
+    from .tracing import from_options as _tracer
+    from .watchdog import from_options as _watchdog
+
+    for factory in (_tracer, _profiler, _sampler, _memory, _watchdog, _metrics):
+        inst = factory(obj)
+        if inst is not None:
+            found.append(inst)
+    return found
+
+
+def close(found: List[Instrument], run: CommandContext) -> None:
+    for inst in found:
+        closer = getattr(inst, "close", None)
+        if closer is not None:
+            try:
+                closer(run)
+            except Exception:
+                pass  # never let bookkeeping change the command's outcome
@@ -0,0 +1,334 @@
+"""Background jobs: detached workers with state in a SQLite (WAL) store.
+
+A command registered with `chi_command(job=True)` does not run inline.
+The invocation records a job, starts a detached worker and returns the job id
+right away. The worker runs the command with its envelopes redirected into the
+store: the latest progress snapshot and the final result/error envelope.
+The `jobs` subcommands added by `build_cli` read the store, so polling is a
+single indexed query instead of a long-lived streaming process.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..chi_admin.utils import _user_cache_dir
+from ..models import Envelope, ErrorPayload
+from .context import redirect_envelopes
+
+JOB_ENV = "CHI_JOB_ID"
+
+FINISHED = ("succeeded", "failed", "cancelled", "lost")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    app TEXT NOT NULL,
+    command TEXT NOT NULL,
+    params TEXT,
+    status TEXT NOT NULL,
+    pid INTEGER,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    progress TEXT,
+    envelope TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_app_created ON jobs (app, created);
+"""
+
+
+def _db_path() -> Path:
+    return _user_cache_dir() / "jobs.sqlite3"
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    path = _db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=10, isolation_level=None)
+    try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        yield conn
+    finally:
+        conn.close()
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    if os.name != "posix":
+        return True  # no cheap liveness probe; trust the recorded status
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _row_to_status(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "command": row["command"],
+        "params": json.loads(row["params"]) if row["params"] else None,
+        "status": row["status"],
+        "pid": row["pid"],
+        "created": row["created"],
+        "started": row["started"],
+        "finished": row["finished"],
+        "progress": json.loads(row["progress"]) if row["progress"] else None,
+    }
+
+
+def _sweep(conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[sqlite3.Row]:
+    """Mark jobs whose worker died without a final envelope as 'lost'."""
+    out = []
+    for row in rows:
+        if (
+            row["status"] in ("running", "cancelling")
+            and row["pid"]
+            and not _pid_alive(row["pid"])
+        ):
+            # Killed or crashed. Queued jobs have no pid yet: their worker
+            # may still be starting.
+            conn.execute(
+                "UPDATE jobs SET status = 'lost', finished = ? WHERE id = ? AND status = ?",
+                (time.time(), row["id"], row["status"]),
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (row["id"],)
+            ).fetchone()
+        out.append(row)
+    return out
+
+
+def get_status(job_id: str) -> Optional[Dict[str, Any]]:
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return _row_to_status(_sweep(conn, [row])[0])
+
+
+def list_jobs(app: str, limit: int = 50) -> List[Dict[str, Any]]:
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE app = ? ORDER BY created DESC LIMIT ?",
+            (app, limit),
+        ).fetchall()
+        return [_row_to_status(r) for r in _sweep(conn, rows)]
+
+
+def get_envelope(job_id: str) -> Optional[str]:
+    """Return the final envelope (JSON text) of a finished job."""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT envelope FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+    return row["envelope"] if row else None
+
+
+def cancel(job_id: str) -> Optional[Dict[str, Any]]:
+    """Ask a running job to stop (SIGTERM triggers its cancel token).
+
+    A queued job is marked 'cancelling' and its worker finishes it without
+    running the command.
+    """
+    with _connect() as conn:
+        # The worker's queued -> running switch also takes the write lock,
+        # so the status and pid read here are the ones being cancelled.
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT status, pid FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        updated = conn.execute(
+            "UPDATE jobs SET status = 'cancelling' WHERE id = ? AND status IN ('queued', 'running')",
+            (job_id,),
+        ).rowcount
+        conn.execute("COMMIT")
+    if row is None:
+        return None
+    if updated and row["status"] == "running" and row["pid"]:
+        try:
+            os.kill(row["pid"], signal.SIGTERM)
+        except OSError:
+            pass
+    return get_status(job_id)
+
+
+@dataclass
+class JobHandle:
+    id: str
+    worker: bool  # True inside the worker process
+    forked: bool = False
+
+
+def _reexec_argv() -> List[str]:
+    orig = getattr(sys, "orig_argv", None)  # Python 3.10+
+    if orig:
+        return [sys.executable, *orig[1:]]
+    if sys.argv[0].endswith(".py"):
+        return [sys.executable, *sys.argv]
+    return list(sys.argv)
+
+
+def _detach_stdio() -> None:
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        try:
+            os.dup2(devnull, fd)
+        except OSError:
+            pass
+    os.close(devnull)
+
+
+def launch(app: str, command: str, params: Dict[str, Any]) -> JobHandle:
+    """Record a job and start its detached worker.
+
+    Returns a handle with `worker=False` in the submitting process. On POSIX
+    the worker is a double-forked child that returns here with
+    `worker=True` and must finish via `run_worker`. Elsewhere, or when the
+    process already runs other threads, the same command line is
+    re-executed with `CHI_JOB_ID` set.
+    """
+    # Popped, so jobs launched by this one's subprocesses are not mistaken
+    # for it
+    existing = os.environ.pop(JOB_ENV, None)
+    if existing:
+        return JobHandle(id=existing, worker=True)
+
+    job_id = uuid.uuid4().hex
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, app, command, params, status, created) VALUES (?, ?, ?, ?, 'queued', ?)",
+            (job_id, app, command, json.dumps(params, default=str), time.time()),
+        )
+
+    # Forking copies only the calling thread; locks held by other threads
+    # (instrument samplers, watchdogs, library pools) would stay locked in
+    # the worker. Fork only while single-threaded, otherwise re-execute.
+    if hasattr(os, "fork") and threading.active_count() == 1:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.setsid()
+                if os.fork() > 0:
+                    os._exit(0)
+                _detach_stdio()
+                return JobHandle(id=job_id, worker=True, forked=True)
+            except BaseException:
+                os._exit(1)
+        os.waitpid(pid, 0)
+        return JobHandle(id=job_id, worker=False)
+
+    env = os.environ.copy()
+    env[JOB_ENV] = job_id
+    flags = getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(
+        subprocess, "CREATE_NEW_PROCESS_GROUP", 0
+    )
+    subprocess.Popen(
+        _reexec_argv(),
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        creationflags=flags,
+        close_fds=True,
+        start_new_session=os.name == "posix",
+    )
+    return JobHandle(id=job_id, worker=False)
+
+
+class _StoreSink:
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.final = False
+
+    def __call__(self, env: Any) -> None:
+        text = env.model_dump_json()
+        with _connect() as conn:
+            if env.type == "progress":
+                conn.execute(
+                    "UPDATE jobs SET progress = ? WHERE id = ?",
+                    (json.dumps(env.data), self.job_id),
+                )
+                return
+            row = conn.execute(
+                "SELECT status FROM jobs WHERE id = ?", (self.job_id,)
+            ).fetchone()
+            if row is not None and row["status"] == "cancelling":
+                status = "cancelled"
+            else:
+                status = "succeeded" if env.ok else "failed"
+            conn.execute(
+                "UPDATE jobs SET status = ?, envelope = ?, finished = ? WHERE id = ?",
+                (status, text, time.time(), self.job_id),
+            )
+            self.final = True
+
+
+def run_worker(handle: JobHandle, body) -> None:
+    """Run `body()` as job `handle.id`, recording its envelopes in the store."""
+    sink = _StoreSink(handle.id)
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT command, status FROM jobs WHERE id = ?", (handle.id,)
+        ).fetchone()
+        if row is not None and row["status"] == "cancelling":
+            # Cancelled while queued: finish without running the command
+            env = Envelope(
+                ok=False,
+                type="error",
+                data=ErrorPayload(
+                    code="cancelled", message="Job cancelled before it started"
+                ).model_dump(),
+                command=row["command"],
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', envelope = ?, finished = ? WHERE id = ?",
+                (env.model_dump_json(), time.time(), handle.id),
+            )
+            conn.execute("COMMIT")
+            if handle.forked:
+                os._exit(1)
+            return
+        conn.execute(
+            "UPDATE jobs SET status = 'running', pid = ?, started = ? WHERE id = ?",
+            (os.getpid(), time.time(), handle.id),
+        )
+        conn.execute("COMMIT")
+    code = 0
+    try:
+        with redirect_envelopes(sink):
+            body()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException as e:
+        code = getattr(e, "exit_code", 1)
+    finally:
+        if not sink.final:
+            with _connect() as conn:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished = ? WHERE id = ?",
+                    (time.time(), handle.id),
+                )
+        if handle.forked:
+            os._exit(code if isinstance(code, int) else 1)
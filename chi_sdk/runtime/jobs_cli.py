@@ -0,0 +1,99 @@
+"""`jobs` subcommands added to every CLI built with `build_cli`."""
+
+from __future__ import annotations
+
+import json
+
+import click
+
+from ..renderer import render_human_output
+from ..sdk import _json_mode, emit_error, emit_ok
+from . import jobs
+
+
+def _app(ctx: click.Context) -> str:
+    root = ctx.find_root()
+    return (root.obj or {}).get("app") or root.info_name or "chi"
+
+
+def _not_found(job_id: str, command: str):
+    emit_error("job_not_found", f"No such job: {job_id}", command=command, exit_code=2)
+
+
+@click.group("jobs", help="Inspect and control background jobs")
+def jobs_group():
+    pass
+
+
+@jobs_group.command("list", help="List recent jobs of this app")
+@click.option("--limit", type=click.INT, default=50, show_default=True)
+@click.pass_context
+def jobs_list(ctx, limit: int):
+    items = jobs.list_jobs(_app(ctx), limit=limit)
+    if _json_mode(ctx):
+        emit_ok({"items": items}, command="jobs list")
+        return
+    if not items:
+        click.echo("No jobs found.")
+    for it in items:
+        pct = (it["progress"] or {}).get("percent")
+        suffix = f" {pct:.0f}%" if isinstance(pct, (int, float)) else ""
+        click.echo(f"{it['id']}  {it['status']:<10} {it['command']}{suffix}")
+
+
+@jobs_group.command("status", help="Show job state and latest progress")
+@click.argument("job_id")
+@click.pass_context
+def jobs_status(ctx, job_id: str):
+    status = jobs.get_status(job_id)
+    if status is None:
+        _not_found(job_id, "jobs status")
+        return
+    if _json_mode(ctx):
+        emit_ok(status, command="jobs status")
+    else:
+        render_human_output(status)
+
+
+@jobs_group.command("result", help="Print the final envelope of a job")
+@click.argument("job_id")
+@click.pass_context
+def jobs_result(ctx, job_id: str):
+    status = jobs.get_status(job_id)
+    if status is None:
+        _not_found(job_id, "jobs result")
+        return
+    envelope = jobs.get_envelope(job_id)
+    if envelope is None:
+        emit_error(
+            "job_not_finished",
+            f"Job {job_id} is {status['status']}",
+            command="jobs result",
+            details={"status": status["status"]},
+            exit_code=3,
+        )
+        return
+    env = json.loads(envelope)
+    if _json_mode(ctx):
+        # Replay the worker's envelope verbatim (stdout for results, stderr for errors)
+        click.echo(envelope, err=not env.get("ok"))
+    elif env.get("ok"):
+        render_human_output(env.get("data"))
+    else:
+        click.echo(f"Error: {(env.get('data') or {}).get('message')}", err=True)
+    if not env.get("ok"):
+        raise click.exceptions.Exit(1)
+
+
+@jobs_group.command("cancel", help="Request cancellation of a running job")
+@click.argument("job_id")
+@click.pass_context
+def jobs_cancel(ctx, job_id: str):
+    status = jobs.cancel(job_id)
+    if status is None:
+        _not_found(job_id, "jobs cancel")
+        return
+    if _json_mode(ctx):
+        emit_ok(status, command="jobs cancel")
+    else:
+        click.echo(f"{job_id}: {status['status']}")
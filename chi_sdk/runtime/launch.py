@@ -0,0 +1,136 @@
+"""Launch plan for the `ui` command, memoized across runs.
+
+Resolving where to launch the TUI from means upward searches for
+`.tui/chi-index.yaml`, parsing `.tui/config.yaml` and a PATH lookup for
+`chi-tui`. The result is cached per working directory and PATH under
+`<cache>/launch/`. An entry is reused while the stamps it recorded still
+match: the mtimes of every probed `.tui` directory, of `config.yaml`, of the
+runner and of the PATH directories searched for it (up to the one it was
+found in). Changes to the config or to PATH, including a `chi-tui` installed
+into a directory already on PATH, are therefore picked up on the next
+launch.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..chi_admin.utils import _user_cache_dir
+
+# Parent directories searched for markers (including the start directory)
+SEARCH_DEPTH = 6
+_APP_BIN = re.compile(r"(?m)^\s*app_bin\s*:\s*['\"]?([^'\"\s]+)['\"]?\s*$")
+
+
+@dataclass
+class LaunchPlan:
+    workdir: Optional[str] = None  # directory containing .tui/chi-index.yaml
+    config_dir: Optional[str] = None
+    app_bin: Optional[str] = None  # app_bin from .tui/config.yaml
+    runner: Optional[str] = None  # chi-tui resolved on PATH
+    stamps: Dict[str, Optional[int]] = field(default_factory=dict)
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _parents(start: Path) -> List[Path]:
+    out = [start]
+    while len(out) < SEARCH_DEPTH and out[-1].parent != out[-1]:
+        out.append(out[-1].parent)
+    return out
+
+
+def find_upwards(start: Path, marker: str) -> Optional[Path]:
+    """Nearest directory (from `start` upwards) that contains `marker`."""
+    for cur in _parents(start):
+        if (cur / marker).exists():
+            return cur
+    return None
+
+
+def read_app_bin(config_dir: Path) -> Optional[str]:
+    """`app_bin` from `config.yaml` (a small parse to avoid a yaml dependency)."""
+    try:
+        text = (config_dir / "config.yaml").read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    m = _APP_BIN.search(text)
+    return m.group(1) if m else None
+
+
+def find_rust_tui_dir() -> Optional[Path]:
+    # 1) Env override
+    env_dir = os.getenv("CHI_RUST_TUI_DIR") or os.getenv("CHI_TUI_RUST_DIR")
+    if env_dir and (Path(env_dir) / "Cargo.toml").exists():
+        return Path(env_dir)
+    # 2) Search upwards from CWD for rust-tui/Cargo.toml
+    root = find_upwards(Path.cwd(), "rust-tui/Cargo.toml")
+    if root:
+        return root / "rust-tui"
+    # 3) Editable install within this monorepo: relative to this file
+    for base in list(Path(__file__).resolve().parents)[:6]:
+        if (base / "rust-tui" / "Cargo.toml").exists():
+            return base / "rust-tui"
+    return None
+
+
+def _resolve(cwd: Path) -> LaunchPlan:
+    plan = LaunchPlan()
+    for cur in _parents(cwd):
+        plan.stamps[str(cur / ".tui")] = _mtime(cur / ".tui")
+        if (cur / ".tui" / "chi-index.yaml").exists():
+            plan.workdir = str(cur)
+            plan.config_dir = str(cur / ".tui")
+            plan.stamps[str(cur / ".tui" / "config.yaml")] = _mtime(
+                cur / ".tui" / "config.yaml"
+            )
+            plan.app_bin = read_app_bin(cur / ".tui")
+            break
+    plan.runner = shutil.which("chi-tui")
+    # Installing a binary changes its directory's mtime: a new chi-tui in an
+    # earlier PATH directory (or any, when none was found) invalidates the plan
+    for entry in os.environ.get("PATH", "").split(os.pathsep):
+        plan.stamps[entry or os.curdir] = _mtime(Path(entry or os.curdir))
+        if plan.runner and os.path.join(entry, "chi-tui") == plan.runner:
+            break
+    if plan.runner:
+        plan.stamps[plan.runner] = _mtime(Path(plan.runner))
+    return plan
+
+
+def _cache_file(cwd: Path) -> Path:
+    key = hashlib.sha256(f"{cwd}\0{os.environ.get('PATH', '')}".encode()).hexdigest()
+    return _user_cache_dir() / "launch" / f"{key[:32]}.json"
+
+
+def launch_plan(cwd: Optional[Path] = None) -> LaunchPlan:
+    """Resolved launch plan for `cwd`, from the cache when still valid."""
+    cwd = cwd or Path.cwd()
+    path = _cache_file(cwd)
+    try:
+        plan = LaunchPlan(**json.loads(path.read_text(encoding="utf-8")))
+        if all(_mtime(Path(p)) == m for p, m in plan.stamps.items()):
+            return plan
+    except (OSError, ValueError, TypeError):
+        pass
+    plan = _resolve(cwd)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(asdict(plan)), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only cache dir: resolve every time
+    return plan
@@ -0,0 +1,201 @@
+"""Memory instrumentation and a soft RSS limit for a command invocation.
+
+- `--memory` / `CHI_MEMORY=1` reports `meta.memory`: growth of the process
+  peak RSS during the command, the `tracemalloc` peak and the top-N
+  allocation sites still holding memory when the command finishes (caches,
+  leaks, the result itself; `--memory-top` / `CHI_MEMORY_TOP`, default 10).
+- `--memory-limit MB` / `CHI_MEMORY_LIMIT_MB` starts a watcher thread that
+  polls the resident set size; once it exceeds the limit the command's
+  token is cancelled with reason `memory_limit`, `enforce` interrupts the
+  main thread and the command fails with error code `memory_limit` instead
+  of being taken down by the OOM killer.
+
+Reporting traces every Python allocation and slows the command down; the
+limit alone only costs a cheap RSS read every `POLL_INTERVAL_S`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .context import CommandContext
+
+DEFAULT_TOP = 10
+POLL_INTERVAL_S = 0.05
+_MIB = 1024 * 1024
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size in bytes (Linux `/proc`), or None if unavailable."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """High-water mark of the resident set size in bytes."""
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_memory(memory: Dict[str, Any]) -> str:
+    """One-line human summary of `meta.memory` (for stderr)."""
+    parts = []
+    if memory.get("rss_peak_delta_bytes") is not None:
+        parts.append(f"rss peak +{memory['rss_peak_delta_bytes'] / _MIB:.1f}MiB")
+    if memory.get("traced_peak_bytes") is not None:
+        parts.append(f"traced peak {memory['traced_peak_bytes'] / _MIB:.1f}MiB")
+    if memory.get("limit_exceeded"):
+        parts.append(f"limit {memory['limit_bytes'] / _MIB:.0f}MiB exceeded")
+    return "memory: " + ", ".join(parts)
+
+
+class MemoryMonitor:
+    """Instrument measuring memory use and enforcing a soft RSS limit.
+
+    Args:
+        report: Collect `meta.memory` (RSS + tracemalloc).
+        top: Number of allocation sites kept in the report.
+        limit_bytes: Abort the command once its RSS exceeds this.
+    """
+
+    def __init__(
+        self,
+        *,
+        report: bool = True,
+        top: int = DEFAULT_TOP,
+        limit_bytes: Optional[int] = None,
+    ):
+        self.report = report
+        self.top = top
+        self.limit_bytes = limit_bytes
+        self.exceeded_at: Optional[int] = None
+        self._peak_before: Optional[int] = None
+        self._started_tracing = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ----- soft limit -----
+    def _watch(self, run: CommandContext) -> None:
+        while not self._stop.wait(POLL_INTERVAL_S):
+            rss = current_rss()
+            if rss is None:
+                rss = peak_rss()
+            if rss is None or self.limit_bytes is None or rss <= self.limit_bytes:
+                continue
+            self.exceeded_at = rss
+            # `enforce` turns this into an abort of the main thread
+            run.token.cancel("memory_limit")
+            return
+
+    # ----- instrument protocol -----
+    def start(self, run: CommandContext) -> None:
+        if self.report:
+            import tracemalloc
+
+            self._peak_before = peak_rss()
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._started_tracing = True
+        if self.limit_bytes is not None:
+            self._thread = threading.Thread(
+                target=self._watch, args=(run,), name="chi-memory", daemon=True
+            )
+            self._thread.start()
+
+    def _top_sites(self, snapshot: Any) -> List[Dict[str, Any]]:
+        import tracemalloc
+
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+        sites = []
+        for stat in snapshot.statistics("lineno")[: self.top]:
+            frame = stat.traceback[0]
+            sites.append(
+                {
+                    "site": f"{frame.filename}:{frame.lineno}",
+                    "size_bytes": stat.size,
+                    "count": stat.count,
+                }
+            )
+        return sites
+
+    def finish(self, run: CommandContext) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        memory: Dict[str, Any] = {}
+        if self.report:
+            import tracemalloc
+
+            started = time.perf_counter()
+            current, peak = tracemalloc.get_traced_memory()
+            sites = self._top_sites(tracemalloc.take_snapshot()) if self.top else []
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+            peak_after = peak_rss()
+            memory.update(
+                {
+                    "rss_peak_bytes": peak_after,
+                    "rss_peak_delta_bytes": (
+                        max(0, peak_after - self._peak_before)
+                        if peak_after is not None and self._peak_before is not None
+                        else None
+                    ),
+                    "traced_current_bytes": current,
+                    "traced_peak_bytes": peak,
+                    "top": sites,
+                    "snapshot_ms": round((time.perf_counter() - started) * 1000, 3),
+                }
+            )
+        if self.limit_bytes is not None and (self.report or self.exceeded_at):
+            memory["limit_bytes"] = self.limit_bytes
+            memory["limit_exceeded"] = self.exceeded_at is not None
+            if self.exceeded_at is not None:
+                memory["rss_at_limit_bytes"] = self.exceeded_at
+        if memory:
+            run.meta["memory"] = memory
+
+
+def from_options(obj: Dict[str, Any]) -> Optional[MemoryMonitor]:
+    """Build a monitor from group options, falling back to CHI_MEMORY* env vars."""
+    report = bool(obj.get("memory")) or os.getenv("CHI_MEMORY", "") in (
+        "1",
+        "true",
+        "yes",
+    )
+    limit_raw = obj.get("memory_limit") or os.getenv("CHI_MEMORY_LIMIT_MB")
+    try:
+        limit = int(float(limit_raw) * _MIB) if limit_raw else None
+    except ValueError:
+        limit = None
+    if not report and limit is None:
+        return None
+    top_raw = obj.get("memory_top")
+    if top_raw is None:
+        top_raw = os.getenv("CHI_MEMORY_TOP")
+    try:
+        top = int(top_raw) if top_raw not in (None, "") else DEFAULT_TOP
+    except ValueError:
+        top = DEFAULT_TOP
+    return MemoryMonitor(report=report, top=top, limit_bytes=limit)
@@ -0,0 +1,279 @@
+"""Per-command counters and latency histograms in OpenMetrics format.
+
+Recording is opt-in (`CHI_METRICS=1` or `CHI_METRICS_TEXTFILE=PATH`). Each
+finished invocation adds to counters kept in a SQLite (WAL) store under the
+user cache dir, so one-shot CLI processes accumulate into a single series:
+
+- `chi_command_invocations_total{app,command}`
+- `chi_command_errors_total{app,command,code}` (by `ErrorPayload.code`)
+- `chi_command_cache_hits_total{app,command}` (see `ctx.record_cache_hit()`)
+- `chi_command_duration_seconds{app,command}` histogram
+
+`CHI_METRICS_TEXTFILE` additionally rewrites a node_exporter textfile-collector
+file after every invocation; the `metrics` subcommand prints the same data.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..chi_admin.utils import _user_cache_dir
+from .context import CommandContext
+
+BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    app TEXT NOT NULL,
+    command TEXT NOT NULL,
+    name TEXT NOT NULL,
+    label TEXT NOT NULL DEFAULT '',
+    value REAL NOT NULL,
+    PRIMARY KEY (app, command, name, label)
+);
+"""
+
+
+def _db_path() -> Path:
+    return _user_cache_dir() / "metrics.sqlite3"
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    path = _db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=10, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        yield conn
+    finally:
+        conn.close()
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def record(
+    app: str,
+    command: str,
+    duration: float,
+    *,
+    error_code: Optional[str] = None,
+    cache_hits: int = 0,
+) -> None:
+    rows: List[Tuple[str, str, str, str, float]] = [
+        (app, command, "invocations", "", 1.0),
+        (app, command, "duration_sum", "", duration),
+        (app, command, "duration_count", "", 1.0),
+    ]
+    if error_code:
+        rows.append((app, command, "errors", error_code, 1.0))
+    if cache_hits:
+        rows.append((app, command, "cache_hits", "", float(cache_hits)))
+    for bound in BUCKETS + (float("inf"),):
+        rows.append(
+            (
+                app,
+                command,
+                "duration_bucket",
+                _le(bound),
+                1.0 if duration <= bound else 0.0,
+            )
+        )
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT INTO metrics (app, command, name, label, value) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (app, command, name, label) DO UPDATE SET value = value + excluded.value",
+            rows,
+        )
+        conn.execute("COMMIT")
+
+
+def reset(app: str) -> None:
+    with _connect() as conn:
+        conn.execute("DELETE FROM metrics WHERE app = ?", (app,))
+
+
+def snapshot(app: Optional[str] = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Return `{(app, command): {"invocations", "errors", "cache_hits", "duration"}}`."""
+    with _connect() as conn:
+        if app is None:
+            rows = conn.execute("SELECT app, command, name, label, value FROM metrics")
+        else:
+            rows = conn.execute(
+                "SELECT app, command, name, label, value FROM metrics WHERE app = ?",
+                (app,),
+            )
+        rows = rows.fetchall()
+    out: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for r_app, command, name, label, value in rows:
+        entry = out.setdefault(
+            (r_app, command),
+            {
+                "invocations": 0,
+                "errors": {},
+                "cache_hits": 0,
+                "duration": {"count": 0, "sum": 0.0, "buckets": {}},
+            },
+        )
+        if name == "invocations":
+            entry["invocations"] = int(value)
+        elif name == "errors":
+            entry["errors"][label] = int(value)
+        elif name == "cache_hits":
+            entry["cache_hits"] = int(value)
+        elif name == "duration_sum":
+            entry["duration"]["sum"] = value
+        elif name == "duration_count":
+            entry["duration"]["count"] = int(value)
+        elif name == "duration_bucket":
+            entry["duration"]["buckets"][label] = int(value)
+    return out
+
+
+def quantile(q: float, buckets: Dict[str, int]) -> Optional[float]:
+    """Estimate a quantile from cumulative buckets (like `histogram_quantile`)."""
+    ordered = sorted(
+        ((float("inf") if le == "+Inf" else float(le), n) for le, n in buckets.items())
+    )
+    if not ordered or ordered[-1][1] == 0:
+        return None
+    rank = q * ordered[-1][1]
+    prev_bound, prev_count = 0.0, 0
+    for bound, count in ordered:
+        if count >= rank:
+            if bound == float("inf"):
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (
+                count - prev_count
+            )
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def _labels(**labels: str) -> str:
+    def esc(v: str) -> str:
+        return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels.items()) + "}"
+
+
+def render(app: Optional[str] = None, *, openmetrics: bool = True) -> str:
+    """Render the store as OpenMetrics text (or Prometheus text 0.0.4)."""
+    data = snapshot(app)
+    keys = sorted(data)
+
+    def _counter(name: str, help_text: str) -> List[str]:
+        family = name if openmetrics else f"{name}_total"
+        return [f"# TYPE {family} counter", f"# HELP {family} {help_text}"]
+
+    lines = _counter("chi_command_invocations", "Command invocations.")
+    for a, c in keys:
+        lines.append(
+            f"chi_command_invocations_total{_labels(app=a, command=c)} {data[(a, c)]['invocations']}"
+        )
+    lines += _counter("chi_command_errors", "Failed invocations by error code.")
+    for a, c in keys:
+        for code, n in sorted(data[(a, c)]["errors"].items()):
+            lines.append(
+                f"chi_command_errors_total{_labels(app=a, command=c, code=code)} {n}"
+            )
+    lines += _counter("chi_command_cache_hits", "Cache hits served by commands.")
+    for a, c in keys:
+        lines.append(
+            f"chi_command_cache_hits_total{_labels(app=a, command=c)} {data[(a, c)]['cache_hits']}"
+        )
+    lines += [
+        "# TYPE chi_command_duration_seconds histogram",
+        "# HELP chi_command_duration_seconds Command latency in seconds.",
+    ]
+    for a, c in keys:
+        hist = data[(a, c)]["duration"]
+        for bound in BUCKETS + (float("inf"),):
+            le = _le(bound)
+            n = hist["buckets"].get(le, 0)
+            lines.append(
+                f"chi_command_duration_seconds_bucket{_labels(app=a, command=c, le=le)} {n}"
+            )
+        lines.append(
+            f"chi_command_duration_seconds_count{_labels(app=a, command=c)} {hist['count']}"
+        )
+        lines.append(
+            f"chi_command_duration_seconds_sum{_labels(app=a, command=c)} {hist['sum']:.6f}"
+        )
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: Path, app: Optional[str] = None) -> None:
+    """Atomically rewrite a textfile-collector file (Prometheus text format)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".chi-metrics-", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(render(app, openmetrics=False))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class MetricsRecorder:
+    """Instrument that records the invocation outcome after the envelope is out."""
+
+    def __init__(self, textfile: Optional[str] = None):
+        self.textfile = textfile
+
+    def start(self, run: CommandContext) -> None:
+        pass
+
+    def finish(self, run: CommandContext) -> None:
+        pass
+
+    def close(self, run: CommandContext) -> None:
+        record(
+            run.app,
+            run.command,
+            time.perf_counter() - run.started,
+            error_code=run.error_code,
+            cache_hits=run.cache_hits,
+        )
+        if self.textfile:
+            write_textfile(Path(self.textfile), run.app)
+
+
+def from_options(obj: Dict[str, Any]) -> Optional[MetricsRecorder]:
+    textfile = os.getenv("CHI_METRICS_TEXTFILE") or None
+    if textfile or os.getenv("CHI_METRICS", "") in ("1", "true", "yes"):
+        return MetricsRecorder(textfile)
+    return None
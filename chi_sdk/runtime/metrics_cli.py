@@ -0,0 +1,48 @@
+"""`metrics` subcommand added to every CLI built with `build_cli`."""
+
+from __future__ import annotations
+
+import click
+
+from ..sdk import _json_mode, emit_ok
+from . import metrics
+
+
+@click.command("metrics", help="Show per-command counters and latency histograms")
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(["openmetrics", "prometheus"]),
+    default="openmetrics",
+    show_default=True,
+    help="Text exposition format (human mode)",
+)
+@click.option("--reset", is_flag=True, help="Clear recorded metrics of this app")
+@click.pass_context
+def metrics_cmd(ctx, fmt: str, reset: bool):
+    root = ctx.find_root()
+    app = (root.obj or {}).get("app") or root.info_name or "chi"
+    if reset:
+        metrics.reset(app)
+    if not _json_mode(ctx):
+        click.echo(metrics.render(app, openmetrics=fmt == "openmetrics"), nl=False)
+        return
+    commands = []
+    for (_app, command), entry in sorted(metrics.snapshot(app).items()):
+        hist = entry["duration"]
+        commands.append(
+            {
+                "command": command,
+                "invocations": entry["invocations"],
+                "errors": entry["errors"],
+                "cache_hits": entry["cache_hits"],
+                "latency": {
+                    "count": hist["count"],
+                    "sum_s": round(hist["sum"], 6),
+                    "p50_s": metrics.quantile(0.5, hist["buckets"]),
+                    "p95_s": metrics.quantile(0.95, hist["buckets"]),
+                    "p99_s": metrics.quantile(0.99, hist["buckets"]),
+                },
+            }
+        )
+    emit_ok({"app": app, "commands": commands}, command="metrics")
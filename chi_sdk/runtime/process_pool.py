@@ -0,0 +1,250 @@
+"""Process pool that hands large results back through shared memory.
+
+Results returned by workers are normally pickled and pushed through a pipe,
+which copies every byte at least twice. `SharedMemoryPool` wraps
+`concurrent.futures.ProcessPoolExecutor` and moves large buffers (bytes,
+bytearray, memoryview and, when numpy is installed, contiguous arrays) into a
+`multiprocessing.shared_memory` segment instead. Only a small descriptor is
+pickled; the parent maps the segment and exposes it as a `SharedBuffer`.
+"""
+
+from __future__ import annotations
+
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+try:  # optional dependency
+    import numpy as _np  # type: ignore[import]
+except Exception:  # pragma: no cover - numpy is not a hard requirement
+    _np = None
+
+DEFAULT_THRESHOLD = 1 << 20  # 1 MiB
+
+
+@dataclass(frozen=True)
+class _ShmRef:
+    """Picklable descriptor for a buffer stored in a shared memory segment."""
+
+    name: str
+    size: int
+    dtype: Optional[str] = None
+    shape: Optional[Tuple[int, ...]] = None
+
+
+def _create_segment(size: int) -> shared_memory.SharedMemory:
+    # The parent takes ownership of the segment, so the worker must not let
+    # its resource tracker unlink it when the worker exits.
+    try:
+        return shared_memory.SharedMemory(create=True, size=size, track=False)  # type: ignore[call-arg]
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        except Exception:
+            pass
+        return shm
+
+
+def _export(value: Any, threshold: int) -> Any:
+    """Move large buffers into shared memory (runs in the worker)."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        view = memoryview(value).cast("B")
+        if view.nbytes < threshold:
+            return value
+        shm = _create_segment(view.nbytes)
+        shm.buf[: view.nbytes] = view
+        ref = _ShmRef(name=shm.name, size=view.nbytes)
+        shm.close()
+        return ref
+    if _np is not None and isinstance(value, _np.ndarray):
+        if value.nbytes < threshold or value.dtype.hasobject:
+            return value
+        arr = _np.ascontiguousarray(value)
+        shm = _create_segment(arr.nbytes)
+        _np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        ref = _ShmRef(
+            name=shm.name, size=arr.nbytes, dtype=arr.dtype.str, shape=arr.shape
+        )
+        shm.close()
+        return ref
+    if isinstance(value, dict):
+        return {k: _export(v, threshold) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_export(v, threshold) for v in value)
+    return value
+
+
+def _run_exported(
+    fn: Callable[..., Any], threshold: int, args: tuple, kwargs: Dict[str, Any]
+) -> Any:
+    return _export(fn(*args, **kwargs), threshold)
+
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        shm.close()
+    except BufferError:
+        # Views handed out by `SharedBuffer.view` are still alive. The name is
+        # already gone; drop our references so the mapping is reclaimed once
+        # the last view is collected, and close the descriptor now.
+        shm._buf = None  # type: ignore[attr-defined]
+        shm._mmap = None  # type: ignore[attr-defined]
+        shm.close()
+
+
+class SharedBuffer:
+    """Result buffer backed by a shared memory segment owned by this process.
+
+    The segment is unlinked on `close()`, when leaving a `with` block, or when
+    the object is garbage collected. Views obtained from `view`/`array()`
+    must not be used after the buffer is closed.
+    """
+
+    def __init__(self, ref: _ShmRef):
+        self._shm = shared_memory.SharedMemory(name=ref.name)
+        self.name = ref.name
+        self.size = ref.size
+        self.dtype = ref.dtype
+        self.shape = ref.shape
+        self._finalizer = weakref.finalize(self, _release, self._shm)
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    @property
+    def view(self) -> memoryview:
+        """Zero-copy view over the payload bytes."""
+        if self.closed:
+            raise ValueError("SharedBuffer is closed")
+        return self._shm.buf[: self.size]
+
+    def array(self) -> Any:
+        """Zero-copy numpy view (requires numpy and an array payload)."""
+        if _np is None:
+            raise RuntimeError("numpy is required for SharedBuffer.array()")
+        if self.dtype is None or self.shape is None:
+            raise TypeError("SharedBuffer does not hold an array payload")
+        return _np.ndarray(self.shape, dtype=self.dtype, buffer=self.view)
+
+    def tobytes(self) -> bytes:
+        return self.view.tobytes()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def __enter__(self) -> "SharedBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        state = "closed" if self.closed else "open"
+        return f"SharedBuffer(name={self.name!r}, size={self.size}, {state})"
+
+
+def _import(value: Any) -> Any:
+    """Attach shared memory descriptors in the parent."""
+    if isinstance(value, _ShmRef):
+        return SharedBuffer(value)
+    if isinstance(value, dict):
+        return {k: _import(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_import(v) for v in value)
+    return value
+
+
+def _discard(value: Any) -> None:
+    """Unlink segments of a result nobody will read."""
+    if isinstance(value, _ShmRef):
+        SharedBuffer(value).close()
+    elif isinstance(value, dict):
+        for v in value.values():
+            _discard(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _discard(v)
+
+
+class SharedMemoryPool:
+    """`ProcessPoolExecutor` wrapper returning large buffers via shared memory.
+
+    Args:
+        max_workers: Worker count (defaults to the executor's default).
+        threshold: Minimum payload size in bytes to use shared memory;
+                   smaller results are pickled as usual.
+        mp_context: Optional multiprocessing context for the executor.
+
+    Buffers at or above `threshold` come back as `SharedBuffer` objects, also
+    when nested inside dicts, lists or tuples. `emit_ok` cannot serialize a
+    `SharedBuffer`: convert it (`tobytes()`, `array().tolist()`, ...) or
+    write it out before returning it from a command.
+
+    Cancelling a returned future also cancels the call if no worker has
+    picked it up yet; a call already running finishes and its result is
+    discarded.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        *,
+        threshold: int = DEFAULT_THRESHOLD,
+        mp_context: Any = None,
+    ):
+        self.threshold = threshold
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=mp_context
+        )
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        inner = self._executor.submit(_run_exported, fn, self.threshold, args, kwargs)
+        outer: Future = Future()
+
+        def _done(f: Future) -> None:
+            if f.cancelled():
+                outer.cancel()
+                return
+            exc = f.exception()
+            # The caller may have cancelled `outer` while `f` was running;
+            # this also keeps it from being cancelled from now on.
+            if outer.done() or not outer.set_running_or_notify_cancel():
+                if exc is None:
+                    _discard(f.result())
+                return
+            if exc is not None:
+                outer.set_exception(exc)
+                return
+            try:
+                outer.set_result(_import(f.result()))
+            except Exception as e:  # segment vanished, permissions, ...
+                outer.set_exception(e)
+
+        inner.add_done_callback(_done)
+        outer.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+        return outer
+
+    def map(self, fn: Callable[..., Any], *iterables: Iterable[Any]) -> Iterator[Any]:
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        for fut in futures:
+            yield fut.result()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def __enter__(self) -> "SharedMemoryPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown(wait=True)
@@ -0,0 +1,130 @@
+"""cProfile capture for a single command invocation (`--profile`)."""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..chi_admin.utils import _user_cache_dir
+from .context import CommandContext
+
+SORT_KEYS = ("cumulative", "tottime", "ncalls", "calls", "name", "filename")
+DEFAULT_SORT = "cumulative"
+DEFAULT_TOP = 20
+
+
+def _func_label(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~" and line == 0:  # built-in
+        return name
+    return f"{filename}:{line}({name})"
+
+
+class CommandProfiler:
+    """Run the command under cProfile and summarize it into `meta.profile`.
+
+    Args:
+        out: Destination `.pstats` file (defaults to the user cache dir).
+        sort: pstats sort key for the summary.
+        top: Number of entries kept in the summary.
+        pattern: Optional regex; only matching `file:line(func)` labels are kept.
+    """
+
+    def __init__(
+        self,
+        out: Optional[str] = None,
+        *,
+        sort: str = DEFAULT_SORT,
+        top: int = DEFAULT_TOP,
+        pattern: Optional[str] = None,
+    ):
+        self.out = out
+        self.sort = sort if sort in SORT_KEYS else DEFAULT_SORT
+        self.top = top
+        self.pattern = re.compile(pattern) if pattern else None
+        self._prof: Any = None
+        self._error: Optional[str] = None
+
+    def start(self, run: CommandContext) -> None:
+        import cProfile
+
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError as e:  # another profiler is already active
+            self._error = str(e)
+            return
+        self._prof = prof
+
+    def _path(self, run: CommandContext) -> Path:
+        if self.out:
+            return Path(self.out)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"{run.command}-{stamp}-{os.getpid()}.pstats"
+        return _user_cache_dir() / "profiles" / name
+
+    def finish(self, run: CommandContext) -> None:
+        prof, self._prof = self._prof, None
+        if prof is None:
+            if self._error:
+                run.meta["profile"] = {"error": self._error}
+                self._error = None
+            return
+        prof.disable()
+        path = self._path(run)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(str(path))
+
+        import pstats
+
+        stats = pstats.Stats(prof).sort_stats(self.sort)
+        entries: List[Dict[str, Any]] = []
+        for func in stats.fcn_list or []:  # type: ignore[attr-defined]
+            label = _func_label(func)
+            if self.pattern and not self.pattern.search(label):
+                continue
+            cc, nc, tt, ct, _callers = stats.stats[func]  # type: ignore[attr-defined]
+            entries.append(
+                {
+                    "func": label,
+                    "ncalls": nc,
+                    "primitive_calls": cc,
+                    "tottime_ms": round(tt * 1000, 3),
+                    "cumtime_ms": round(ct * 1000, 3),
+                }
+            )
+            if len(entries) >= self.top:
+                break
+        run.meta["profile"] = {
+            "path": str(path),
+            "sort": self.sort,
+            "total_calls": stats.total_calls,  # type: ignore[attr-defined]
+            "total_ms": round(stats.total_tt * 1000, 3),  # type: ignore[attr-defined]
+            "top": entries,
+        }
+
+
+def from_options(obj: Dict[str, Any]) -> Optional[CommandProfiler]:
+    """Build a profiler from group options, falling back to CHI_PROFILE* env vars."""
+    out = obj.get("profile_out") or os.getenv("CHI_PROFILE_OUT") or None
+    enabled = (
+        obj.get("profile")
+        or os.getenv("CHI_PROFILE", "") in ("1", "true", "yes")
+        or out
+    )
+    if not enabled:
+        return None
+    top_raw = obj.get("profile_top") or os.getenv("CHI_PROFILE_TOP")
+    try:
+        top = int(top_raw) if top_raw else DEFAULT_TOP
+    except ValueError:
+        top = DEFAULT_TOP
+    return CommandProfiler(
+        out,
+        sort=obj.get("profile_sort") or os.getenv("CHI_PROFILE_SORT") or DEFAULT_SORT,
+        top=top,
+        pattern=obj.get("profile_filter") or os.getenv("CHI_PROFILE_FILTER") or None,
+    )
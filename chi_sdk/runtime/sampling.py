@@ -0,0 +1,181 @@
+"""Low-overhead statistical profiler with collapsed-stack (flamegraph) output.
+
+Stacks of all threads are sampled from `sys._current_frames()` at a fixed
+rate and aggregated in memory; the result is written in the collapsed format
+understood by `flamegraph.pl`, speedscope and inferno:
+
+    outer (app.py:10);inner (app.py:42) 17
+
+Sampling is driven by a `SIGPROF` interval timer (CPU time) when running in
+the main thread on POSIX, or by `SIGALRM` in "wall" mode; elsewhere a daemon
+thread samples on wall-clock time. Use it around a command invocation
+(`--sample`) or directly as a context manager in long-lived backends.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from ..chi_admin.utils import _user_cache_dir
+from .context import CommandContext
+
+DEFAULT_HZ = 100.0
+MAX_DEPTH = 128
+
+
+class SamplingProfiler:
+    """Aggregate stack samples and write them as collapsed stacks.
+
+    Args:
+        hz: Samples per second.
+        out: Output path (None keeps samples in memory only).
+        mode: "cpu" (SIGPROF, on-CPU time), "wall" (SIGALRM) or "thread"
+              (sampler thread; used automatically when signals are unusable).
+    """
+
+    def __init__(
+        self, hz: float = DEFAULT_HZ, out: Optional[str] = None, mode: str = "cpu"
+    ):
+        self.interval = 1.0 / max(hz, 1.0)
+        self.out = out
+        self.mode = mode
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._previous: Any = None
+        self._signum: Optional[int] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    # ----- sampling -----
+    def _label(self, frame: FrameType) -> str:
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _record(self, frame: Optional[FrameType]) -> None:
+        names: List[str] = []
+        while frame is not None and len(names) < MAX_DEPTH:
+            names.append(self._label(frame))
+            frame = frame.f_back
+        if names:
+            names.reverse()
+            self.stacks[";".join(names)] += 1
+
+    def _sample(self, main_frame: Optional[FrameType], skip: Optional[int]) -> None:
+        main_ident = threading.main_thread().ident
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            if ident == main_ident and main_frame is not None:
+                frame = main_frame  # drop the signal handler's own frame
+            self._record(frame)
+        self.samples += 1
+
+    def _on_signal(self, signum, frame) -> None:
+        self._sample(frame, None)
+
+    def _run_thread(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(None, me)
+
+    # ----- lifecycle -----
+    def start(self, run: Optional[CommandContext] = None) -> "SamplingProfiler":
+        self._started = time.perf_counter()
+        use_signal = (
+            self.mode in ("cpu", "wall")
+            and hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+        )
+        if use_signal:
+            timer = signal.ITIMER_PROF if self.mode == "cpu" else signal.ITIMER_REAL
+            self._signum = signal.SIGPROF if self.mode == "cpu" else signal.SIGALRM
+            self._previous = signal.signal(self._signum, self._on_signal)
+            signal.setitimer(timer, self.interval, self.interval)
+        else:
+            self.mode = "thread"
+            self._thread = threading.Thread(
+                target=self._run_thread, name="chi-sampler", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._signum is not None:
+            timer = (
+                signal.ITIMER_PROF
+                if self._signum == signal.SIGPROF
+                else signal.ITIMER_REAL
+            )
+            signal.setitimer(timer, 0, 0)
+            signal.signal(self._signum, self._previous or signal.SIG_DFL)
+            self._signum = None
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.duration = time.perf_counter() - self._started
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.collapsed(), encoding="utf-8")
+        return path
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+        if self.out:
+            self.write(Path(self.out))
+
+    # ----- instrument protocol -----
+    def finish(self, run: CommandContext) -> None:
+        self.stop()
+        if self.out:
+            path = Path(self.out)
+        else:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            name = f"{run.command}-{stamp}-{os.getpid()}.collapsed"
+            path = _user_cache_dir() / "profiles" / name
+        self.write(path)
+        run.meta["sampling"] = {
+            "path": str(path),
+            "mode": self.mode,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "duration_ms": round(self.duration * 1000, 3),
+        }
+
+
+def from_options(obj: Dict[str, Any]) -> Optional[SamplingProfiler]:
+    """Build a sampler from group options, falling back to CHI_SAMPLE* env vars."""
+    out = obj.get("sample_out") or os.getenv("CHI_SAMPLE_OUT") or None
+    enabled = obj.get("sample") or os.getenv("CHI_SAMPLE", "") in ("1", "true", "yes")
+    if not (enabled or out):
+        return None
+    hz_raw = obj.get("sample_hz") or os.getenv("CHI_SAMPLE_HZ")
+    try:
+        hz = float(hz_raw) if hz_raw else DEFAULT_HZ
+    except ValueError:
+        hz = DEFAULT_HZ
+    mode = obj.get("sample_mode") or os.getenv("CHI_SAMPLE_MODE") or "cpu"
+    return SamplingProfiler(hz=hz, out=out, mode=mode)
@@ -0,0 +1,34 @@
+"""Per-phase timing breakdown for `--timings` / `CHI_TIMINGS`."""
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from .context import CommandContext
+
+
+def phase_durations(
+    run: CommandContext, started: Optional[float] = None
+) -> Dict[str, float]:
+    """Summarize `run.phases` as `{"<phase>_ms": ..., "total_ms": ...}`.
+
+    `started` is the perf_counter() value taken before Click parsed the
+    command line; it yields the `parse_ms` entry and anchors `total_ms`.
+    """
+    out: Dict[str, float] = {}
+    if not run.phases:
+        return out
+    first = run.phases[0][1]
+    if started is not None and started <= first:
+        out["parse_ms"] = round((first - started) * 1000, 3)
+    for name, start, end in run.phases:
+        key = f"{name}_ms"
+        out[key] = round(out.get(key, 0.0) + (end - start) * 1000, 3)
+    origin = started if "parse_ms" in out else first
+    out["total_ms"] = round((run.phases[-1][2] - origin) * 1000, 3)
+    return out
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    parts = [f"{k[:-3]}={v:.2f}ms" for k, v in timings.items()]
+    return "timings: " + " ".join(parts)
@@ -0,0 +1,217 @@
+"""W3C trace context propagation and OTLP-compatible span export.
+
+- An incoming `TRACEPARENT` (`00-<trace-id>-<parent-id>-<flags>`) makes the
+  command a child span of the caller (e.g. the TUI action that launched it).
+- Every envelope of the invocation carries `meta.trace`
+  (`trace_id`, `span_id`, `parent_span_id`).
+- `ctx.traceparent` is the command's own span, and `ctx.subprocess_env()`
+  passes it as `TRACEPARENT` to spawned backend calls so they join the same
+  trace. `os.environ` is left alone: concurrent invocations in one process
+  (warm workers, threads) must not see each other's trace.
+- With `CHI_TRACE_FILE` (or `--trace-out`) the command span, one child span
+  per SDK phase and user spans from `ctx.span()` are appended to the file as
+  one OTLP/JSON `ExportTraceServiceRequest` per line.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .context import CommandContext
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, str]]:
+    """Return (trace_id, parent_id, flags) for a valid version-00 header."""
+    m = _TRACEPARENT.match((value or "").strip().lower())
+    if not m or m.group(1) == "0" * 32 or m.group(2) == "0" * 16:
+        return None
+    return m.group(1), m.group(2), m.group(3)
+
+
+def _attr(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        v: Dict[str, Any] = {"boolValue": value}
+    elif isinstance(value, int):
+        v = {"intValue": str(value)}
+    elif isinstance(value, float):
+        v = {"doubleValue": value}
+    else:
+        v = {"stringValue": str(value)}
+    return {"key": key, "value": v}
+
+
+class Tracer:
+    """Collects spans of one command invocation."""
+
+    def __init__(self, traceparent: Optional[str] = None, out: Optional[str] = None):
+        parsed = parse_traceparent(traceparent)
+        if parsed:
+            self.trace_id, self.parent_span_id, self.flags = parsed
+        else:
+            self.trace_id, self.parent_span_id, self.flags = (
+                secrets.token_hex(16),
+                None,
+                "01",
+            )
+        self.span_id = secrets.token_hex(8)
+        self.out = out
+        self.spans: List[Dict[str, Any]] = []
+        self._stack: List[str] = []
+        self._phase_ids: Dict[str, str] = {}
+        # perf_counter() -> unix nanoseconds
+        self._epoch_ns = time.time_ns() - int(time.perf_counter() * 1e9)
+
+    def _ns(self, perf: float) -> str:
+        return str(self._epoch_ns + int(perf * 1e9))
+
+    def phase_span_id(self, name: str) -> str:
+        if name not in self._phase_ids:
+            self._phase_ids[name] = secrets.token_hex(8)
+        return self._phase_ids[name]
+
+    def traceparent(self, span_id: Optional[str] = None) -> str:
+        return f"00-{self.trace_id}-{span_id or self.span_id}-{self.flags}"
+
+    def _span(
+        self,
+        name: str,
+        span_id: str,
+        parent: Optional[str],
+        start: float,
+        end: float,
+        *,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": span_id,
+            "name": name,
+            "kind": kind,
+            "startTimeUnixNano": self._ns(start),
+            "endTimeUnixNano": self._ns(end),
+            "attributes": [_attr(k, v) for k, v in (attributes or {}).items()],
+            "status": (
+                {"code": STATUS_ERROR, "message": error}
+                if error
+                else {"code": STATUS_OK}
+            ),
+        }
+        if parent:
+            span["parentSpanId"] = parent
+        return span
+
+    @contextmanager
+    def span(self, name: str, attributes: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        span_id = secrets.token_hex(8)
+        parent = self._stack[-1] if self._stack else self.phase_span_id("body")
+        attrs = dict(attributes)
+        self._stack.append(span_id)
+        start = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._stack.pop()
+            self.spans.append(
+                self._span(
+                    name,
+                    span_id,
+                    parent,
+                    start,
+                    time.perf_counter(),
+                    attributes=attrs,
+                    error=error,
+                )
+            )
+
+    # ----- instrument protocol -----
+    def start(self, run: CommandContext) -> None:
+        run.tracer = self
+        run.stamp["trace"] = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+        }
+
+    def finish(self, run: CommandContext) -> None:
+        pass
+
+    def close(self, run: CommandContext) -> None:
+        if not self.out:
+            return
+        end = time.perf_counter()
+        first = run.phases[0][1] if run.phases else end
+        spans = [
+            self._span(
+                run.command,
+                self.span_id,
+                self.parent_span_id,
+                run.started,
+                end,
+                kind=SPAN_KIND_SERVER,
+                attributes={"chi.app": run.app, "chi.command": run.command},
+                error=run.error_code,
+            )
+        ]
+        if first > run.started:
+            spans.append(
+                self._span(
+                    "chi.parse",
+                    self.phase_span_id("parse"),
+                    self.span_id,
+                    run.started,
+                    first,
+                )
+            )
+        for name, start, stop in run.phases:
+            spans.append(
+                self._span(
+                    f"chi.{name}", self.phase_span_id(name), self.span_id, start, stop
+                )
+            )
+        spans.extend(self.spans)
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            _attr("service.name", run.app),
+                            _attr("process.pid", os.getpid()),
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": "chi_sdk"}, "spans": spans}],
+                }
+            ]
+        }
+        path = Path(self.out)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(request, separators=(",", ":")) + "\n")
+
+
+def from_options(obj: Dict[str, Any]) -> Optional[Tracer]:
+    """Trace when a valid TRACEPARENT arrives or an export file is configured."""
+    out = obj.get("trace_out") or os.getenv("CHI_TRACE_FILE") or None
+    traceparent = os.getenv("TRACEPARENT")
+    if not out and not parse_traceparent(traceparent):
+        return None
+    return Tracer(traceparent, out)
@@ -0,0 +1,481 @@
+"""Warm backend for `<app> ui --warm`.
+
+Right before `ui` execs the TUI it forks a server from its own process, which
+has already imported the application and registered its commands. The
+server listens on a Unix socket in a private temp directory and
+`CHI_APP_BIN` is pointed at a small shim script next to it. For every
+backend call the shim passes its stdin/stdout/stderr over the socket; the
+server forks a worker from its warm state, which runs the command on those
+descriptors and reports the exit code back to the shim. Envelopes stream to
+the TUI as they would from a cold process, minus interpreter start-up and
+imports.
+
+Calls of commands registered with `idempotent=True` are single-flight.
+Identical calls in progress share one worker, matched by `request_key`:
+the command, the parsed input, the directory and the environment. The
+server captures the worker's output and streams a copy to each caller. Each
+envelope line gets a fresh `request_id`, and callers that join late first
+get what was written so far. The worker is cancelled once every caller has
+gone.
+
+With `--prefetch K` the server also runs drill-downs ahead of time. When a
+call returns list items that carry a `command` (what the TUI runs when an
+item is entered), the follow-ups of the first K items are started in
+background workers. Only commands registered with `idempotent=True` are
+prefetched. Their output is kept in memory for `PREFETCH_TTL_S` seconds and
+replayed the same way when the TUI asks for the same call. An execution
+keeps at most `FLIGHT_BUFFER_MAX` bytes of output; past that it is neither
+joined nor cached, and later identical calls run on their own. A real call
+cancels the prefetches still running, except the one it matches, which it
+joins.
+
+The server exits and removes its directory once the TUI process is gone. If
+the socket cannot be reached, the shim execs the regular backend command.
+POSIX only.
+
+This module holds the server; the shim and fd passing are in `warm_shim`,
+the worker side in `warm_worker` and shared executions in `warm_flight`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import selectors
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import click
+
+from .warm_flight import _Cached, _Caller, _Flight
+from .warm_shim import SOCKET_NAME, RequestReader, supported, write_shim
+from .warm_worker import _idempotent, parse_call, request_key, run_request
+
+# Seconds between checks that the TUI is still running
+POLL_S = 0.5
+# A connected shim must send its request within this many seconds
+REQUEST_TIMEOUT_S = 5.0
+# Prefetched results are served for this many seconds
+PREFETCH_TTL_S = 10.0
+
+
+class WarmServer:
+    """Fork-per-request server bound to `<directory>/backend.sock`.
+
+    Serves until `watch_pid` (the TUI) exits. Identical concurrent calls of
+    idempotent commands share one execution. With `prefetch` > 0, the
+    follow-up commands of the first `prefetch` items of each list result are
+    run ahead of time (idempotent commands only) and kept for
+    `PREFETCH_TTL_S` seconds.
+    """
+
+    def __init__(
+        self,
+        cli: click.Command,
+        prog_name: str,
+        directory: Path,
+        watch_pid: int,
+        *,
+        prefetch: int = 0,
+    ):
+        self.cli = cli
+        self.prog_name = prog_name
+        self.directory = directory
+        self.watch_pid = watch_pid
+        self.prefetch = prefetch
+        self.socket_path = directory / SOCKET_NAME
+        self.workers: Set[int] = set()
+        self.cache: Dict[str, _Cached] = {}
+        self.flights: Dict[str, _Flight] = {}
+        self._by_pid: Dict[int, _Flight] = {}
+        self._held: Set[int] = set()  # fds of callers served by the server
+        self._reading: Dict[int, RequestReader] = {}  # requests being received
+        self._sock: Optional[socket.socket] = None
+        self._sel: Optional[selectors.BaseSelector] = None
+
+    def bind(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(self.socket_path))
+        sock.listen(64)
+        sock.setblocking(False)
+        self._sock = sock
+
+    def close(self) -> None:
+        if self._sel is not None:
+            self._sel.close()
+            self._sel = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def alive(self) -> bool:
+        try:
+            os.kill(self.watch_pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _register(self, fileobj: Any, events: int, callback: Callable) -> None:
+        if self._sel is not None:
+            self._sel.register(fileobj, events, callback)
+
+    def _unregister(self, fileobj: Any) -> None:
+        if self._sel is not None:
+            try:
+                self._sel.unregister(fileobj)
+            except (KeyError, ValueError):
+                pass
+
+    def _reap(self) -> None:
+        for pid in list(self.workers):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+                code = os.waitstatus_to_exitcode(status) if done else None
+            except ChildProcessError:
+                done, code = pid, 1
+            if done:
+                self.workers.discard(pid)
+                flight = self._by_pid.get(pid)
+                if flight is not None:
+                    flight.code = code
+                    self._land(flight)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, c in self.cache.items() if c.expires <= now]:
+            del self.cache[key]
+
+    def serve_forever(self) -> None:
+        assert self._sock is not None, "bind() first"
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self._sock, selectors.EVENT_READ, self._accept)
+        while self.alive() and self._sel is not None:
+            for key, _ in self._sel.select(POLL_S):
+                # Skip fds that an earlier callback of this batch unregistered
+                if self._sel.get_map().get(key.fd) is key:
+                    key.data(key.fileobj)
+            self._reap()
+            self._expire()
+            self._drop_stalled()
+
+    def _accept(self, sock: socket.socket) -> None:
+        try:
+            conn, _ = sock.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        conn.setblocking(False)
+        self._reading[conn.fileno()] = RequestReader(conn, REQUEST_TIMEOUT_S)
+        self._register(conn, selectors.EVENT_READ, self._read_request)
+
+    def _read_request(self, conn: socket.socket) -> None:
+        reader = self._reading[conn.fileno()]
+        try:
+            request = reader.feed()
+        except (BlockingIOError, InterruptedError):
+            return
+        except (OSError, ValueError):
+            self._drop(reader)  # a broken shim request; the shim runs cold
+            return
+        if request is None:
+            return
+        self._unregister(conn)
+        del self._reading[conn.fileno()]
+        conn.setblocking(True)
+        self.dispatch(request, reader.fds, conn)
+
+    def _drop(self, reader: RequestReader) -> None:
+        self._unregister(reader.conn)
+        self._reading.pop(reader.conn.fileno(), None)
+        reader.close()
+
+    def _drop_stalled(self) -> None:
+        now = time.monotonic()
+        for reader in [r for r in self._reading.values() if r.deadline <= now]:
+            self._drop(reader)
+
+    def dispatch(
+        self, request: Dict[str, Any], fds: List[int], conn: socket.socket
+    ) -> None:
+        """Serve one call from the prefetch cache, a running flight or a worker.
+
+        Idempotent commands are matched by `request_key`: a call joins a
+        running execution of the same key instead of starting another one.
+        """
+        call = parse_call(self.cli, self.prog_name, request.get("argv") or [])
+        key = request_key(call, request) if call and _idempotent(call[0]) else None
+        # Real work takes precedence over speculation
+        self._cancel_prefetch(keep=key)
+        self._expire()
+        flight = self.flights.get(key) if key is not None else None
+        if key is None or (flight is not None and flight.overflow):
+            self.spawn(request, fds, conn)
+            return
+        caller = _Caller(self, conn, fds)
+        hit = self.cache.get(key)
+        if hit is not None:
+            for stream in (1, 2):
+                caller.feed(stream, hit.lines[stream])
+            caller.finish(hit.code)
+            return
+        flight = flight or self._start_flight(key, request)
+        caller.on_leave = lambda c: self._left(flight, c)
+        flight.join(caller)
+
+    def _child(self) -> None:
+        """Drop server state in a freshly forked worker.
+
+        The worker keeps only the fds of its own call. Everything else the
+        server holds is closed: callers' stdout must close when the execution
+        they wait for ends, and other workers' pipes must see EOF when those
+        workers exit.
+        """
+        listening = self._sock.fileno() if self._sock is not None else -1
+        fds = set(self._held)
+        if self._sel is not None:
+            fds.update(key.fd for key in self._sel.get_map().values())
+        for reader in self._reading.values():
+            fds.update(reader.fds)
+        fds.discard(listening)
+        self.close()
+        for fd in fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _fork(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            self._child()
+        else:
+            self.workers.add(pid)
+        return pid
+
+    def spawn(
+        self, request: Dict[str, Any], fds: List[int], conn: socket.socket
+    ) -> int:
+        """Fork a worker for `request`; fds and conn are closed in the server."""
+        report = os.pipe() if self.prefetch else None
+        pid = self._fork()
+        if pid == 0:
+            code = 1
+            try:
+                if report:
+                    os.close(report[0])
+                code = run_request(
+                    self.cli,
+                    self.prog_name,
+                    request,
+                    fds,
+                    conn,
+                    report_fd=report[1] if report else None,
+                    follow=self.prefetch,
+                )
+            finally:
+                os._exit(code)
+        conn.close()
+        for fd in fds:
+            os.close(fd)
+        if report:
+            os.close(report[1])
+            self._collect(report[0], lambda data: self._schedule(request, data))
+        return pid
+
+    def _start_flight(
+        self, key: str, request: Dict[str, Any], *, speculative: bool = False
+    ) -> _Flight:
+        """Fork a worker for `request` with its output captured by the server."""
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        report = os.pipe() if self.prefetch and not speculative else None
+        pid = self._fork()
+        if pid == 0:
+            code = 1
+            try:
+                for fd in (out_r, err_r, *(report[:1] if report else ())):
+                    os.close(fd)
+                null = os.open(os.devnull, os.O_RDONLY)
+                code = run_request(
+                    self.cli,
+                    self.prog_name,
+                    request,
+                    [null, out_w, err_w],
+                    report_fd=report[1] if report else None,
+                    follow=self.prefetch,
+                )
+            finally:
+                os._exit(code)
+        os.close(out_w)
+        os.close(err_w)
+        flight = _Flight(key, pid, speculative)
+        self.flights[key] = flight
+        self._by_pid[pid] = flight
+        for stream, fd in ((1, out_r), (2, err_r)):
+            self._watch(fd, lambda chunk, s=stream: self._ingest(flight, s, chunk))
+        if report:
+            os.close(report[1])
+            self._collect(report[0], lambda data: self._schedule(request, data))
+        return flight
+
+    def _watch(self, fd: int, on_chunk: Callable[[bytes], None]) -> None:
+        """Pass what is written to pipe `fd` to `on_chunk`; b"" at EOF."""
+        os.set_blocking(fd, False)
+
+        def on_ready(_fd: int) -> None:
+            try:
+                chunk = os.read(fd, 1 << 16)
+            except BlockingIOError:
+                return
+            except OSError:
+                chunk = b""
+            if not chunk:
+                self._unregister(fd)
+                os.close(fd)
+            on_chunk(chunk)
+
+        self._register(fd, selectors.EVENT_READ, on_ready)
+
+    def _collect(self, fd: int, done: Callable[[bytes], None]) -> None:
+        """Collect everything written to pipe `fd`; `done` gets it on EOF."""
+        buf = bytearray()
+
+        def on_chunk(chunk: bytes) -> None:
+            if chunk:
+                buf.extend(chunk)
+            else:
+                done(bytes(buf))
+
+        self._watch(fd, on_chunk)
+
+    def _ingest(self, flight: _Flight, stream: int, chunk: bytes) -> None:
+        flight.ingest(stream, chunk)
+        if not chunk:
+            self._land(flight)
+        elif flight.overflow and flight.speculative and not flight.callers:
+            self._stop(flight)  # too large to cache: nobody will use it
+
+    def _schedule(self, request: Dict[str, Any], data: bytes) -> None:
+        try:
+            argvs = json.loads(data) if data else []
+        except ValueError:
+            return
+        self._expire()
+        for argv in argvs[: self.prefetch]:
+            follow = dict(request, argv=argv)
+            call = parse_call(self.cli, self.prog_name, argv)
+            if call is None or not _idempotent(call[0]):
+                continue
+            key = request_key(call, follow)
+            if key in self.flights or key in self.cache:
+                continue
+            self._start_flight(key, follow, speculative=True)
+
+    def _stop(self, flight: _Flight) -> None:
+        flight.cancelled = True
+        if self.flights.get(flight.key) is flight:
+            del self.flights[flight.key]
+        try:
+            os.kill(flight.pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+    def _cancel_prefetch(self, keep: Optional[str]) -> None:
+        for key, flight in list(self.flights.items()):
+            if flight.speculative and not flight.callers and key != keep:
+                self._stop(flight)
+
+    def _left(self, flight: _Flight, caller: _Caller) -> None:
+        if caller in flight.callers:
+            flight.callers.remove(caller)
+        # Nobody waits for a real call any more: cancel it like a cold one
+        if not flight.callers and not flight.speculative and not flight.done:
+            self._stop(flight)
+
+    def _land(self, flight: _Flight) -> None:
+        if not flight.done:
+            return
+        self._by_pid.pop(flight.pid, None)
+        if self.flights.get(flight.key) is flight:
+            del self.flights[flight.key]
+        if flight.cancelled:
+            return
+        code = flight.code if flight.code is not None else 1
+        if flight.speculative and code == 0 and not flight.overflow:
+            self.cache[flight.key] = _Cached(
+                flight.lines, code, time.monotonic() + PREFETCH_TTL_S
+            )
+        for caller in list(flight.callers):
+            caller.finish(code)
+
+
+def _detach_stdio() -> None:
+    null = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(null, fd)
+    os.close(null)
+
+
+def _serve(server: WarmServer) -> None:
+    try:
+        os.setsid()  # no terminal signals from the TUI's session
+        _detach_stdio()
+        server.serve_forever()
+    except BaseException:
+        # Keep the shim: without the socket it runs the backend cold
+        try:
+            server.socket_path.unlink()
+        except OSError:
+            pass
+        return
+    server.close()
+    shutil.rmtree(server.directory, ignore_errors=True)
+
+
+def start(
+    cli: click.Command,
+    prog_name: str,
+    fallback: List[str],
+    *,
+    watch_pid: Optional[int] = None,
+    prefetch: int = 0,
+) -> Optional[str]:
+    """Start a warm server for `cli`; returns the shim for `CHI_APP_BIN`.
+
+    `watch_pid` defaults to the current process, which `ui` replaces with the
+    TUI. `prefetch` is the number of list items whose follow-up commands are
+    run ahead of time. Returns None when the platform lacks fork or fd
+    passing.
+    """
+    if not supported():
+        return None
+    directory = Path(tempfile.mkdtemp(prefix="chi-warm-"))
+    server = WarmServer(
+        cli, prog_name, directory, watch_pid or os.getpid(), prefetch=prefetch
+    )
+    try:
+        server.bind()
+    except OSError:
+        shutil.rmtree(directory, ignore_errors=True)
+        return None
+    shim = write_shim(directory, server.socket_path, fallback)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        # Double fork: the server is not left as a zombie child of the TUI
+        try:
+            if os.fork() == 0:
+                _serve(server)
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    server.close()
+    return str(shim)
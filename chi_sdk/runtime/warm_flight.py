@@ -0,0 +1,184 @@
+"""Single-flight executions of the warm backend and the callers they feed."""
+
+from __future__ import annotations
+
+import json
+import os
+import select
+import selectors
+import socket
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from .warm_shim import _CODE
+
+if TYPE_CHECKING:
+    from .warm import WarmServer
+
+# Output a shared execution keeps for late joiners and the prefetch cache
+FLIGHT_BUFFER_MAX = 8 << 20
+
+
+def restamp(data: bytes) -> bytes:
+    """Give every envelope line of a captured stream a fresh `request_id`."""
+    out = []
+    for line in data.splitlines(keepends=True):
+        try:
+            doc = json.loads(line)
+        except ValueError:
+            doc = None
+        if isinstance(doc, dict) and "request_id" in doc:
+            doc["request_id"] = str(uuid.uuid4())
+            line = json.dumps(doc, ensure_ascii=False, separators=(",", ":"))
+            line = line.encode() + b"\n"
+        out.append(line)
+    return b"".join(out)
+
+
+@dataclass
+class _Cached:
+    lines: Dict[int, List[bytes]]  # stdout (1) and stderr (2) lines
+    code: int
+    expires: float  # time.monotonic()
+
+
+class _Caller:
+    """A shim connection fed from captured output instead of its own worker.
+
+    Writes happen only once the selector reports the fd writable, at most
+    `select.PIPE_BUF` bytes at a time. A slow reader thus never blocks the
+    server, and the fds keep their blocking mode (stderr may be a tty shared
+    with the TUI).
+    """
+
+    def __init__(self, server: "WarmServer", conn: socket.socket, fds: List[int]):
+        self.server = server
+        self.conn = conn
+        self.fds = fds
+        self.pending: Dict[int, bytearray] = {1: bytearray(), 2: bytearray()}
+        self.code: Optional[int] = None
+        self.closed = False
+        self.on_leave: Optional[Callable[[_Caller], None]] = None
+        self._own = (conn.fileno(), *fds)
+        server._held.update(self._own)
+        # pid 0: there is no worker to forward signals to; the shim just exits
+        conn.sendall(_CODE.pack(0))
+        server._register(conn, selectors.EVENT_READ, self._hangup)
+
+    def feed(self, stream: int, lines: List[bytes]) -> None:
+        if self.closed or not lines:
+            return
+        idle = not self.pending[stream]
+        for line in lines:
+            self.pending[stream] += restamp(line)
+        if idle:
+            self.server._register(
+                self.fds[stream],
+                selectors.EVENT_WRITE,
+                lambda _fd, stream=stream: self._write(stream),
+            )
+
+    def _write(self, stream: int) -> None:
+        buf = self.pending[stream]
+        try:
+            n = os.write(self.fds[stream], buf[: select.PIPE_BUF])
+        except OSError:
+            self.leave()
+            return
+        del buf[:n]
+        if not buf:
+            self.server._unregister(self.fds[stream])
+            self._maybe_finish()
+
+    def finish(self, code: int) -> None:
+        self.code = code
+        self._maybe_finish()
+
+    def _maybe_finish(self) -> None:
+        if self.closed or self.code is None or any(self.pending.values()):
+            return
+        try:
+            self.conn.sendall(_CODE.pack(self.code))
+        except OSError:
+            pass
+        self.close()
+
+    def _hangup(self, conn: socket.socket) -> None:
+        try:
+            gone = not conn.recv(1)
+        except OSError:
+            gone = True
+        if gone:
+            self.leave()
+
+    def leave(self) -> None:
+        """The shim went away (cancelled by the TUI, or killed)."""
+        self.close()
+        if self.on_leave is not None:
+            self.on_leave(self)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        for fd in self._own:
+            self.server._unregister(fd)
+            self.server._held.discard(fd)
+        self.conn.close()
+        for fd in self.fds:
+            os.close(fd)
+
+
+class _Flight:
+    """One execution whose output is captured and fanned out to its callers.
+
+    Speculative flights are prefetches: nobody asked for them yet, real calls
+    cancel them and their output is cached when they succeed. Once the output
+    exceeds `FLIGHT_BUFFER_MAX` bytes it is no longer kept (`overflow`):
+    current callers still get it, but nobody can join or replay it.
+    """
+
+    def __init__(self, key: str, pid: int, speculative: bool):
+        self.key = key
+        self.pid = pid
+        self.speculative = speculative
+        self.lines: Dict[int, List[bytes]] = {1: [], 2: []}
+        self._partial: Dict[int, bytes] = {1: b"", 2: b""}
+        self.size = 0  # bytes kept in `lines`
+        self.overflow = False
+        self.streams = 2  # open output pipes
+        self.code: Optional[int] = None
+        self.cancelled = False
+        self.callers: List[_Caller] = []
+
+    @property
+    def done(self) -> bool:
+        return self.streams == 0 and self.code is not None
+
+    def ingest(self, stream: int, chunk: bytes) -> None:
+        """Split output into lines (b"" ends the stream) and fan them out."""
+        if chunk:
+            parts = (self._partial[stream] + chunk).split(b"\n")
+            self._partial[stream] = parts.pop()
+            lines = [part + b"\n" for part in parts]
+        else:
+            lines = [self._partial[stream]] if self._partial[stream] else []
+            self._partial[stream] = b""
+            self.streams -= 1
+        if not self.overflow:
+            self.size += sum(len(line) for line in lines)
+            if self.size > FLIGHT_BUFFER_MAX:
+                self.overflow = True
+                self.lines = {1: [], 2: []}
+                self.size = 0
+            else:
+                self.lines[stream].extend(lines)
+        for caller in self.callers:
+            caller.feed(stream, lines)
+
+    def join(self, caller: _Caller) -> None:
+        """Add a caller; it first gets the output produced so far."""
+        for stream in (1, 2):
+            caller.feed(stream, self.lines[stream])
+        self.callers.append(caller)
@@ -0,0 +1,152 @@
+"""Shim side of the warm backend: the script `CHI_APP_BIN` points at.
+
+The shim connects to the server socket and sends its stdin/stdout/stderr
+with the request (`send_fds`). The server answers with the worker pid (0
+when the call is served from captured output) and, once it is done, the exit
+code.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SOCKET_NAME = "backend.sock"
+SHIM_NAME = "backend"
+
+_HEAD = struct.Struct("!I")  # request length (sent with the fds)
+_CODE = struct.Struct("!i")  # worker pid, then exit code
+
+_SHIM = """#!{python} -S
+# Backend shim for `ui --warm`; generated, removed when the TUI exits.
+import json, os, signal, socket, struct, sys
+
+SOCKET = {socket!r}
+FALLBACK = {fallback!r}
+
+
+def _read(conn, n):
+    data = b""
+    while len(data) < n:
+        chunk = conn.recv(n - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _cold():
+    os.execvp(FALLBACK[0], FALLBACK + sys.argv[1:])
+
+
+def main():
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(SOCKET)
+        body = json.dumps(
+            {{"argv": sys.argv[1:], "cwd": os.getcwd(), "env": dict(os.environ)}}
+        ).encode()
+        socket.send_fds(conn, [struct.pack("!I", len(body))], [0, 1, 2])
+        conn.sendall(body)
+        head = _read(conn, 4)
+    except OSError:
+        head = None
+    if head is None:
+        _cold()  # no worker started, nothing was written yet
+    pid = struct.unpack("!i", head)[0]
+
+    def forward(signum, frame):
+        if pid <= 0:
+            # Shared execution: leaving is enough, the server cancels it
+            # once no caller is left
+            os._exit(128 + signum)
+        try:
+            os.kill(pid, signum)
+        except OSError:
+            pass
+
+    for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+        signal.signal(sig, forward)
+    tail = _read(conn, 4)
+    sys.exit(struct.unpack("!i", tail)[0] if tail else 1)
+
+
+main()
+"""
+
+
+def supported() -> bool:
+    return (
+        hasattr(os, "fork")
+        and hasattr(socket, "AF_UNIX")
+        and hasattr(socket, "send_fds")
+    )
+
+
+def write_shim(directory: Path, socket_path: Path, fallback: List[str]) -> Path:
+    """Executable script forwarding its invocation to the server."""
+    path = directory / SHIM_NAME
+    path.write_text(
+        _SHIM.format(
+            python=sys.executable, socket=str(socket_path), fallback=list(fallback)
+        ),
+        encoding="utf-8",
+    )
+    path.chmod(0o700)
+    return path
+
+
+class RequestReader:
+    """Incremental read of one shim request from a non-blocking connection.
+
+    The server calls `feed` whenever the connection is readable, so a slow
+    or stalled shim never holds up the others. The first read carries the
+    stdin/stdout/stderr fds; `deadline` is when the request must be complete.
+    """
+
+    def __init__(self, conn: socket.socket, timeout: float):
+        self.conn = conn
+        self.deadline = time.monotonic() + timeout
+        self.fds: List[int] = []
+        self._started = False
+        self._buf = bytearray()
+        self._length: Optional[int] = None
+
+    def feed(self) -> Optional[Dict[str, Any]]:
+        """Read what is available; the request once complete, else None.
+
+        Raises BlockingIOError when nothing could be read, and OSError or
+        ValueError for a broken request.
+        """
+        want = _HEAD.size if self._length is None else self._length
+        want -= len(self._buf)
+        if not self._started:
+            data, fds, _flags, _addr = socket.recv_fds(self.conn, want, 3)
+            self._started = True
+            self.fds = list(fds)
+            if len(fds) != 3:
+                raise ConnectionError("expected stdin/stdout/stderr")
+        else:
+            data = self.conn.recv(want)
+        if not data:
+            raise ConnectionError("short request")
+        self._buf += data
+        if self._length is None and len(self._buf) == _HEAD.size:
+            (self._length,) = _HEAD.unpack(self._buf)
+            self._buf.clear()
+        if self._length is not None and len(self._buf) == self._length:
+            return json.loads(bytes(self._buf))
+        return None
+
+    def close(self) -> None:
+        """Drop an unfinished request: its fds and the connection."""
+        for fd in self.fds:
+            os.close(fd)
+        self.fds = []
+        self.conn.close()
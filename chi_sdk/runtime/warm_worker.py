@@ -0,0 +1,187 @@
+"""Worker side of the warm backend: run one call in a forked child."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shlex
+import socket
+import sys
+import traceback
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+
+from .context import redirect_envelopes
+from .warm_shim import _CODE
+
+# Environment variables that differ between otherwise identical calls
+_VOLATILE_ENV = ("TRACEPARENT", "TRACESTATE", "_")
+
+
+def _exit_code(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+class _Recorder:
+    """Envelope sink that writes as usual and keeps the last result's data."""
+
+    def __init__(self) -> None:
+        self.result: Any = None
+
+    def __call__(self, env: Any) -> None:
+        if env.type == "result":
+            self.result = env.data
+        click.echo(env.model_dump_json(), err=env.type == "error")
+
+
+def _click_rest(ctx: click.Context) -> List[str]:
+    # click 8.2 keeps protected_args privately (the property warns)
+    protected = ctx.__dict__.get("_protected_args")
+    if protected is None:
+        protected = ctx.protected_args
+    return [*protected, *ctx.args]
+
+
+def parse_call(
+    cli: click.Group, prog_name: str, argv: List[str]
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Command name and parsed group/command parameters of `argv`."""
+    try:
+        with cli.make_context(prog_name, list(argv), resilient_parsing=True) as ctx:
+            rest = _click_rest(ctx)
+            if not rest:
+                return None
+            name, cmd, args = cli.resolve_command(ctx, rest)
+            if cmd is None or name is None:
+                return None
+            with cmd.make_context(
+                name, args, parent=ctx, resilient_parsing=True
+            ) as sub:
+                return name, {"group": ctx.params, "command": sub.params}
+    except Exception:
+        return None
+
+
+def request_key(call: Tuple[str, Dict[str, Any]], request: Dict[str, Any]) -> str:
+    """Canonical hash of a call: command, parsed input, cwd and environment."""
+    env = request.get("env") or {}
+    doc = {
+        "command": call[0],
+        "params": call[1],
+        "cwd": request.get("cwd"),
+        "env": {k: v for k, v in env.items() if k not in _VOLATILE_ENV},
+    }
+    raw = json.dumps(doc, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _idempotent(name: str) -> bool:
+    from ..sdk import _REGISTRY
+
+    spec = _REGISTRY.get(name)
+    return bool(spec and spec.idempotent)
+
+
+def follow_ups(
+    data: Any, limit: int, prog_name: str, app_bin: Optional[str] = None
+) -> List[List[str]]:
+    """argv of the `command` fields of the first `limit` items of a result.
+
+    Only commands of this app are returned (`${APP_BIN} ...`, the app name
+    or `app_bin` itself).
+    """
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return []
+    out = []
+    for item in items[:limit]:
+        line = item.get("command") if isinstance(item, dict) else None
+        if not isinstance(line, str):
+            continue
+        try:
+            argv = shlex.split(line)
+        except ValueError:
+            continue
+        if argv and (
+            argv[0] in ("${APP_BIN}", "$APP_BIN", app_bin)
+            or os.path.basename(argv[0]) == prog_name
+        ):
+            out.append(argv[1:])
+    return out
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def run_request(
+    cli: click.Command,
+    prog_name: str,
+    request: Dict[str, Any],
+    fds: List[int],
+    conn: Optional[socket.socket] = None,
+    *,
+    report_fd: Optional[int] = None,
+    follow: int = 0,
+) -> int:
+    """Worker side: run one command on the given descriptors (forked child).
+
+    With `report_fd`, the follow-up commands of the result (see `follow_ups`)
+    are written to it as JSON once the command succeeded.
+    """
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    # Fresh streams on fds 0-2, as a cold process would have
+    sys.stdin = open(0, "r", closefd=False)
+    sys.stdout = open(1, "w", closefd=False)
+    sys.stderr = open(2, "w", closefd=False, errors="backslashreplace")
+    os.environ.clear()
+    os.environ.update(request.get("env") or {})
+    try:
+        os.chdir(request.get("cwd") or "/")
+    except OSError:
+        pass
+    if conn is not None:
+        conn.sendall(_CODE.pack(os.getpid()))
+    recorder = _Recorder() if report_fd is not None else None
+    try:
+        with redirect_envelopes(recorder) if recorder else nullcontext():
+            cli.main(args=list(request.get("argv") or []), prog_name=prog_name)
+        code = 0
+    except SystemExit as e:
+        code = _exit_code(e)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+    if report_fd is not None:
+        if code == 0 and recorder is not None and recorder.result is not None:
+            argvs = follow_ups(
+                recorder.result, follow, prog_name, os.environ.get("CHI_APP_BIN")
+            )
+            try:
+                _write_all(report_fd, json.dumps(argvs).encode())
+            except OSError:
+                pass
+        os.close(report_fd)
+    if conn is not None:
+        try:
+            conn.sendall(_CODE.pack(code))
+        except OSError:
+            pass
+    return code
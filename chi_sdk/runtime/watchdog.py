@@ -0,0 +1,135 @@
+"""Slow-command watchdog: dump thread stacks when a command runs too long.
+
+Enabled by `--slow-threshold-ms`, `slow_threshold_ms` on `chi_command` or
+`CHI_SLOW_MS` (in that order of precedence). Once the command has run past
+the threshold, a watcher thread appends the stacks of all threads to
+`<cache>/slow/<app>-<command>.log` and emits a progress envelope with
+`stage: "slow"` (a stderr notice in human mode). While the command keeps
+running, further dumps follow every threshold interval, up to `MAX_DUMPS`.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..chi_admin.utils import _user_cache_dir
+from .context import CommandContext
+
+MAX_DUMPS = 3
+
+
+def _safe(part: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in part) or "_"
+
+
+def log_path(app: str, command: str) -> Path:
+    return _user_cache_dir() / "slow" / f"{_safe(app)}-{_safe(command)}.log"
+
+
+def dump_stacks(path: Path, header: str, *, skip: Optional[int] = None) -> None:
+    """Append the Python stacks of all threads (except `skip`) to `path`."""
+    names = {t.ident: t.name for t in threading.enumerate()}
+    parts = [f"=== {header}\n"]
+    for ident, frame in sys._current_frames().items():
+        if ident == skip:
+            continue
+        parts.append(f"--- Thread {names.get(ident, '?')} (ident {ident})\n")
+        parts.extend(traceback.format_stack(frame))
+    parts.append("\n")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write("".join(parts))
+
+
+class SlowWatchdog:
+    """Instrument reporting commands that exceed `threshold` seconds."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.dumps = 0
+        self.path: Optional[Path] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._json = True
+
+    def _notify(self, run: CommandContext, elapsed_ms: int) -> None:
+        from ..sdk import emit_progress
+
+        if self._json:
+            emit_progress(
+                f"Still running after {elapsed_ms} ms",
+                stage="slow",
+                command=run.command,
+                extra={
+                    "elapsed_ms": elapsed_ms,
+                    "threshold_ms": round(self.threshold * 1000),
+                    "stack_log": str(self.path),
+                },
+            )
+        else:
+            import click
+
+            click.echo(
+                f"slow: {run.command} running for {elapsed_ms} ms; "
+                f"stacks in {self.path}",
+                err=True,
+            )
+
+    def _watch(self, run: CommandContext) -> None:
+        me = threading.get_ident()
+        while self.dumps < MAX_DUMPS and not self._stop.wait(self.threshold):
+            elapsed_ms = round((time.perf_counter() - run.started) * 1000)
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            self.path = log_path(run.app, run.command)
+            try:
+                dump_stacks(
+                    self.path,
+                    f"{stamp} {run.app} {run.command} pid {os.getpid()}: "
+                    f"running for {elapsed_ms} ms "
+                    f"(threshold {round(self.threshold * 1000)} ms)",
+                    skip=me,
+                )
+            except OSError:
+                return
+            self.dumps += 1
+            self._notify(run, elapsed_ms)
+
+    # ----- instrument protocol -----
+    def start(self, run: CommandContext) -> None:
+        from ..sdk import _json_mode
+
+        self._json = _json_mode()
+        # The copied context makes current_context() and the sink visible
+        ctx = contextvars.copy_context()
+        self._thread = threading.Thread(
+            target=ctx.run, args=(self._watch, run), name="chi-slow", daemon=True
+        )
+        self._thread.start()
+
+    def finish(self, run: CommandContext) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self.dumps:
+            run.meta["slow"] = {
+                "threshold_ms": round(self.threshold * 1000),
+                "dumps": self.dumps,
+                "stack_log": str(self.path),
+            }
+
+
+def from_options(obj: Dict[str, Any]) -> Optional[SlowWatchdog]:
+    raw = obj.get("slow_threshold_ms") or os.getenv("CHI_SLOW_MS")
+    try:
+        ms = float(raw) if raw else 0.0
+    except ValueError:
+        return None
+    return SlowWatchdog(ms / 1000.0) if ms > 0 else None
@@ -1,18 +1,34 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, Type, get_origin, get_args
+import inspect
 import json
 import os
 import importlib.metadata as importlib_metadata
 import subprocess
 import sys
-from pathlib import Path
+import time
 
 import click
+import pydantic_core
 from pydantic import BaseModel, ValidationError
 
 from .models import Envelope, ErrorPayload
-from .renderer import render_human_output
+from .renderer import compile_renderer, render_human_output
+from .runtime.context import (
+    CancelToken,
+    CommandCancelled,
+    CommandContext,
+    activate,
+    current_context,
+    current_sink,
+)
+from .runtime import instruments
+from .runtime.deadline import enforce, resolve_deadline, resolve_grace
+from .runtime.timings import format_timings, phase_durations
+
+# Key in click's shared `Context.meta`: perf_counter() before argument parsing
+_T0_KEY = "chi_sdk.t0"
 
 
 @dataclass
@@ -23,6 +39,14 @@ class CommandSpec:
     output_model: Optional[Type[BaseModel]]
     description: str
     human_renderer: Optional[Callable[[Any], str]] = None
+    timeout: Optional[float] = None
+    grace_period: Optional[float] = None
+    job: bool = False
+    pass_ctx: bool = False
+    slow_threshold_ms: Optional[float] = None
+    idempotent: bool = False
+    # Default human renderer derived from output_model at registration
+    compiled_renderer: Optional[Callable[[Any], None]] = None
 
 
 _REGISTRY: Dict[str, CommandSpec] = {}
@@ -35,6 +59,11 @@ def chi_command(
     output_model: Optional[Type[BaseModel]] = None,
     description: str = "",
     human_renderer: Optional[Callable[[Any], str]] = None,
+    timeout: Optional[float] = None,
+    grace_period: Optional[float] = None,
+    job: bool = False,
+    slow_threshold_ms: Optional[float] = None,
+    idempotent: bool = False,
 ):
     """Decorator to register a CLI command with typed I/O.
 
@@ -47,6 +76,24 @@ def chi_command(
                        Takes the output data and returns a formatted string.
                        If not provided, will use model's __str__ if available,
                        or fall back to default formatting.
+        timeout: Optional time budget in seconds. `CHI_DEADLINE_MS` can
+                 tighten it further. On expiry the command's cancel token
+                 is triggered (see `current_context()`).
+        grace_period: Seconds a cancelled command gets to return a partial
+                      result before it is aborted with a `timeout` error
+                      (defaults to `CHI_GRACE_MS` or 2s).
+        job: Run as a background job. The command returns a job id at once;
+             use the `jobs` subcommands to poll status and fetch the result.
+        slow_threshold_ms: Dump thread stacks and emit a `stage: "slow"`
+                           progress event when the command runs longer.
+                           `--slow-threshold-ms` overrides it; without
+                           either, `CHI_SLOW_MS` applies.
+        idempotent: The command only reads state, so its result may be
+                    computed ahead of time (`ui --prefetch`) and shared by
+                    identical concurrent calls (`ui --warm`).
+
+    A command function may declare a `ctx` parameter to receive its
+    `CommandContext` (cancel token, envelope meta).
     """
 
     def _wrap(func: Callable[..., Any]):
@@ -60,12 +107,30 @@ def chi_command(
             output_model=output_model,
             description=description.strip(),
             human_renderer=human_renderer,
+            timeout=timeout,
+            grace_period=grace_period,
+            job=job,
+            pass_ctx=_accepts_ctx(func),
+            slow_threshold_ms=slow_threshold_ms,
+            idempotent=idempotent,
+            compiled_renderer=(
+                compile_renderer(output_model)
+                if output_model and not human_renderer
+                else None
+            ),
         )
         return func
 
     return _wrap
 
 
+def _accepts_ctx(func: Callable[..., Any]) -> bool:
+    try:
+        return "ctx" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
 def _json_mode(ctx: Optional[click.Context] = None) -> bool:
     ctx = ctx or click.get_current_context(silent=True)
     env = os.getenv("CHI_TUI_JSON", "")
@@ -74,11 +139,40 @@ def _json_mode(ctx: Optional[click.Context] = None) -> bool:
     )
 
 
+def _envelope_json(env: Envelope, data_json: Optional[bytes] = None) -> str:
+    """`env` as JSON, splicing in `data_json` (its `data`, serialized before)."""
+    if data_json is None:
+        return env.model_dump_json()
+    head = env.model_dump_json(exclude={"data", "meta"})
+    meta = pydantic_core.to_json(env.meta).decode()
+    return f'{head[:-1]},"data":{data_json.decode()},"meta":{meta}}}'
+
+
+def _write_envelope(
+    env: Envelope, *, err: bool = False, data_json: Optional[bytes] = None
+) -> None:
+    run = current_context()
+    if run is not None and run.stamp:
+        for key, value in run.stamp.items():
+            env.meta.setdefault(key, value)
+    sink = current_sink()
+    if sink is not None:
+        sink(env)
+    else:
+        click.echo(_envelope_json(env, data_json), err=err)
+
+
+def _flag(ctx: Optional[click.Context], key: str, env_var: str) -> bool:
+    """Opt-in switch set by a group option (ctx.obj[key]) or an env var."""
+    env = os.getenv(env_var, "")
+    return bool((ctx and ctx.obj and ctx.obj.get(key)) or env in ("1", "true", "yes"))
+
+
 def emit_ok(
     data: Any, *, command: Optional[str] = None, meta: Optional[Dict[str, Any]] = None
 ):
     env = Envelope(ok=True, type="result", data=data, command=command, meta=meta or {})
-    click.echo(env.model_dump_json())
+    _write_envelope(env)
 
 
 def emit_error(
@@ -88,10 +182,20 @@ def emit_error(
     command: Optional[str] = None,
     details: Optional[Dict[str, Any]] = None,
     exit_code: int = 1,
+    meta: Optional[Dict[str, Any]] = None,
 ):
     payload = ErrorPayload(code=code, message=message, details=details)
-    env = Envelope(ok=False, type="error", data=payload.model_dump(), command=command)
-    click.echo(env.model_dump_json(), err=True)
+    run = current_context()
+    if run is not None:
+        run.error_code = code
+    env = Envelope(
+        ok=False,
+        type="error",
+        data=payload.model_dump(),
+        command=command,
+        meta=meta or {},
+    )
+    _write_envelope(env, err=True)
     raise click.exceptions.Exit(exit_code)
 
 
@@ -119,13 +223,16 @@ def emit_progress(
             payload["percent"] = float(percent)
         except Exception:
             payload["percent"] = percent
+    run = current_context()
+    if run is not None and isinstance(payload.get("percent"), float):
+        payload["percent"] = run.track_percent(payload["percent"])
     if stage is not None:
         payload["stage"] = stage
     if extra:
         payload.update(extra)
 
     env = Envelope(ok=True, type="progress", data=payload, command=command)
-    click.echo(env.model_dump_json())
+    _write_envelope(env)
 
 
 def _pyd_type_to_click(name: str, field) -> click.Parameter:
@@ -226,54 +333,190 @@ def _build_click_command(spec: CommandSpec) -> click.Command:
 
     def _callback(**kwargs):
         ctx = click.get_current_context()
-        try:
-            if spec.input_model:
-                # Convert JSON-like strings to objects when applicable
-                for k, v in list(kwargs.items()):
-                    if isinstance(v, str) and (
-                        v.strip().startswith("{") or v.strip().startswith("[")
-                    ):
-                        try:
-                            kwargs[k] = json.loads(v)
-                        except Exception:
-                            pass
-                input_obj = spec.input_model(**kwargs)
-            else:
-                input_obj = None
+        if not spec.job:
+            return _execute(ctx, kwargs)
 
-            result = spec.func(input_obj) if input_obj is not None else spec.func()
+        from .runtime import jobs
 
-            # Keep the model instance for potential __str__ usage
-            if spec.output_model:
-                model_instance = spec.output_model.model_validate(result)
-                data = model_instance.model_dump()
-            else:
-                model_instance = None
-                data = result
-
-            if _json_mode(ctx):
-                emit_ok(data, command=spec.name)
-            else:
-                # Use custom renderer if provided
-                if spec.human_renderer:
-                    output = spec.human_renderer(data)
-                    click.echo(output)
-                # Check if the model has custom __str__ method
-                elif model_instance and hasattr(model_instance.__class__, "__str__"):
-                    click.echo(str(model_instance))
-                else:
-                    render_human_output(data)
-        except ValidationError as ve:
-            emit_error(
-                "validation_error",
-                "Invalid input/output payload",
+        app = (ctx.obj or {}).get("app") or ctx.find_root().info_name or "chi"
+        handle = jobs.launch(app, spec.name, kwargs)
+        if handle.worker:
+            ctx.ensure_object(dict)["json"] = True
+            jobs.run_worker(handle, lambda: _execute(ctx, kwargs))
+            return
+        if _json_mode(ctx):
+            emit_ok(
+                {"job_id": handle.id, "status": "queued"},
                 command=spec.name,
-                details={"errors": ve.errors()},
+                meta={"job": True},
             )
-        except click.ClickException as ce:
-            emit_error("cli_error", str(ce), command=spec.name)
-        except Exception as e:
-            emit_error("runtime_error", str(e), command=spec.name)
+        else:
+            click.echo(f"Submitted job {handle.id}")
+            click.echo(f"Check: {app} jobs status {handle.id}")
+
+    def _execute(ctx: click.Context, kwargs: Dict[str, Any]):
+        run = CommandContext(
+            command=spec.name,
+            token=CancelToken(resolve_deadline(spec.timeout)),
+            app=(ctx.obj or {}).get("app") or ctx.find_root().info_name or "chi",
+        )
+        timings = _flag(ctx, "timings", "CHI_TIMINGS")
+        run.started = ctx.meta.get(_T0_KEY, run.started)
+        options = dict(ctx.obj or {})
+        if spec.slow_threshold_ms and not options.get("slow_threshold_ms"):
+            options["slow_threshold_ms"] = spec.slow_threshold_ms
+        active = instruments.collect(options)
+        closing = list(active)
+
+        def _stop_instruments() -> None:
+            while active:
+                active.pop().finish(run)
+
+        def _finish_meta() -> Dict[str, Any]:
+            _stop_instruments()
+            if timings:
+                run.meta["timings"] = phase_durations(run, ctx.meta.get(_T0_KEY))
+            return run.meta
+
+        with activate(run):
+            for inst in active:
+                inst.start(run)
+            try:
+                with enforce(run.token, resolve_grace(spec.grace_period)):
+                    with run.phase("input"):
+                        if spec.input_model:
+                            # Convert JSON-like strings to objects when applicable
+                            for k, v in list(kwargs.items()):
+                                if isinstance(v, str) and (
+                                    v.strip().startswith("{")
+                                    or v.strip().startswith("[")
+                                ):
+                                    try:
+                                        kwargs[k] = json.loads(v)
+                                    except Exception:
+                                        pass
+                            input_obj = spec.input_model(**kwargs)
+                        else:
+                            input_obj = None
+                    run.input = input_obj
+
+                    call_args = [input_obj] if input_obj is not None else []
+                    call_kwargs = {"ctx": run} if spec.pass_ctx else {}
+                    with run.phase("body"):
+                        result = spec.func(*call_args, **call_kwargs)
+                    if run.token.cancelled:
+                        run.meta["partial"] = True
+                        run.meta["cancel_reason"] = run.token.reason
+
+                    # Keep the model instance for potential __str__ usage
+                    if spec.output_model:
+                        with run.phase("validate"):
+                            model_instance = spec.output_model.model_validate(result)
+                        with run.phase("dump"):
+                            data = model_instance.model_dump()
+                    else:
+                        model_instance = None
+                        data = result
+
+                    if _json_mode(ctx):
+                        _stop_instruments()
+                        if timings:
+                            # Serialize the payload up front so the envelope
+                            # can report the cost; it is emitted as is.
+                            with run.phase("serialize"):
+                                data_json = pydantic_core.to_json(data)
+                            _write_envelope(
+                                Envelope(
+                                    ok=True,
+                                    type="result",
+                                    data=data,
+                                    command=spec.name,
+                                    meta=_finish_meta(),
+                                ),
+                                data_json=data_json,
+                            )
+                        else:
+                            emit_ok(data, command=spec.name, meta=_finish_meta())
+                    else:
+                        if run.meta.get("partial"):
+                            click.echo(
+                                f"Warning: partial result ({run.token.reason})",
+                                err=True,
+                            )
+                        with run.phase("render"):
+                            # Use custom renderer if provided
+                            if spec.human_renderer:
+                                output = spec.human_renderer(data)
+                                click.echo(output)
+                            # Check if the model has custom __str__ method
+                            elif (
+                                model_instance is not None
+                                and type(model_instance).__str__
+                                is not BaseModel.__str__
+                            ):
+                                click.echo(str(model_instance))
+                            else:
+                                # JSON-mode dump: datetimes, paths etc. as text
+                                plain = (
+                                    model_instance.model_dump(mode="json")
+                                    if model_instance is not None
+                                    else data
+                                )
+                                if spec.compiled_renderer:
+                                    spec.compiled_renderer(plain)
+                                else:
+                                    render_human_output(plain)
+                        meta = _finish_meta()
+                        if timings:
+                            click.echo(format_timings(meta["timings"]), err=True)
+                        for key in ("profile", "sampling"):
+                            if meta.get(key, {}).get("path"):
+                                click.echo(f"{key}: {meta[key]['path']}", err=True)
+                        if meta.get("memory"):
+                            from .runtime.memory import format_memory
+
+                            click.echo(format_memory(meta["memory"]), err=True)
+                    if not run.meta.get("partial"):
+                        run.clear_checkpoint()
+            except CommandCancelled as cc:
+                if cc.reason == "memory_limit":
+                    meta = _finish_meta()
+                    emit_error(
+                        "memory_limit",
+                        "Command exceeded its memory limit",
+                        command=spec.name,
+                        details=meta.get("memory"),
+                        meta=meta,
+                    )
+                timed_out = cc.reason == "timeout"
+                emit_error(
+                    "timeout" if timed_out else "cancelled",
+                    (
+                        "Command exceeded its deadline"
+                        if timed_out
+                        else "Command cancelled by signal"
+                    ),
+                    command=spec.name,
+                    exit_code=124 if timed_out else 130,
+                    meta=_finish_meta(),
+                )
+            except ValidationError as ve:
+                emit_error(
+                    "validation_error",
+                    "Invalid input/output payload",
+                    command=spec.name,
+                    details={"errors": ve.errors()},
+                    meta=_finish_meta(),
+                )
+            except click.ClickException as ce:
+                emit_error("cli_error", str(ce), command=spec.name, meta=_finish_meta())
+            except Exception as e:
+                emit_error(
+                    "runtime_error", str(e), command=spec.name, meta=_finish_meta()
+                )
+            finally:
+                _stop_instruments()
+                instruments.close(closing, run)
 
     return click.Command(
         name=spec.name, params=params, callback=_callback, help=spec.description or None
@@ -287,6 +530,43 @@ def _dist_version(dist_name: str) -> Optional[str]:
         return None
 
 
+class _ChiGroup(click.Group):
+    def make_context(self, info_name, args, parent=None, **extra):
+        started = time.perf_counter()
+        ctx = super().make_context(info_name, args, parent=parent, **extra)
+        ctx.meta.setdefault(_T0_KEY, started)
+        return ctx
+
+
+def _start_warm_backend(
+    ctx: click.Context, env_updates: Dict[str, str], *, prefetch: int = 0
+) -> None:
+    """Point CHI_APP_BIN at a warm server for this CLI (see runtime.warm)."""
+    import shlex
+    import shutil
+
+    from .runtime import warm
+
+    root = ctx.find_root()
+    backend = env_updates.get("CHI_APP_BIN") or os.environ.get("CHI_APP_BIN", "")
+    argv = shlex.split(backend)
+    # Only this app can be served warm; other backends run as configured
+    if len(argv) != 1 or os.path.basename(argv[0]) != root.info_name:
+        click.echo(f"--warm ignored: backend '{backend}' is not this app", err=True)
+        return
+    if not warm.supported():
+        click.echo("--warm ignored: not supported on this platform", err=True)
+        return
+    shim = warm.start(
+        root.command,
+        root.info_name,
+        [shutil.which(argv[0]) or argv[0]],
+        prefetch=prefetch,
+    )
+    if shim:
+        env_updates["CHI_APP_BIN"] = shim
+
+
 def build_cli(
     app_name: str = "chi",
     *,
@@ -305,6 +585,7 @@ def build_cli(
     sdk_version = _dist_version("chi-sdk") or "0.0.0.dev"
 
     @click.group(
+        cls=_ChiGroup,
         help=f"{app_name} — CHI TUI CLI (Python source of truth)",
         invoke_without_command=True,
     )
@@ -314,10 +595,19 @@ def build_cli(
     @click.option(
         "--version", "show_version", is_flag=True, help="Show version and exit"
     )
+    @click.option(
+        "--timings",
+        is_flag=True,
+        help="Report per-phase durations in meta.timings (or CHI_TIMINGS=1)",
+    )
+    @instruments.group_options
     @click.pass_context
-    def cli(ctx, json_mode: bool, show_version: bool):
+    def cli(ctx, json_mode: bool, show_version: bool, timings: bool, **instr):
         ctx.ensure_object(dict)
         ctx.obj["json"] = json_mode
+        ctx.obj["timings"] = timings
+        ctx.obj.update(instr)
+        ctx.obj["app"] = app_name
         if show_version:
             # honor JSON mode
             if _json_mode(ctx):
@@ -336,8 +626,11 @@ def build_cli(
     @cli.command("schema", help="Emit JSON Schema for all commands")
     @click.pass_context
     def schema_cmd(ctx):
+        timings = _flag(ctx, "timings", "CHI_TIMINGS")
+        per_command: Dict[str, float] = {}
         cmds = []
         for spec in _REGISTRY.values():
+            started = time.perf_counter()
             cmds.append(
                 {
                     "name": spec.name,
@@ -354,11 +647,17 @@ def build_cli(
                     ),
                 }
             )
+            per_command[spec.name] = round((time.perf_counter() - started) * 1000, 3)
         payload = {"app": app_name, "version": "1.0", "commands": cmds}
+        # With --timings: schema generation time per command (ms)
+        meta = {"timings": {"schema_ms": per_command}} if timings else None
         if _json_mode(ctx):
-            emit_ok(payload, command="schema")
+            emit_ok(payload, command="schema", meta=meta)
         else:
             click.echo(json.dumps(payload, indent=2, ensure_ascii=False))
+            if meta:
+                parts = [f"{k}={v:.2f}ms" for k, v in per_command.items()]
+                click.echo("schema timings: " + " ".join(parts), err=True)
 
     @cli.command("ui", help="Launch Terminal UI")
     @click.option(
@@ -371,73 +670,41 @@ def build_cli(
         default=None,
         help="Explicit backend command/binary name (sets CHI_APP_BIN)",
     )
+    @click.option(
+        "--warm",
+        is_flag=True,
+        help="Serve backend calls from a pre-imported process (or CHI_UI_WARM=1)",
+    )
+    @click.option(
+        "--prefetch",
+        type=int,
+        default=None,
+        help="With --warm: run the follow-ups of the first N list items ahead "
+        "of time (or CHI_UI_PREFETCH=N)",
+    )
     @click.pass_context
-    def ui_cmd(ctx, rebuild: bool, release: bool, app_bin_override: Optional[str]):
+    def ui_cmd(
+        ctx,
+        rebuild: bool,
+        release: bool,
+        app_bin_override: Optional[str],
+        warm: bool,
+        prefetch: Optional[int],
+    ):
         """Launch the TUI for this CLI application.
 
         Options:
         - --rebuild: build the Rust TUI locally (dev) before launching
         - --release: build using cargo --release (implies --rebuild)
+        - --warm: keep this app imported in a background server for the session
+        - --prefetch N: precompute drill-downs of list results (implies --warm)
         """
 
-        # Helpers (scoped inside to avoid polluting module namespace)
-        def _find_upwards(start: Path, marker: str) -> Optional[Path]:
-            """Search upwards from `start` for a directory containing `marker`.
-
-            Returns the directory that directly contains the marker path,
-            or None if not found within a reasonable depth.
-            """
-            cur = start
-            for _ in range(6):
-                if (cur / marker).exists():
-                    return cur
-                if cur.parent == cur:
-                    break
-                cur = cur.parent
-            return None
-
-        def _find_rust_tui_dir() -> Optional[Path]:
-            # 1) Env override
-            env_dir = os.getenv("CHI_RUST_TUI_DIR") or os.getenv("CHI_TUI_RUST_DIR")
-            if env_dir:
-                p = Path(env_dir)
-                if (p / "Cargo.toml").exists():
-                    return p
-
-            # 2) Search upwards from CWD for rust-tui/Cargo.toml
-            root = _find_upwards(Path.cwd(), "rust-tui/Cargo.toml")
-            if root:
-                return root / "rust-tui"
-
-            # 3) If running from editable install within this monorepo, try relative to this file
-            here = Path(__file__).resolve()
-            for base in list(here.parents)[:6]:
-                cand = base / "rust-tui" / "Cargo.toml"
-                if cand.exists():
-                    return cand.parent
-            return None
-
-        def _find_app_root_with_tui() -> Optional[Path]:
-            # Look for a directory containing .tui/chi-index.yaml (current or upwards)
-            return _find_upwards(Path.cwd(), ".tui/chi-index.yaml")
-
-        def _read_app_bin_from_config(config_dir: Path) -> Optional[str]:
-            cfg = config_dir / "config.yaml"
-            if not cfg.exists():
-                return None
-            try:
-                text = cfg.read_text(encoding="utf-8")
-            except Exception:
-                return None
-            # very small parse to avoid yaml dep
-            import re as _re
-
-            m = _re.search(r"(?m)^\s*app_bin\s*:\s*['\"]?([^'\"\s]+)['\"]?\s*$", text)
-            return m.group(1) if m else None
+        from .runtime.launch import find_rust_tui_dir, launch_plan
 
-        # Set up environment for TUI (backend-agnostic)
-        env = os.environ.copy()
-        env["CHI_TUI_JSON"] = "1"
+        plan = launch_plan()
+        # Environment for the TUI (backend-agnostic)
+        env_updates = {"CHI_TUI_JSON": "1"}
 
         # Backend resolution policy (agnostic, minimum surprises):
         # 1) Use --bin if provided
@@ -445,23 +712,16 @@ def build_cli(
         # 3) If .tui/config.yaml has app_bin, use it
         # 4) Fallback to the CLI group name (ctx/app_name)
         if app_bin_override:
-            env["CHI_APP_BIN"] = app_bin_override
-        elif not env.get("CHI_APP_BIN"):
-            # Try .tui/config.yaml near CWD
-            app_root = _find_app_root_with_tui()
-            if app_root and (app_root / ".tui" / "config.yaml").exists():
-                val = _read_app_bin_from_config(app_root / ".tui")
-                if val:
-                    env["CHI_APP_BIN"] = val
-                else:
-                    env["CHI_APP_BIN"] = ctx.parent.info_name or app_name
-            else:
-                env["CHI_APP_BIN"] = ctx.parent.info_name or app_name
+            env_updates["CHI_APP_BIN"] = app_bin_override
+        elif not os.environ.get("CHI_APP_BIN"):
+            env_updates["CHI_APP_BIN"] = (
+                plan.app_bin or ctx.parent.info_name or app_name
+            )
 
         # Optional dev rebuild
         runner: Optional[str] = None
         if rebuild or release:
-            rust_dir = _find_rust_tui_dir()
+            rust_dir = find_rust_tui_dir()
             if not rust_dir:
                 click.echo(
                     "Rebuild requested, but 'rust-tui' was not found near the working directory."
@@ -470,16 +730,22 @@ def build_cli(
                     "Tip: run from the repo root, or set CHI_RUST_TUI_DIR=/path/to/rust-tui."
                 )
             else:
+                from .chi_admin import build_cache
+
                 try:
-                    profile = "release" if release else "debug"
-                    cmd = ["cargo", "build"] + (["--release"] if release else [])
-                    subprocess.run(cmd, cwd=str(rust_dir), check=True)
-                    exe = "chi-tui.exe" if sys.platform == "win32" else "chi-tui"
-                    built = rust_dir / "target" / profile / exe
-                    if not built.exists():
-                        click.echo(f"Build succeeded but binary not found: {built}")
+                    # Skipped when the sources match an earlier build
+                    built = build_cache.build(rust_dir, release=release)
+                    if built is None:
+                        click.echo(
+                            f"Build succeeded but binary not found in {rust_dir}"
+                        )
                     else:
-                        runner = str(built)
+                        if built.reused:
+                            click.echo(
+                                f"Using cached TUI build {built.fingerprint[:12]}",
+                                err=True,
+                            )
+                        runner = str(built.path)
                 except FileNotFoundError:
                     click.echo(
                         "Error: 'cargo' not found. Install Rust from https://rustup.rs and retry.",
@@ -493,20 +759,31 @@ def build_cli(
                     )
                     sys.exit(e.returncode)
 
-        # Prefer running from a directory that contains .tui when possible
-        workdir = _find_app_root_with_tui()
-        # If we found a workdir, set CHI_TUI_CONFIG_DIR explicitly to avoid cwd coupling
-        if workdir:
-            cfg_dir = workdir / ".tui"
-            if (cfg_dir / "chi-index.yaml").exists():
-                env["CHI_TUI_CONFIG_DIR"] = str(cfg_dir)
+        # Run from the directory that contains .tui, and point the TUI at
+        # the config explicitly to avoid cwd coupling
+        workdir = plan.workdir
+        if plan.config_dir:
+            env_updates["CHI_TUI_CONFIG_DIR"] = plan.config_dir
+        if prefetch is None:
+            try:
+                prefetch = int(os.getenv("CHI_UI_PREFETCH") or 0)
+            except ValueError:
+                prefetch = 0
+        if warm or prefetch > 0 or os.getenv("CHI_UI_WARM", "") in ("1", "true", "yes"):
+            _start_warm_backend(ctx, env_updates, prefetch=max(prefetch, 0))
+        env = {**os.environ, **env_updates}
+        cmd = [runner or plan.runner or "chi-tui"]
 
-        # Try to run the TUI
         try:
-            cmd = [runner or "chi-tui"]
-            result = subprocess.run(
-                cmd, env=env, cwd=str(workdir) if workdir else None, check=False
-            )
+            if os.name == "posix":
+                # Hand the process over to the TUI instead of idling in Python
+                # for the whole session (signals go straight to chi-tui)
+                sys.stdout.flush()
+                sys.stderr.flush()
+                if workdir:
+                    os.chdir(workdir)
+                os.execvpe(cmd[0], cmd, env)
+            result = subprocess.run(cmd, env=env, cwd=workdir, check=False)
             sys.exit(result.returncode)
         except FileNotFoundError:
             click.echo("Error: Terminal UI not found.")
@@ -521,6 +798,12 @@ def build_cli(
             click.echo(f"Error launching TUI: {e}", err=True)
             sys.exit(1)
 
+    from .runtime.jobs_cli import jobs_group
+    from .runtime.metrics_cli import metrics_cmd
+
+    cli.add_command(jobs_group)
+    cli.add_command(metrics_cmd)
+
     for spec in _REGISTRY.values():
         cli.add_command(_build_click_command(spec))
 
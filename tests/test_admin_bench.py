@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from chi_sdk.admin import cli
+
+_APP = """
+from pydantic import BaseModel
+from chi_sdk import build_cli, chi_command
+
+class Out(BaseModel):
+    items: list
+
+@chi_command(name="list-items", output_model=Out)
+def list_items() -> Out:
+    return Out(items=[{"id": i, "title": f"t{i}"} for i in range(5)])
+
+@chi_command(name="boom", output_model=Out)
+def boom() -> Out:
+    raise RuntimeError("nope")
+
+build_cli("bench-app")()
+"""
+
+
+def test_bench_reads_nav_config_and_reports_errors(tmp_path, monkeypatch):
+    app = tmp_path / "app.py"
+    app.write_text(_APP, encoding="utf-8")
+    tui = tmp_path / ".tui"
+    (tui / "panels").mkdir(parents=True)
+    (tui / "chi-index.yaml").write_text(
+        'menu:\n  - id: "list"\n    command: "${APP_BIN} list-items"\n'
+        '  - id: "panel"\n    widget: panel\n    pane_b_yaml: "panels/b.yaml"\n',
+        encoding="utf-8",
+    )
+    (tui / "panels" / "b.yaml").write_text(
+        'type: json_viewer\ncmd: "${APP_BIN} boom"\n', encoding="utf-8"
+    )
+    monkeypatch.setenv("PYTHONPATH", str(Path(__file__).resolve().parents[1]))
+    app_bin = f'"{sys.executable}" "{app}"'
+
+    res = CliRunner().invoke(
+        cli,
+        ["--json", "bench", "--config", str(tui), "--app-bin", app_bin, "-n", "2"],
+    )
+    assert res.exit_code == 0, res.output
+    report = json.loads(res.output)["data"]
+    by_screen = {r["screen"]: r for r in report["commands"]}
+    ok, bad = by_screen["list"], by_screen["panel"]
+    assert ok["runs"] == 2 and ok["errors"] == 0
+    assert ok["cold_ms"] > 0 and ok["warm_ms"]["p50"] > 0
+    assert ok["envelope_bytes"]["mean"] > 0
+    assert bad["error_rate"] == 1.0 and bad["error_codes"] == {"runtime_error": 2}
+    assert report["total"]["runs"] == 4
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from chi_sdk.admin import cli
+from chi_sdk.chi_admin.perf import parse_importtime
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_BACKEND = """#!{python}
+import time
+from pydantic import BaseModel
+from chi_sdk import build_cli, chi_command
+
+
+class SlowOut(BaseModel):
+    n: int
+
+    @classmethod
+    def model_json_schema(cls, *args, **kwargs):
+        time.sleep(0.08)
+        return super().model_json_schema(*args, **kwargs)
+
+
+class FastOut(BaseModel):
+    n: int
+
+
+@chi_command(name="slow-schema", output_model=SlowOut)
+def slow() -> SlowOut:
+    return SlowOut(n=1)
+
+
+@chi_command(name="fast-schema", output_model=FastOut)
+def fast() -> FastOut:
+    return FastOut(n=1)
+
+
+build_cli("perf-app", app_version="1.0")()
+"""
+
+
+def test_parse_importtime_depth():
+    rows = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     zipimport\n"
+        "import time:      2500 |      30000 | chi_sdk\n"
+    )
+    assert [(r["module"], r["depth"]) for r in rows] == [
+        ("zipimport", 2),
+        ("chi_sdk", 0),
+    ]
+    assert rows[1]["cumulative_ms"] == 30.0
+
+
+def test_doctor_perf_reports_backend_latency(tmp_path):
+    backend = tmp_path / "perf-app"
+    backend.write_text(_BACKEND.format(python=sys.executable))
+    backend.chmod(backend.stat().st_mode | stat.S_IXUSR)
+    env = {
+        "CHI_APP_BIN": str(backend),
+        "CHI_TUI_JSON": "1",
+        "PYTHONPATH": os.pathsep.join([str(ROOT), os.environ.get("PYTHONPATH", "")]),
+    }
+    res = CliRunner().invoke(cli, ["doctor", "--perf", "--runs", "1"], env=env)
+    assert res.exit_code == 0, res.output
+    perf = json.loads(res.output)["data"]["perf"]
+    assert perf["version_ms"] > 0 and perf["interpreter_ms"] > 0
+    assert perf["schema_bytes"] > 100
+    assert perf["imports"]["modules"] > 10
+    assert "chi_sdk" in [r["module"] for r in perf["imports"]["top_cumulative"]]
+    assert perf["slow_schema_commands"] == ["slow-schema"]
+    assert set(perf["schema_commands_ms"]) == {"slow-schema", "fast-schema"}
+    assert any("slow-schema" in w for w in perf["warnings"])
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from chi_sdk.admin import cli
+
+_APP = """
+import time
+from pydantic import BaseModel
+from chi_sdk import build_cli, chi_command, emit_progress
+
+class ItemsOut(BaseModel):
+    items: list
+
+class DetailIn(BaseModel):
+    id: int
+
+class DetailOut(BaseModel):
+    id: int
+
+@chi_command(name="list-items", output_model=ItemsOut)
+def list_items() -> ItemsOut:
+    emit_progress("loading", percent=0, command="list-items")
+    time.sleep(0.2)
+    return ItemsOut(
+        items=[{"id": i, "title": f"t{i}", "command": f"${APP_BIN} detail --id {i}"}
+               for i in range(3)]
+    )
+
+@chi_command(name="detail", input_model=DetailIn, output_model=DetailOut)
+def detail(inp: DetailIn) -> DetailOut:
+    return DetailOut(id=inp.id)
+
+build_cli("replay-app")()
+"""
+
+
+def test_replay_times_screens_and_enforces_budgets(tmp_path, monkeypatch):
+    app = tmp_path / "app.py"
+    app.write_text(_APP.replace("${APP_BIN}", "${{APP_BIN}}"), encoding="utf-8")
+    tui = tmp_path / ".tui"
+    tui.mkdir()
+    (tui / "chi-index.yaml").write_text(
+        "menu:\n"
+        '  - id: "list"\n'
+        '    widget: "lazy_items"\n'
+        '    command: "${APP_BIN} list-items"\n'
+        '  - id: "more"\n'
+        "    items:\n"
+        '      - id: "one"\n'
+        '        cmd: "${APP_BIN} detail --id 1"\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("PYTHONPATH", str(Path(__file__).resolve().parents[1]))
+    monkeypatch.setenv("CHI_APP_BIN", f'"{sys.executable}" "{app}"')
+
+    res = CliRunner().invoke(
+        cli,
+        ["--json", "replay", "--config", str(tui), "--follow", "2"]
+        + ["--budget", "more/one=0.001"],
+    )
+    assert res.exit_code == 1, res.output  # more/one is over its budget
+    report = json.loads(res.output)["data"]
+    screens = {s["screen"]: s for s in report["screens"]}
+    assert set(screens) == {"list", "more/one"}
+    lst = screens["list"]
+    assert lst["ok"] and lst["first_envelope_ms"] < lst["steps"][0]["result_ms"]
+    assert [s["role"] for s in lst["steps"]] == ["command", "item", "item"]
+    assert lst["steps"][1]["command"].endswith("detail --id 0")
+    assert report["over_budget"] == ["more/one"] and report["failed"] == []
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BENCH = Path(__file__).resolve().parents[1] / "benchmarks" / "bench_sdk.py"
+
+
+def test_bench_quick_subset_writes_comparable_results(tmp_path):
+    out = tmp_path / "bench.json"
+    cmd = [sys.executable, str(BENCH), "--quick", "--only", "emit", "--out", str(out)]
+    subprocess.run(cmd, check=True, capture_output=True, timeout=120)
+    doc = json.loads(out.read_text())
+    assert set(doc["results"]) == {"emit_ok", "emit_progress"}
+    assert doc["results"]["emit_ok"]["ops_per_s"] > 0
+
+    # comparing against itself with a generous threshold never flags a regression
+    res = subprocess.run(
+        cmd + ["--compare", str(out), "--threshold", "100"],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert res.returncode == 0, res.stderr
+    assert "vs baseline" in res.stdout
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+import stat
+
+import pytest
+
+from chi_sdk.chi_admin import build_cache
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="shell script stand-ins")
+
+_CARGO = """#!/bin/sh
+echo "$@" >> "$CARGO_LOG"
+profile=debug
+[ "$2" = "--release" ] && profile=release
+mkdir -p target/$profile
+cat src/main.rs > target/$profile/chi-tui
+"""
+
+
+def _tool(bindir, name, body):
+    path = bindir / name
+    path.write_text(body)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+
+
+@pytest.fixture
+def crate(tmp_path, monkeypatch):
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    _tool(bindir, "cargo", _CARGO)
+    _tool(bindir, "rustc", "#!/bin/sh\necho 'rustc 1.80.0 (test)'\n")
+    monkeypatch.setenv("PATH", f"{bindir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("CARGO_LOG", str(tmp_path / "cargo.log"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    src = tmp_path / "rust-tui"
+    (src / "src").mkdir(parents=True)
+    (src / "Cargo.toml").write_text('[package]\nname = "chi-tui"\n')
+    (src / "src" / "main.rs").write_text("fn main() {}\n")
+    return src
+
+
+def _cargo_runs(src):
+    log = src.parent / "cargo.log"
+    return log.read_text().splitlines() if log.exists() else []
+
+
+def test_build_skips_cargo_when_fingerprint_matches(crate):
+    first = build_cache.build(crate)
+    assert not first.reused and _cargo_runs(crate) == ["build --release"]
+    assert (crate / "target/release/chi-tui.fingerprint").read_text().strip() == (
+        first.fingerprint
+    )
+    again = build_cache.build(crate)
+    assert again.reused and again.path == first.path
+    assert len(_cargo_runs(crate)) == 1
+
+    # A branch switch rebuilds once; switching back reuses the cached binary
+    (crate / "src" / "main.rs").write_text("fn main() { other() }\n")
+    other = build_cache.build(crate)
+    assert other.fingerprint != first.fingerprint and len(_cargo_runs(crate)) == 2
+    (crate / "src" / "main.rs").write_text("fn main() {}\n")
+    back = build_cache.build(crate)
+    assert back.reused and back.path.read_text() == "fn main() {}\n"
+    assert len(_cargo_runs(crate)) == 2
+    assert build_cache.build(crate, release=False).fingerprint != first.fingerprint
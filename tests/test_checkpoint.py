@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command, emit_progress
+
+_CALLS = {"fail_at": 3}
+
+
+class _BatchIn(BaseModel):
+    total: int
+
+
+class _BatchOut(BaseModel):
+    done: int
+
+
+@chi_command(name="t-batch", input_model=_BatchIn, output_model=_BatchOut)
+def _t_batch(inp: _BatchIn, ctx) -> _BatchOut:
+    start = ctx.restore() or 0
+    for i in range(start, inp.total):
+        if i == _CALLS["fail_at"]:
+            raise RuntimeError("boom")
+        emit_progress(percent=(i + 1) * 100 / inp.total, command="t-batch")
+        ctx.checkpoint(i + 1)
+    return _BatchOut(done=inp.total - start)
+
+
+def test_rerun_resumes_from_last_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    cli = build_cli("ckpt-app")
+    r = CliRunner()
+
+    res = r.invoke(cli, ["--json", "t-batch", "--total", "5"])
+    assert res.exit_code == 1
+    assert list(tmp_path.rglob("*.json"))
+
+    _CALLS["fail_at"] = -1
+    res = r.invoke(cli, ["--json", "t-batch", "--total", "5"])
+    assert res.exit_code == 0, res.output
+    lines = [json.loads(ln) for ln in res.output.splitlines() if ln.strip()]
+    assert lines[0]["data"] == {
+        "message": "Resuming from checkpoint",
+        "percent": 60.0,
+        "stage": "resumed",
+    }
+    assert lines[-1]["data"] == {"done": 2}
+    assert lines[-1]["meta"] == {"resumed": True}
+    # Finished runs drop their checkpoint
+    assert not list(tmp_path.rglob("*.json"))
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import time
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command, current_context
+
+
+class _CountOut(BaseModel):
+    count: int
+
+
+@chi_command(name="t-partial", output_model=_CountOut, timeout=0.05)
+def _t_partial(ctx) -> _CountOut:
+    count = 0
+    while not ctx.cancelled:
+        count += 1
+        time.sleep(0.005)
+    return _CountOut(count=count)
+
+
+@chi_command(name="t-stubborn", output_model=_CountOut, timeout=0.05, grace_period=0.05)
+def _t_stubborn() -> _CountOut:
+    assert current_context() is not None
+    time.sleep(5)
+    return _CountOut(count=0)
+
+
+def test_deadline_returns_partial_result():
+    cli = build_cli("deadline-app")
+    res = CliRunner().invoke(cli, ["--json", "t-partial"])
+    assert res.exit_code == 0, res.output
+    env = json.loads(res.output)
+    assert env["ok"] is True
+    assert env["meta"] == {"partial": True, "cancel_reason": "timeout"}
+    assert env["data"]["count"] > 0
+
+
+def test_deadline_without_cooperation_emits_timeout_error(monkeypatch):
+    monkeypatch.setenv("CHI_DEADLINE_MS", "20")
+    cli = build_cli("deadline-app")
+    started = time.monotonic()
+    res = CliRunner().invoke(cli, ["--json", "t-stubborn"])
+    assert time.monotonic() - started < 2
+    assert res.exit_code == 124
+    env = json.loads(res.output)
+    assert env["ok"] is False
+    assert env["data"]["code"] == "timeout"
+
+
+def test_grace_timer_never_interrupts_after_exit(monkeypatch):
+    from chi_sdk.runtime import deadline
+    from chi_sdk.runtime.context import CancelToken
+
+    calls = []
+
+    def slow_interrupt():
+        time.sleep(0.05)  # delivery racing with __exit__
+        calls.append(time.monotonic())
+
+    monkeypatch.setattr(deadline, "interrupt_main", slow_interrupt)
+    for _ in range(5):
+        token = CancelToken()
+        with deadline.enforce(token, grace=0):
+            token.cancel("cancelled")
+            time.sleep(0.001)
+        exited = time.monotonic()
+        time.sleep(0.06)
+        assert all(at <= exited for at in calls)
+
+
+def test_handlers_are_restored_when_exit_is_interrupted():
+    import signal
+
+    from chi_sdk.runtime import deadline
+    from chi_sdk.runtime.context import CancelToken, CommandCancelled
+
+    class _Timer:
+        def cancel(self):
+            pass
+
+        def join(self):
+            raise CommandCancelled("cancelled")  # a signal landing mid-exit
+
+    before = signal.getsignal(signal.SIGINT)
+    guard = deadline.enforce(CancelToken(), grace=1)
+    try:
+        with guard:
+            assert signal.getsignal(signal.SIGINT) == guard._on_signal
+            guard._grace_timer = _Timer()
+    except CommandCancelled:
+        pass
+    assert signal.getsignal(signal.SIGINT) is before
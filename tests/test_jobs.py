@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command, emit_progress
+
+
+class _JobIn(BaseModel):
+    n: int
+
+
+class _JobOut(BaseModel):
+    total: int
+
+
+@chi_command(name="t-job", input_model=_JobIn, output_model=_JobOut, job=True)
+def _t_job(inp: _JobIn) -> _JobOut:
+    emit_progress(message="halfway", percent=50, command="t-job")
+    return _JobOut(total=sum(range(inp.n)))
+
+
+def _invoke(cli, args):
+    res = CliRunner().invoke(cli, ["--json", *args])
+    return res, json.loads(res.output.splitlines()[-1])
+
+
+def test_job_submit_poll_and_fetch_result(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    cli = build_cli("jobs-app")
+
+    res, env = _invoke(cli, ["t-job", "--n", "10"])
+    assert res.exit_code == 0, res.output
+    job_id = env["data"]["job_id"]
+    assert env["meta"] == {"job": True}
+
+    deadline = time.monotonic() + 10
+    status = None
+    while time.monotonic() < deadline:
+        _, env = _invoke(cli, ["jobs", "status", job_id])
+        status = env["data"]
+        if status["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.05)
+    assert status["status"] == "succeeded"
+    assert status["progress"]["percent"] == 50.0
+
+    res, env = _invoke(cli, ["jobs", "result", job_id])
+    assert res.exit_code == 0, res.output
+    assert env["type"] == "result"
+    assert env["data"] == {"total": 45}
+
+    _, env = _invoke(cli, ["jobs", "list"])
+    assert [j["id"] for j in env["data"]["items"]] == [job_id]
+
+    res, env = _invoke(cli, ["jobs", "status", "missing"])
+    assert res.exit_code == 2
+    assert env["data"]["code"] == "job_not_found"
+
+
+def test_job_cancelled_while_queued_never_runs(tmp_path, monkeypatch):
+    from chi_sdk.runtime import jobs
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    with jobs._connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, app, command, status, created) VALUES ('q1', 'a', 't-job', 'queued', 0)"
+        )
+    # No worker pid yet: the job must not be swept as lost
+    assert jobs.cancel("q1")["status"] == "cancelling"
+
+    ran = []
+    jobs.run_worker(jobs.JobHandle(id="q1", worker=True), lambda: ran.append(1))
+    assert ran == []
+    assert jobs.get_status("q1")["status"] == "cancelled"
+    env = json.loads(jobs.get_envelope("q1"))
+    assert env["ok"] is False and env["data"]["code"] == "cancelled"
+
+
+def test_cancel_signals_running_worker_and_list_sweeps_lost(tmp_path, monkeypatch):
+    import subprocess
+    import sys
+
+    from chi_sdk.runtime import jobs
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    worker = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    with jobs._connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, app, command, params, status, pid, created) VALUES ('r1', 'a', 't-job', '{\"n\": 3}', 'running', ?, 0)",
+            (worker.pid,),
+        )
+    assert jobs.cancel("r1")["status"] == "cancelling"
+    assert worker.wait(timeout=10) != 0  # SIGTERM from cancel
+
+    (job,) = jobs.list_jobs("a")  # the worker is gone without an envelope
+    assert job["status"] == "lost" and job["params"] == {"n": 3}
+
+
+def test_worker_does_not_leak_job_id(monkeypatch):
+    from chi_sdk.runtime import jobs
+
+    monkeypatch.setenv(jobs.JOB_ENV, "w1")
+    handle = jobs.launch("a", "t-job", {})
+    assert handle.worker and handle.id == "w1"
+    assert jobs.JOB_ENV not in os.environ
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+import stat
+
+import pytest
+from click.testing import CliRunner
+
+from chi_sdk import build_cli
+from chi_sdk.runtime import launch
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    root = tmp_path / "proj"
+    (root / ".tui").mkdir(parents=True)
+    (root / ".tui" / "chi-index.yaml").write_text("menu: []\n")
+    (root / ".tui" / "config.yaml").write_text("app_bin: my-app\n")
+    (root / "src").mkdir()
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    runner = bindir / "chi-tui"
+    runner.write_text("#!/bin/sh\n")
+    runner.chmod(runner.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", str(bindir))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv("CHI_APP_BIN", raising=False)
+    monkeypatch.chdir(root / "src")
+    return root
+
+
+def test_launch_plan_is_cached_until_config_changes(project, monkeypatch):
+    calls = []
+    resolve = launch._resolve
+    monkeypatch.setattr(
+        launch, "_resolve", lambda cwd: calls.append(cwd) or resolve(cwd)
+    )
+
+    plan = launch.launch_plan()
+    assert plan.workdir == str(project) and plan.app_bin == "my-app"
+    assert plan.runner and plan.runner.endswith("chi-tui")
+    assert launch.launch_plan() == plan and len(calls) == 1
+
+    cfg = project / ".tui" / "config.yaml"
+    cfg.write_text("app_bin: other-app\n")
+    st = cfg.stat()
+    os.utime(cfg, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert launch.launch_plan().app_bin == "other-app" and len(calls) == 2
+
+
+@pytest.mark.skipif(os.name != "posix", reason="exec handoff is POSIX-only")
+def test_ui_execs_into_tui(project, monkeypatch):
+    execs = []
+
+    def fake_exec(path, argv, env):
+        execs.append((path, argv, env, os.getcwd()))
+        raise SystemExit(0)
+
+    monkeypatch.setattr(os, "execvpe", fake_exec)
+    res = CliRunner().invoke(build_cli("my-app"), ["ui"])
+    assert res.exit_code == 0, res.output
+    ((path, argv, env, cwd),) = execs
+    assert path.endswith("chi-tui") and argv == [path]
+    assert env["CHI_APP_BIN"] == "my-app" and env["CHI_TUI_JSON"] == "1"
+    assert env["CHI_TUI_CONFIG_DIR"] == str(project / ".tui")
+    assert cwd == str(project)
+
+
+def test_launch_plan_picks_up_runner_installed_on_path(project, tmp_path, monkeypatch):
+    first = tmp_path / "first"
+    first.mkdir()
+    monkeypatch.setenv("PATH", os.pathsep.join([str(first), str(tmp_path / "bin")]))
+    assert launch.launch_plan().runner == str(tmp_path / "bin" / "chi-tui")
+
+    runner = first / "chi-tui"
+    runner.write_text("#!/bin/sh\n")
+    runner.chmod(runner.stat().st_mode | stat.S_IXUSR)
+    st = first.stat()
+    os.utime(first, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert launch.launch_plan().runner == str(runner)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import time
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command
+
+
+class _MemOut(BaseModel):
+    n: int
+
+
+_RETAINED: list = []
+
+
+@chi_command(name="t-alloc", output_model=_MemOut)
+def _t_alloc() -> _MemOut:
+    _RETAINED[:] = [bytearray(1024) for _ in range(2000)]  # e.g. a module cache
+    return _MemOut(n=len(_RETAINED))
+
+
+@chi_command(name="t-balloon", output_model=_MemOut)
+def _t_balloon() -> _MemOut:
+    hog = []
+    while True:  # never polls the cancel token
+        hog.append(bytearray(8 * 1024 * 1024))
+        time.sleep(0.01)
+
+
+def test_memory_report_in_meta():
+    cli = build_cli("mem-app")
+    res = CliRunner().invoke(
+        cli, ["--json", "--memory", "--memory-top", "3", "t-alloc"]
+    )
+    assert res.exit_code == 0, res.output
+    memory = json.loads(res.output)["meta"]["memory"]
+    assert memory["traced_peak_bytes"] >= 2000 * 1024
+    assert 0 < len(memory["top"]) <= 3
+    assert "test_memory.py" in memory["top"][0]["site"]
+    assert memory["rss_peak_delta_bytes"] >= 0
+
+
+def test_memory_limit_aborts_with_structured_error(monkeypatch):
+    from chi_sdk.runtime.memory import current_rss
+
+    baseline = current_rss() or 0
+    monkeypatch.setenv("CHI_MEMORY_LIMIT_MB", str(baseline // (1024 * 1024) + 64))
+    cli = build_cli("mem-app")
+    res = CliRunner().invoke(cli, ["--json", "t-balloon"])
+    assert res.exit_code == 1
+    env = json.loads(res.output)
+    assert env["data"]["code"] == "memory_limit"
+    assert env["data"]["details"]["limit_exceeded"] is True
+    assert (
+        env["data"]["details"]["rss_at_limit_bytes"]
+        > env["data"]["details"]["limit_bytes"]
+    )
+
+
+def test_memory_limit_outside_enforce_only_cancels_the_token():
+    from chi_sdk.runtime.context import CommandContext
+    from chi_sdk.runtime.memory import MemoryMonitor
+
+    run = CommandContext(command="t-direct")
+    monitor = MemoryMonitor(report=False, limit_bytes=1)
+    monitor.start(run)
+    try:
+        assert run.token.wait(5)
+        time.sleep(0.2)  # no SIGINT may reach this (main) thread
+    finally:
+        monitor.finish(run)
+    assert run.token.reason == "memory_limit"
+    assert run.meta["memory"]["limit_exceeded"] is True
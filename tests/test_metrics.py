@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command
+
+
+class _MetIn(BaseModel):
+    fail: bool = False
+
+
+class _MetOut(BaseModel):
+    ok: bool
+
+
+@chi_command(name="t-metered", input_model=_MetIn, output_model=_MetOut)
+def _t_metered(inp: _MetIn, ctx) -> _MetOut:
+    if inp.fail:
+        raise RuntimeError("nope")
+    ctx.record_cache_hit()
+    return _MetOut(ok=True)
+
+
+def test_metrics_counters_histogram_and_textfile(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setenv("CHI_METRICS_TEXTFILE", str(tmp_path / "app.prom"))
+    cli = build_cli("metrics-app")
+    r = CliRunner()
+    for args in (["t-metered"], ["t-metered"], ["t-metered", "--fail"]):
+        r.invoke(cli, ["--json", *args])
+    monkeypatch.delenv("CHI_METRICS_TEXTFILE")
+
+    res = r.invoke(cli, ["--json", "metrics"])
+    assert res.exit_code == 0, res.output
+    (cmd,) = json.loads(res.output)["data"]["commands"]
+    assert cmd["command"] == "t-metered"
+    assert cmd["invocations"] == 3
+    assert cmd["errors"] == {"runtime_error": 1}
+    assert cmd["cache_hits"] == 2
+    assert cmd["latency"]["count"] == 3
+    assert cmd["latency"]["p99_s"] is not None
+
+    text = r.invoke(cli, ["metrics"]).output
+    labels = '{app="metrics-app",command="t-metered"}'
+    assert f"chi_command_invocations_total{labels} 3" in text
+    assert f"chi_command_duration_seconds_count{labels} 3" in text
+    assert text.endswith("# EOF\n")
+
+    prom = (tmp_path / "app.prom").read_text()
+    assert "# TYPE chi_command_invocations_total counter" in prom
+    assert "# EOF" not in prom
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+
+import pytest
+
+from chi_sdk.runtime.process_pool import SharedBuffer, SharedMemoryPool
+
+
+def _blob(n: int) -> bytes:
+    return bytes(range(256)) * (n // 256)
+
+
+def _pair(n: int) -> dict:
+    return {"small": b"tiny", "big": _blob(n)}
+
+
+def test_large_results_come_back_via_shared_memory():
+    with SharedMemoryPool(max_workers=2, threshold=64 * 1024) as pool:
+        buf = pool.submit(_blob, 256 * 1024).result()
+        nested = pool.submit(_pair, 128 * 1024).result()
+
+    assert isinstance(buf, SharedBuffer)
+    assert buf.view[:4].tobytes() == b"\x00\x01\x02\x03"
+    assert buf.tobytes() == _blob(256 * 1024)
+    assert nested["small"] == b"tiny"
+    assert isinstance(nested["big"], SharedBuffer)
+
+    name = buf.name
+    buf.close()
+    nested["big"].close()
+    assert buf.closed
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def _fail_later() -> None:
+    import time
+
+    time.sleep(0.3)
+    raise ValueError("boom")
+
+
+def test_cancelling_before_the_worker_finishes(caplog):
+    with SharedMemoryPool(max_workers=1) as pool:
+        pending = pool.submit(_fail_later)
+        # Still pending while the worker runs: the result is not back yet
+        assert pending.cancel()
+    assert pending.cancelled()
+    assert "exception calling callback" not in caplog.text
+
+
+def _touch(path: str) -> None:
+    import time
+
+    time.sleep(0.2)
+    open(path, "w").close()
+
+
+def test_cancel_reaches_queued_calls(tmp_path):
+    with SharedMemoryPool(max_workers=1) as pool:
+        # The executor hands a call or two to the worker ahead of time
+        running = [pool.submit(_touch, str(tmp_path / f"r{n}")) for n in range(2)]
+        queued = pool.submit(_touch, str(tmp_path / "queued"))
+        assert queued.cancel()
+    assert all(f.result() is None for f in running)
+    assert not (tmp_path / "queued").exists()
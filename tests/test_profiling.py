@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+import pstats
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command
+
+
+class _FibOut(BaseModel):
+    value: int
+
+
+def _fib(n: int) -> int:
+    return n if n < 2 else _fib(n - 1) + _fib(n - 2)
+
+
+@chi_command(name="t-fib", output_model=_FibOut)
+def _t_fib() -> _FibOut:
+    return _FibOut(value=_fib(15))
+
+
+def test_profile_writes_pstats_and_summary(tmp_path):
+    out = tmp_path / "fib.pstats"
+    cli = build_cli("profile-app")
+    res = CliRunner().invoke(
+        cli,
+        [
+            "--json",
+            "--profile-out",
+            str(out),
+            "--profile-sort",
+            "tottime",
+            "--profile-top",
+            "3",
+            "--profile-filter",
+            r"\(_fib\)",
+            "t-fib",
+        ],
+    )
+    assert res.exit_code == 0, res.output
+    env = json.loads(res.output)
+    assert env["data"] == {"value": 610}
+    profile = env["meta"]["profile"]
+    assert profile["path"] == str(out)
+    assert profile["sort"] == "tottime"
+    assert len(profile["top"]) == 1
+    assert profile["top"][0]["func"].endswith("(_fib)")
+    assert profile["top"][0]["ncalls"] == 1973
+    assert pstats.Stats(str(out)).total_calls > 0
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from chi_sdk.chi_admin import releases
+from chi_sdk.chi_admin.ensure_chi import _download_binary
+
+BINARY = b"#!/bin/sh\necho chi-tui\n" + bytes(range(256)) * 64
+
+
+def _tarball() -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as t:
+        info = tarfile.TarInfo("chi-tui-linux-amd64/chi-tui")
+        info.size = len(BINARY)
+        t.addfile(info, io.BytesIO(BINARY))
+    return buf.getvalue()
+
+
+class _Release(BaseHTTPRequestHandler):
+    """GitHub stand-in: release JSON, SHA256SUMS and a Range-capable asset."""
+
+    archive = b""
+    sums = ""
+    requests: list = []
+    etags: list = []
+    drops = 0
+    limited = False  # answer metadata requests with a rate-limit 403
+
+    def log_message(self, *args):
+        pass
+
+    def _send_tagged(self, body):
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self._send(200, body, [("ETag", etag)])
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for k, v in headers:
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = type(self)
+        base = f"http://127.0.0.1:{self.server.server_port}"
+        cls.requests.append((self.path, self.headers.get("Range")))
+        cls.etags.append(self.headers.get("If-None-Match"))
+        if cls.limited and not self.path.endswith((".tar.gz", ".zip")):
+            self._send(403, b'{"message": "API rate limit exceeded"}')
+        elif self.path == "/repos/o/r/releases":
+            assets = [
+                {
+                    "name": "chi-tui-linux-amd64.tar.gz",
+                    "size": len(cls.archive),
+                    "browser_download_url": f"{base}/dl/chi-tui-linux-amd64.tar.gz",
+                },
+                {"name": "SHA256SUMS", "browser_download_url": f"{base}/dl/SUMS"},
+            ]
+            self._send_tagged(json.dumps([{"assets": assets}]).encode())
+        elif self.path == "/dl/SUMS":
+            self._send_tagged(cls.sums.encode())
+        elif self.path.endswith((".tar.gz", ".zip")):
+            rng = self.headers.get("Range")
+            if rng:
+                start = int(rng.split("=")[1].rstrip("-"))
+                body = cls.archive[start:]
+                total = len(cls.archive)
+                headers = [("Content-Range", f"bytes {start}-{total - 1}/{total}")]
+                self._send(206, body, headers)
+            elif cls.drops:
+                cls.drops -= 1  # flaky network: cut the body short
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(cls.archive)))
+                self.end_headers()
+                self.wfile.write(cls.archive[: len(cls.archive) // 2])
+                self.close_connection = True
+            else:
+                self._send(200, cls.archive)
+        else:
+            self._send(404, b"")
+
+
+@pytest.fixture
+def gh(tmp_path, monkeypatch):
+    _Release.archive = _tarball()
+    digest = hashlib.sha256(_Release.archive).hexdigest()
+    _Release.sums = f"{digest}  chi-tui-linux-amd64.tar.gz\n"
+    _Release.requests = []
+    _Release.etags = []
+    _Release.drops = 0
+    _Release.limited = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Release)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("CHI_TUI_GH_API", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("CHI_TUI_GH_REPO", "o/r")
+    monkeypatch.delenv("CHI_TUI_BIN_TAG", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("NO_PROXY", "*")
+    monkeypatch.setenv("no_proxy", "*")
+    with (
+        patch("platform.system", return_value="Linux"),
+        patch("platform.machine", return_value="x86_64"),
+    ):
+        yield digest
+    server.shutdown()
+
+
+def test_download_resumes_verifies_and_shares_store(gh, tmp_path):
+    _Release.drops = 1  # the streamed attempt breaks off half-way ...
+    assert _download_binary(tmp_path / "venv1")
+    assert (tmp_path / "venv1" / "chi-tui").read_bytes() == BINARY
+    ranges = [r for p, r in _Release.requests if p.endswith(".tar.gz")]
+    # ... and the retry resumes from the bytes it already received
+    assert ranges == [None, f"bytes={len(_Release.archive) // 2}-"]
+    assert releases.store_path(gh, "chi-tui").read_bytes() == BINARY
+
+    _Release.requests = []
+    assert _download_binary(tmp_path / "venv2")  # second project: store hit
+    assert (tmp_path / "venv2" / "chi-tui").read_bytes() == BINARY
+    assert not [p for p, _ in _Release.requests if p.endswith(".tar.gz")]
+
+
+def test_release_metadata_is_cached_and_revalidated(gh, tmp_path, monkeypatch):
+    assert _download_binary(tmp_path / "venv1")
+    _Release.requests, _Release.etags = [], []
+    assert _download_binary(tmp_path / "venv2")  # fresh cache: no API calls
+    assert _Release.requests == []
+
+    monkeypatch.setenv("CHI_TUI_RELEASE_TTL", "0")
+    assert _download_binary(tmp_path / "venv3")  # stale: conditional GETs
+    assert [p for p, _ in _Release.requests] == ["/repos/o/r/releases", "/dl/SUMS"]
+    assert all(tag and tag.startswith('"') for tag in _Release.etags)
+
+    _Release.limited = True  # rate limited: the stale metadata is used
+    assert _download_binary(tmp_path / "venv3b")
+    _Release.limited = False
+
+    _Release.requests = []
+    assert _download_binary(tmp_path / "venv4", offline=True)
+    assert _Release.requests == []
+    monkeypatch.setenv("CHI_TUI_GH_REPO", "o/uncached")
+    assert not _download_binary(tmp_path / "venv5", offline=True)
+    assert _Release.requests == []
+
+
+def test_archive_is_extracted_while_streaming(gh, tmp_path):
+    assert _download_binary(tmp_path / "venv")
+    assert [p for p, _ in _Release.requests if p.endswith(".tar.gz")] == [
+        "/dl/chi-tui-linux-amd64.tar.gz"
+    ]
+    assert not list((tmp_path / "cache").rglob("partial"))  # no archive on disk
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr("chi-tui-windows/chi-tui.exe", BINARY)
+    dest = tmp_path / "chi-tui.exe"
+    url = f"{os.environ['CHI_TUI_GH_API']}/dl/chi-tui.zip"
+    _Release.archive = buf.getvalue()
+    digest = releases.stream_extract(url, "chi-tui.zip", "chi-tui.exe", dest)
+    assert dest.read_bytes() == BINARY
+    assert digest == hashlib.sha256(buf.getvalue()).hexdigest()
+
+
+def test_checksum_mismatch_is_rejected(gh, tmp_path):
+    _Release.sums = f"{'0' * 64}  chi-tui-linux-amd64.tar.gz\n"
+    assert not _download_binary(tmp_path / "venv")
+    assert not (tmp_path / "venv" / "chi-tui").exists()
+    assert not releases.store_path(gh, "chi-tui").exists()
+    assert not list((tmp_path / "cache").rglob("*.part"))  # not resumed later
+
+
+def test_unusable_partial_file_is_not_resumed_again(gh, tmp_path):
+    _Release.sums = ""  # nothing to verify against
+    url = f"{os.environ['CHI_TUI_GH_API']}/dl/chi-tui-linux-amd64.tar.gz"
+    part = releases._cache_bin_path() / "partial" / f"{releases._url_key(url)}.part"
+    part.parent.mkdir(parents=True)
+    part.write_bytes(b"\0" * len(_Release.archive))  # complete size, corrupt
+    assert not _download_binary(tmp_path / "venv")
+    assert not part.exists()
+    assert _download_binary(tmp_path / "venv")
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command
+from chi_sdk.renderer import render_table, table_columns
+
+
+def test_render_table_streams_rows_with_aligned_columns(capsys):
+    def rows():
+        yield {"id": 1, "path": "/tmp/a"}
+        yield {"id": 22, "path": "/tmp/" + "b" * 80}
+        for i in range(3, 5000):
+            yield {"id": i, "path": f"/tmp/{i}", "extra": "ignored"}
+
+    render_table(rows(), width=30, sample=2, pager=False)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["id", "path"]
+    assert lines[2] == " 1  /tmp/a"
+    assert lines[3].endswith("…") and len(lines[3]) <= 30
+    assert len(lines) == 2 + 4999
+    assert lines[-1] == "4999  /tmp/4999"
+
+
+def test_render_table_truncates_and_pages_only_on_a_tty(capsys, monkeypatch):
+    import os
+    import shutil
+    import sys
+
+    import click
+
+    rows = [{"id": 1, "path": "/tmp/" + "b" * 30}] + [
+        {"id": i, "path": "/tmp/x"} for i in range(2, 30)
+    ]
+    monkeypatch.delenv("CHI_NO_PAGER", raising=False)
+    monkeypatch.setattr(
+        shutil, "get_terminal_size", lambda *a: os.terminal_size((20, 24))
+    )
+    paged = []
+    monkeypatch.setattr(click, "echo_via_pager", lambda chunks: paged.extend(chunks))
+
+    render_table(iter(rows), sample=2)  # redirected: full width, no pager
+    lines = capsys.readouterr().out.splitlines()
+    assert not paged and len(lines) == 2 + 29
+    assert lines[2].endswith("b" * 30)
+
+    monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+    render_table(iter(rows), sample=2)  # 31 lines > 24: paged, though sample=2
+    lines = "".join(paged).splitlines()
+    assert len(lines) == 2 + 29 and len(lines[2]) == 20
+    paged.clear()
+    render_table(iter(rows[:5]), sample=2)
+    assert not paged and len(capsys.readouterr().out.splitlines()) == 7
+
+
+class _Row(BaseModel):
+    name_: str
+    size: int
+    owner: Optional[str] = None
+
+
+class _RowsOut(BaseModel):
+    items: List[_Row]
+
+
+@chi_command(name="t-rows", output_model=_RowsOut)
+def _t_rows() -> _RowsOut:
+    return _RowsOut(items=[_Row(name_="a.txt", size=12), _Row(name_="b", size=3)])
+
+
+def test_human_mode_renders_output_model_as_table():
+    assert table_columns(_RowsOut) == ["name_", "size", "owner"]
+    res = CliRunner().invoke(build_cli("table-app"), ["t-rows"])
+    assert res.exit_code == 0, res.output
+    lines = res.output.splitlines()
+    assert lines[0].split() == ["name_", "size", "owner"]
+    assert lines[2].split() == ["a.txt", "12"]
+    assert lines[3].split() == ["b", "3"]
+
+
+class _Stamped(BaseModel):
+    created: datetime
+    where: Path
+
+
+@chi_command(name="t-stamped", output_model=_Stamped)
+def _t_stamped() -> _Stamped:
+    return _Stamped(created=datetime(2024, 5, 1, 12, 30), where=Path("/srv/data"))
+
+
+def test_human_mode_renders_non_json_fields_as_text():
+    res = CliRunner().invoke(build_cli("stamp-app"), ["t-stamped"])
+    assert res.exit_code == 0, res.output
+    assert res.output.splitlines() == [
+        "created: 2024-05-01T12:30:00",
+        "where: /srv/data",
+    ]
+
+
+class _ByName(BaseModel):
+    items: Dict[str, _Row]
+
+
+@chi_command(name="t-by-name", output_model=_ByName)
+def _t_by_name() -> _ByName:
+    return _ByName(items={"a": _Row(name_="a.txt", size=12)})
+
+
+def test_dict_of_models_is_not_rendered_as_rows(capsys):
+    from chi_sdk.renderer import compile_renderer, render_human_output
+
+    assert table_columns(_ByName) is None
+    res = CliRunner().invoke(build_cli("dict-app"), ["t-by-name"])
+    assert res.exit_code == 0, res.output
+    data = _ByName(items={"a": _Row(name_="a.txt", size=12)}).model_dump()
+    render_human_output(data)
+    expected = capsys.readouterr().out
+    assert res.output == expected and "a.txt" in expected
+    assert compile_renderer(_ByName) is None  # left to the runtime renderer
+
+
+class _Tagged(BaseModel):
+    title: str
+    status: str
+    id: int
+    command: Optional[str] = None
+
+
+class _TaggedOut(BaseModel):
+    items: List[_Tagged]
+
+
+class _Summary(BaseModel):
+    total: float
+    count: int
+    tags: List[str]
+    note: Optional[str] = None
+
+
+class _DictItems(BaseModel):
+    items: List[Dict[str, Any]]
+
+
+class _StrItems(BaseModel):
+    items: List[str]
+
+
+def test_compiled_renderer_matches_runtime_renderer(capsys):
+    from chi_sdk.renderer import compile_renderer, render_human_output
+
+    cases = [
+        _TaggedOut(
+            items=[
+                _Tagged(title="a", status="ok", id=1),
+                _Tagged(title="b", status="failed", id=2, command="app retry 2"),
+            ]
+        ),
+        _TaggedOut(items=[]),
+        _Summary(total=1.5, count=2, tags=["x"]),
+        _DictItems(items=[{"title": "Open", "command": "app open"}]),
+        _DictItems(items=[]),
+        _StrItems(items=["a", "b"]),
+    ]
+    for model in cases:
+        data = model.model_dump()
+        render_human_output(data)
+        expected = capsys.readouterr().out
+        # Like `_execute`: no compiled renderer means the runtime one
+        renderer = compile_renderer(type(model)) or render_human_output
+        renderer(data)
+        assert capsys.readouterr().out == expected
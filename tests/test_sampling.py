@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+import time
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command
+
+
+class _SpinOut(BaseModel):
+    loops: int
+
+
+def _busy_leaf(deadline: float) -> int:
+    n = 0
+    while time.perf_counter() < deadline:
+        n += 1
+    return n
+
+
+@chi_command(name="t-spin", output_model=_SpinOut)
+def _t_spin() -> _SpinOut:
+    return _SpinOut(loops=_busy_leaf(time.perf_counter() + 0.2))
+
+
+def test_sampling_writes_collapsed_stacks(tmp_path):
+    out = tmp_path / "spin.collapsed"
+    cli = build_cli("sampling-app")
+    res = CliRunner().invoke(
+        cli, ["--json", "--sample-out", str(out), "--sample-hz", "500", "t-spin"]
+    )
+    assert res.exit_code == 0, res.output
+    meta = json.loads(res.output)["meta"]["sampling"]
+    assert meta["path"] == str(out)
+    assert meta["samples"] > 10
+
+    lines = out.read_text().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "_busy_leaf (" in stack.split(";")[-1]
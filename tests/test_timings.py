@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+
+from click.testing import CliRunner
+from pydantic import BaseModel, field_serializer
+
+from chi_sdk import build_cli, chi_command
+
+
+class _TimedIn(BaseModel):
+    n: int
+
+
+class _TimedOut(BaseModel):
+    squares: list
+
+
+@chi_command(name="t-timed", input_model=_TimedIn, output_model=_TimedOut)
+def _t_timed(inp: _TimedIn) -> _TimedOut:
+    return _TimedOut(squares=[i * i for i in range(inp.n)])
+
+
+class _Counted(BaseModel):
+    value: int
+
+    @field_serializer("value")
+    def _count(self, value: int) -> int:
+        _SERIALIZED.append(value)
+        return value
+
+
+_SERIALIZED: list = []
+
+
+@chi_command(name="t-counted")
+def _t_counted() -> dict:
+    return {"counted": _Counted(value=7)}
+
+
+def test_timings_serialize_the_payload_once():
+    cli = build_cli("timings-app")
+    _SERIALIZED.clear()
+    res = CliRunner().invoke(cli, ["--json", "--timings", "t-counted"])
+    assert res.exit_code == 0, res.output
+    assert _SERIALIZED == [7]
+    env = json.loads(res.output)
+    assert env["data"] == {"counted": {"value": 7}}
+    assert list(env) == [
+        "version",
+        "ok",
+        "type",
+        "command",
+        "request_id",
+        "ts",
+        "data",
+        "meta",
+    ]
+    assert "serialize_ms" in env["meta"]["timings"]
+
+
+def test_timings_flag_reports_phase_breakdown():
+    cli = build_cli("timings-app")
+    res = CliRunner().invoke(cli, ["--json", "--timings", "t-timed", "--n", "3"])
+    assert res.exit_code == 0, res.output
+    env = json.loads(res.output)
+    timings = env["meta"]["timings"]
+    assert list(timings) == [
+        "parse_ms",
+        "input_ms",
+        "body_ms",
+        "validate_ms",
+        "dump_ms",
+        "serialize_ms",
+        "total_ms",
+    ]
+    assert all(v >= 0 for v in timings.values())
+    assert timings["total_ms"] >= timings["body_ms"]
+
+
+def test_timings_env_var_in_human_mode(monkeypatch):
+    monkeypatch.setenv("CHI_TIMINGS", "1")
+    cli = build_cli("timings-app")
+    res = CliRunner().invoke(cli, ["t-timed", "--n", "2"])
+    assert res.exit_code == 0, res.output
+    assert "timings: parse=" in res.output
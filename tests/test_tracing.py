@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Optional
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command, emit_progress
+
+_TRACE = "0af7651916cd43dd8448eb211c80319c"
+_PARENT = "b7ad6b7169203331"
+
+
+class _TracedIn(BaseModel):
+    n: int
+
+
+class _TracedOut(BaseModel):
+    total: int
+    traceparent: Optional[str]
+    child_traceparent: str
+    process_traceparent: str
+
+
+@chi_command(name="t-traced", input_model=_TracedIn, output_model=_TracedOut)
+def _t_traced(inp: _TracedIn, ctx) -> _TracedOut:
+    emit_progress("working", percent=50, command="t-traced")
+    with ctx.span("sum", items=inp.n) as attrs:
+        total = sum(range(inp.n))
+        attrs["total"] = total
+    return _TracedOut(
+        total=total,
+        traceparent=ctx.traceparent,
+        child_traceparent=ctx.subprocess_env()["TRACEPARENT"],
+        process_traceparent=os.environ["TRACEPARENT"],
+    )
+
+
+def test_traceparent_is_echoed_and_spans_exported(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRACEPARENT", f"00-{_TRACE}-{_PARENT}-01")
+    out = tmp_path / "spans.jsonl"
+    cli = build_cli("trace-app")
+    res = CliRunner().invoke(
+        cli, ["--json", "--trace-out", str(out), "t-traced", "--n", "4"]
+    )
+    assert res.exit_code == 0, res.output
+    envs = [json.loads(line) for line in res.output.splitlines()]
+    assert [e["type"] for e in envs] == ["progress", "result"]
+    trace = envs[-1]["meta"]["trace"]
+    assert trace["trace_id"] == _TRACE and trace["parent_span_id"] == _PARENT
+    assert all(e["meta"]["trace"] == trace for e in envs)
+    # nested backend calls continue the trace under this command's span
+    data = envs[-1]["data"]
+    assert data["traceparent"] == f"00-{_TRACE}-{trace['span_id']}-01"
+    assert data["child_traceparent"] == data["traceparent"]
+    # ... without touching the process-wide environment
+    assert data["process_traceparent"] == f"00-{_TRACE}-{_PARENT}-01"
+
+    (line,) = out.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {s["name"]: s for s in spans}
+    assert {"t-traced", "chi.input", "chi.body", "chi.dump", "sum"} <= set(by_name)
+    root = by_name["t-traced"]
+    assert root["spanId"] == trace["span_id"] and root["parentSpanId"] == _PARENT
+    assert by_name["chi.body"]["parentSpanId"] == root["spanId"]
+    user = by_name["sum"]
+    assert user["parentSpanId"] == by_name["chi.body"]["spanId"]
+    assert {"key": "total", "value": {"intValue": "6"}} in user["attributes"]
+    assert all(s["traceId"] == _TRACE for s in spans)
+    assert int(root["endTimeUnixNano"]) >= int(user["endTimeUnixNano"])
+
+
+def test_invalid_traceparent_without_export_disables_tracing(monkeypatch):
+    monkeypatch.delenv("CHI_TRACE_FILE", raising=False)
+    monkeypatch.setenv("TRACEPARENT", "not-a-traceparent")
+    cli = build_cli("trace-app")
+    res = CliRunner().invoke(cli, ["--json", "t-traced", "--n", "2"])
+    assert res.exit_code == 0, res.output
+    envs = [json.loads(line) for line in res.output.splitlines()]
+    assert all("trace" not in e["meta"] for e in envs)
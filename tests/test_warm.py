@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command, emit_progress
+from chi_sdk.runtime import warm, warm_flight
+
+pytestmark = pytest.mark.skipif(not warm.supported(), reason="POSIX fd passing")
+
+
+class _PidOut(BaseModel):
+    pid: int
+    cwd: str
+    who: str
+
+
+@chi_command(name="t-warm-pid", output_model=_PidOut)
+def _t_warm_pid() -> _PidOut:
+    return _PidOut(pid=os.getpid(), cwd=os.getcwd(), who=os.getenv("WHO", ""))
+
+
+class _ListOut(BaseModel):
+    items: list
+
+
+class _ShowIn(BaseModel):
+    n: int
+
+
+class _ShowOut(BaseModel):
+    n: int
+    pid: int
+
+
+@chi_command(name="t-warm-list", output_model=_ListOut)
+def _t_warm_list() -> _ListOut:
+    return _ListOut(
+        items=[
+            {"title": f"item {n}", "command": f"${{APP_BIN}} t-warm-show --n {n}"}
+            for n in (1, 2, 99)
+        ]
+    )
+
+
+@chi_command(
+    name="t-warm-show", input_model=_ShowIn, output_model=_ShowOut, idempotent=True
+)
+def _t_warm_show(inp: _ShowIn, ctx) -> _ShowOut:
+    marker = Path(os.environ["MARKERS"]) / f"{inp.n}-{os.getpid()}"
+    marker.write_text("started")
+    if inp.n == 2:
+        ctx.token.wait(10)  # slow drill-down, stopped by cancellation
+        marker.write_text("cancelled" if ctx.token.cancelled else "done")
+    return _ShowOut(n=inp.n, pid=os.getpid())
+
+
+@chi_command(name="t-warm-status", output_model=_PidOut, idempotent=True)
+def _t_warm_status() -> _PidOut:
+    (Path(os.environ["MARKERS"]) / f"status-{os.getpid()}").touch()
+    emit_progress("checking", percent=0, command="t-warm-status")
+    time.sleep(0.5)
+    return _PidOut(pid=os.getpid(), cwd=os.getcwd(), who="")
+
+
+def _wait_for(check, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not check() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return check()
+
+
+def _wait_gone(path, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return not path.exists()
+
+
+def test_shim_runs_commands_in_warm_workers(tmp_path):
+    tui = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        shim = warm.start(
+            build_cli("warm-app"), "warm-app", ["false"], watch_pid=tui.pid
+        )
+        assert shim is not None
+        env = dict(os.environ, WHO="tui")
+        pids = set()
+        for _ in range(2):
+            proc = subprocess.run(
+                [shim, "--json", "t-warm-pid"],
+                capture_output=True,
+                cwd=tmp_path,
+                env=env,
+                timeout=30,
+            )
+            assert proc.returncode == 0, proc.stderr
+            out = json.loads(proc.stdout)
+            assert out["ok"] and out["data"]["who"] == "tui"
+            assert out["data"]["cwd"] == str(tmp_path)
+            pids.add(out["data"]["pid"])
+        assert len(pids) == 2  # a fresh worker per call
+
+        bad = subprocess.run(
+            [shim, "--json", "no-such-command"], capture_output=True, timeout=30
+        )
+        assert bad.returncode == 2
+    finally:
+        tui.kill()
+        tui.wait()
+    # The server notices the TUI is gone and removes its directory
+    assert _wait_gone(Path(shim).parent)
+
+
+def test_ui_prefetch_starts_warm_server_with_prefetch(tmp_path, monkeypatch):
+    started = []
+    monkeypatch.setattr(
+        warm, "start", lambda *a, **kw: started.append(kw) or "/tmp/shim"
+    )
+
+    def fake_exec(path, argv, env):
+        started.append({"app_bin": env["CHI_APP_BIN"]})
+        raise SystemExit(0)
+
+    monkeypatch.setattr(os, "execvpe", fake_exec)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("CHI_APP_BIN", "warm-app")
+    monkeypatch.chdir(tmp_path)
+    cli = build_cli("warm-app")
+    res = CliRunner().invoke(cli, ["ui", "--prefetch", "3"], prog_name="warm-app")
+    assert res.exit_code == 0, res.output
+    assert started == [{"prefetch": 3}, {"app_bin": "/tmp/shim"}]
+
+    started.clear()
+    monkeypatch.setenv("CHI_UI_PREFETCH", "2")
+    res = CliRunner().invoke(cli, ["ui"], prog_name="warm-app")
+    assert res.exit_code == 0, res.output
+    assert started[0] == {"prefetch": 2}
+
+
+def test_shim_falls_back_to_cold_backend(tmp_path):
+    shim = warm.write_shim(
+        tmp_path, tmp_path / "missing.sock", [sys.executable, "-c", "print('cold')"]
+    )
+    proc = subprocess.run([str(shim)], capture_output=True, text=True, timeout=30)
+    assert proc.returncode == 0 and proc.stdout.strip() == "cold"
+
+
+def test_prefetch_serves_drill_downs_and_yields_to_real_calls(tmp_path):
+    markers = tmp_path / "markers"
+    markers.mkdir()
+    tui = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        shim = warm.start(
+            build_cli("warm-app"), "warm-app", ["false"], watch_pid=tui.pid, prefetch=2
+        )
+        env = dict(os.environ, MARKERS=str(markers), CHI_TUI_JSON="1")
+
+        def call(*argv):
+            proc = subprocess.run(
+                [shim, *argv], capture_output=True, cwd=tmp_path, env=env, timeout=30
+            )
+            assert proc.returncode == 0, proc.stderr
+            return json.loads(proc.stdout.splitlines()[-1])
+
+        call("t-warm-list")
+        # K=2: items 1 and 2 are prefetched, 99 is not
+        assert _wait_for(lambda: len(list(markers.glob("[12]-*"))) == 2)
+        assert not list(markers.glob("99-*"))
+        (first,) = markers.glob("1-*")
+
+        # Served from the prefetch (cached, or still running and joined)
+        shown = call("t-warm-show", "--n", "1")
+        assert shown["data"]["pid"] == int(first.name.split("-")[1])
+        assert len(list(markers.glob("1-*"))) == 1  # replayed, not re-run
+        # The real call cancelled the slow prefetch of item 2
+        (second,) = markers.glob("2-*")
+        assert _wait_for(lambda: second.read_text() == "cancelled")
+        # Replays get their own request ids
+        again = call("t-warm-show", "--n", "1")
+        assert again["data"] == shown["data"]
+        assert again["request_id"] != shown["request_id"]
+    finally:
+        tui.kill()
+        tui.wait()
+
+
+def test_identical_concurrent_calls_share_one_execution(tmp_path):
+    markers = tmp_path / "markers"
+    markers.mkdir()
+    tui = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        shim = warm.start(
+            build_cli("warm-app"), "warm-app", ["false"], watch_pid=tui.pid
+        )
+        env = dict(os.environ, MARKERS=str(markers), CHI_TUI_JSON="1")
+        procs = []
+        for _ in range(3):
+            procs.append(
+                subprocess.Popen(
+                    [shim, "t-warm-status"],
+                    stdout=subprocess.PIPE,
+                    cwd=tmp_path,
+                    env=env,
+                )
+            )
+            time.sleep(0.1)  # later callers join a running execution
+        streams = []
+        for proc in procs:
+            out, _ = proc.communicate(timeout=30)
+            assert proc.returncode == 0
+            streams.append([json.loads(line) for line in out.splitlines()])
+    finally:
+        tui.kill()
+        tui.wait()
+
+    assert len(list(markers.glob("status-*"))) == 1
+    # Every caller gets the whole stream (progress, then result) ...
+    assert all([e["type"] for e in s] == ["progress", "result"] for s in streams)
+    assert len({s[-1]["data"]["pid"] for s in streams}) == 1
+    # ... with request ids of its own
+    ids = [e["request_id"] for s in streams for e in s]
+    assert len(set(ids)) == len(ids)
+
+
+def test_flight_output_is_capped(monkeypatch):
+    monkeypatch.setattr(warm_flight, "FLIGHT_BUFFER_MAX", 100)
+    flight = warm._Flight("k", 0, speculative=True)
+    flight.ingest(1, b"x" * 60 + b"\n")
+    assert flight.lines[1] and not flight.overflow
+    flight.ingest(1, b"y" * 60 + b"\n")
+    assert flight.overflow and flight.lines == {1: [], 2: []}
+    flight.ingest(1, b"z\n")  # no longer kept
+    assert flight.lines[1] == []
+
+
+def test_expired_prefetches_are_pruned_when_scheduling(tmp_path):
+    server = warm.WarmServer(build_cli("warm-app"), "warm-app", tmp_path, 0)
+    server.cache["old"] = warm._Cached({1: [b"x\n"], 2: []}, 0, time.monotonic())
+    server._schedule({"argv": []}, b"[]")
+    assert server.cache == {}
+
+
+def test_stalled_connection_does_not_hold_up_other_calls(tmp_path):
+    tui = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        shim = warm.start(
+            build_cli("warm-app"), "warm-app", ["false"], watch_pid=tui.pid
+        )
+        # Connects, then never sends its request
+        stalled.connect(str(Path(shim).parent / warm.SOCKET_NAME))
+        started = time.monotonic()
+        proc = subprocess.run(
+            [shim, "--json", "t-warm-pid"], capture_output=True, timeout=30
+        )
+        assert proc.returncode == 0, proc.stderr
+        assert time.monotonic() - started < warm.REQUEST_TIMEOUT_S / 2
+    finally:
+        stalled.close()
+        tui.kill()
+        tui.wait()
+
+
+def test_worker_closes_fds_it_does_not_own(tmp_path):
+    server = warm.WarmServer(build_cli("warm-app"), "warm-app", tmp_path, 0)
+    server.bind()
+    server._sel = selectors.DefaultSelector()
+    other_r, other_w = os.pipe()  # another flight's output pipe
+    held_r, held_w = os.pipe()  # a caller's stdout
+    own_r, own_w = os.pipe()  # this worker's
+    server._register(other_r, selectors.EVENT_READ, None)
+    server._held.add(held_w)
+    try:
+        server._child()
+        for fd in (other_r, held_w):
+            with pytest.raises(OSError):
+                os.fstat(fd)
+        os.fstat(own_w)
+        assert server._sock is None and server._sel is None
+    finally:
+        for fd in (other_w, held_r, own_r, own_w):
+            os.close(fd)
+
+
+def test_late_joiner_gets_buffered_output_in_order_with_own_ids(tmp_path):
+    server = warm.WarmServer(build_cli("warm-app"), "warm-app", tmp_path, 0)
+    flight = warm._Flight("k", 0, speculative=False)
+    envelopes = [
+        {"type": "progress", "request_id": "worker", "data": {"percent": n}}
+        for n in range(3)
+    ] + [{"type": "result", "request_id": "worker", "data": {"ok": True}}]
+    lines = [json.dumps(e).encode() + b"\n" for e in envelopes]
+
+    def caller():
+        conn, shim = socket.socketpair()
+        fds = [os.open(os.devnull, os.O_RDWR) for _ in range(3)]
+        return warm._Caller(server, conn, fds), shim
+
+    early, early_shim = caller()
+    flight.join(early)
+    flight.ingest(1, lines[0] + lines[1][:10])  # a line split across reads
+    flight.ingest(1, lines[1][10:] + lines[2])
+    late, late_shim = caller()
+    flight.join(late)
+    flight.ingest(1, lines[3])
+    try:
+        streams = []
+        for c in (early, late):
+            streams.append([json.loads(x) for x in c.pending[1].splitlines()])
+        for stream in streams:
+            assert [(e["type"], e["data"]) for e in stream] == [
+                (e["type"], e["data"]) for e in envelopes
+            ]
+        ids = [e["request_id"] for s in streams for e in s]
+        assert "worker" not in ids and len(set(ids)) == len(ids)
+    finally:
+        for c, shim in ((early, early_shim), (late, late_shim)):
+            c.close()
+            shim.close()
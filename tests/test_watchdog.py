@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import time
+
+from click.testing import CliRunner
+from pydantic import BaseModel
+
+from chi_sdk import build_cli, chi_command
+
+
+class _SlowOut(BaseModel):
+    done: bool
+
+
+def _stuck_in_io() -> None:
+    time.sleep(0.3)
+
+
+@chi_command(name="t-slow", output_model=_SlowOut, slow_threshold_ms=100)
+def _t_slow() -> _SlowOut:
+    _stuck_in_io()
+    return _SlowOut(done=True)
+
+
+@chi_command(name="t-quick", output_model=_SlowOut, slow_threshold_ms=5000)
+def _t_quick() -> _SlowOut:
+    time.sleep(0.15)
+    return _SlowOut(done=True)
+
+
+def test_slow_command_dumps_stacks_and_reports_progress(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    cli = build_cli("slow-app")
+    res = CliRunner().invoke(cli, ["--json", "t-slow"])
+    assert res.exit_code == 0, res.output
+    envs = [json.loads(line) for line in res.output.splitlines()]
+    slow = [e for e in envs if e["type"] == "progress"]
+    assert slow and slow[0]["data"]["stage"] == "slow"
+    assert slow[0]["data"]["elapsed_ms"] >= 100
+    result = envs[-1]
+    assert result["type"] == "result"
+    log = result["meta"]["slow"]["stack_log"]
+    assert log.startswith(str(tmp_path)) and log == slow[0]["data"]["stack_log"]
+    text = open(log, encoding="utf-8").read()
+    assert "t-slow" in text and "_stuck_in_io" in text
+
+
+def test_fast_command_has_no_slow_report(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setenv("CHI_SLOW_MS", "50")  # the command's own value wins
+    cli = build_cli("slow-app")
+    res = CliRunner().invoke(cli, ["--json", "t-quick"])
+    assert res.exit_code == 0, res.output
+    (env,) = [json.loads(line) for line in res.output.splitlines()]
+    assert env["type"] == "result" and "slow" not in env["meta"]
+
+    # --slow-threshold-ms overrides the command's threshold
+    res = CliRunner().invoke(cli, ["--json", "--slow-threshold-ms", "5000", "t-slow"])
+    assert res.exit_code == 0, res.output
+    (env,) = [json.loads(line) for line in res.output.splitlines()]
+    assert env["type"] == "result" and "slow" not in env["meta"]